@@ -0,0 +1,24 @@
+"""double points register_length
+
+Revision ID: 9a3e5c7b1d64
+Revises: f1b7d3e95a26
+Create Date: 2026-10-18 16:05:12.184307
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '9a3e5c7b1d64'
+down_revision = 'f1b7d3e95a26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # DOUBLE points are decoded from 4 registers, rows saved before check_self() normalised that keep a shorter length
+    op.execute("UPDATE points SET register_length = 4 WHERE data_type = 'DOUBLE' AND register_length < 4")
+
+
+def downgrade():
+    raise NotImplementedError('Revision 9a3e5c7b1d64 is an irreversible data migration: the register_length which DOUBLE '
+                              'points had before it got set to 4 is not kept')
@@ -29,6 +29,12 @@ class Background:
     def run():
         setting: AppSetting = current_app.config[AppSetting.KEY]
         logger.info("Starting Drivers...")
+        from src.services.point_store_cache import PointStoreCache
+        PointStoreCache().start(setting.point_store_setting)
+        from src.services.point_history import PointHistory
+        PointHistory().start(setting.point_history_setting)
+        from src.services.mapping_sync import MappingSyncOutbox
+        MappingSyncOutbox().start(setting.mapping_sync_setting)
         from src.services.mqtt_client import MqttClient
         if setting.mqtt_setting.enabled:
             MqttClient().start(setting.mqtt_setting)
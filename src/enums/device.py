@@ -0,0 +1,6 @@
+import enum
+
+
+class DeviceHealthState(enum.Enum):
+    ONLINE = 0
+    QUARANTINED = 1
@@ -9,3 +9,9 @@ class MapType(enum.Enum):
 class MappingState(enum.Enum):
     MAPPED = 'Mapped',
     BROKEN = 'Broken'
+
+
+class SyncJobState(enum.Enum):
+    IDLE = 0
+    RUNNING = 1
+    FINISHED = 2
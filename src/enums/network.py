@@ -6,6 +6,11 @@ class ModbusType(enum.Enum):
     TCP = 1
 
 
+class ModbusTcpTransport(enum.Enum):
+    SYNC = 0
+    PIPELINED = 1
+
+
 # The type of checksum to use to verify data integrity. This can be on of the followings.
 class ModbusRtuParity(enum.Enum):
     O = 0
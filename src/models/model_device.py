@@ -10,13 +10,14 @@ from src.models.model_point import PointModel
 from src.models.model_network import NetworkModel
 
 from src.models.model_base import ModelBase
+from src.services.polling.device_health import DeviceHealth, DeviceHealthRegistry
 from src.utils.model_utils import validate_json
 
 
 class DeviceModel(ModelBase):
     __tablename__ = 'devices'
     uuid = db.Column(db.String(80), primary_key=True, nullable=False)
-    network_uuid = db.Column(db.String, db.ForeignKey('networks.uuid'), nullable=False)
+    network_uuid = db.Column(db.String, db.ForeignKey('networks.uuid'), nullable=False, index=True)
     name = db.Column(db.String(80), nullable=False)
     enable = db.Column(db.Boolean(), nullable=False)
     fault = db.Column(db.Boolean(), nullable=True)
@@ -26,6 +27,9 @@ class DeviceModel(ModelBase):
     zero_based = db.Column(db.Boolean(), nullable=False, default=False)
     ping_point = db.Column(db.String(10))
     supports_multiple_rw = db.Column(db.Boolean(), nullable=False, default=False)
+    polling_interval = db.Column(db.Float(), nullable=True)
+    max_register_gap = db.Column(db.Integer(), nullable=False, default=0)
+    max_block_size = db.Column(db.Integer(), nullable=True)
     points = db.relationship('PointModel', cascade="all,delete", backref='device', lazy=True)
 
     __table_args__ = (
@@ -36,6 +40,10 @@ class DeviceModel(ModelBase):
     def __repr__(self):
         return f"Device(uuid = {self.uuid})"
 
+    @property
+    def health(self) -> DeviceHealth:
+        return DeviceHealthRegistry().get_health(self.uuid)
+
     @validates('tags')
     def validate_tags(self, _, value):
         """
@@ -64,6 +72,24 @@ class DeviceModel(ModelBase):
         PointModel.create_temporary_from_string(value)
         return value
 
+    @validates('polling_interval')
+    def validate_polling_interval(self, _, value):
+        if value is not None and value <= 0:
+            raise ValueError('polling_interval should be greater than 0')
+        return value
+
+    @validates('max_register_gap')
+    def validate_max_register_gap(self, _, value):
+        if value is not None and value < 0:
+            raise ValueError('max_register_gap should be greater than or equal to 0')
+        return value
+
+    @validates('max_block_size')
+    def validate_max_block_size(self, _, value):
+        if value is not None and value <= 0:
+            raise ValueError('max_block_size should be greater than 0')
+        return value
+
     def check_self(self) -> (bool, any):
         super().check_self()
         if self.network_uuid is None:  # for temporary models
@@ -72,9 +98,12 @@ class DeviceModel(ModelBase):
         # can't get sqlalchemy column default to do this so this is solution
         if network is None:
             raise NotFoundException(f'No network found with uuid {self.network_uuid}')
+        self.apply_network(network)
+        return True
+
+    def apply_network(self, network: NetworkModel):
         self.type = network.type
         self.network_uuid_constraint = self.network_uuid
-        return True
 
     @classmethod
     def find_by_name(cls, network_name: str, device_name: str):
@@ -16,7 +16,7 @@ class MPGBPMapping(ModelBase):
     __tablename__ = 'mappings_mp_gbp'
 
     uuid = db.Column(db.String, primary_key=True)
-    point_uuid = db.Column(db.String, db.ForeignKey('points.uuid'), nullable=False)
+    point_uuid = db.Column(db.String, db.ForeignKey('points.uuid'), nullable=False, index=True)
     mapped_point_uuid = db.Column(db.String(80), nullable=True, unique=True)
     point_name = db.Column(db.String(80), nullable=False)
     mapped_point_name = db.Column(db.String(80), nullable=True)
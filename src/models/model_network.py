@@ -4,7 +4,7 @@ from sqlalchemy import UniqueConstraint
 from sqlalchemy.orm import validates
 
 from src import db
-from src.enums.network import ModbusType, ModbusRtuParity
+from src.enums.network import ModbusType, ModbusRtuParity, ModbusTcpTransport
 from src.models.model_base import ModelBase
 from src.utils.model_utils import validate_json
 
@@ -22,8 +22,11 @@ class NetworkModel(ModelBase):
     rtu_stop_bits = db.Column(db.Integer(), default=1)
     rtu_parity = db.Column(db.Enum(ModbusRtuParity), default=ModbusRtuParity.N)
     rtu_byte_size = db.Column(db.Integer(), default=8)
+    rtu_learn_turnaround = db.Column(db.Boolean(), nullable=False, default=False)
     tcp_ip = db.Column(db.String(80))
     tcp_port = db.Column(db.Integer())
+    tcp_max_in_flight = db.Column(db.Integer(), nullable=False, default=1)
+    tcp_transport = db.Column(db.Enum(ModbusTcpTransport), nullable=False, default=ModbusTcpTransport.SYNC)
     type = db.Column(db.Enum(ModbusType), nullable=False)
     timeout = db.Column(db.Integer(), nullable=False, default=3)
     polling_interval_runtime = db.Column(db.Integer(), default=2)
@@ -58,6 +61,20 @@ class NetworkModel(ModelBase):
             raise ValueError("name should be alphanumeric and can contain '_', '-'")
         return value
 
+    @validates('tcp_max_in_flight')
+    def validate_tcp_max_in_flight(self, _, value):
+        if value is not None and value < 1:
+            raise ValueError('tcp_max_in_flight should be greater than or equal to 1')
+        return value
+
+    @validates('tcp_transport')
+    def validate_tcp_transport(self, _, value):
+        if isinstance(value, ModbusTcpTransport):
+            return value
+        if not value or value not in ModbusTcpTransport.__members__:
+            raise ValueError('Invalid tcp transport')
+        return ModbusTcpTransport[value]
+
     @validates('type')
     def validate_type(self, _, value):
         if value == ModbusType.RTU.name:
@@ -1,8 +1,9 @@
-import random
+import logging
 import re
+from typing import Dict, List, Set, Union
 
-from sqlalchemy import UniqueConstraint
-from sqlalchemy.orm import validates
+from sqlalchemy import UniqueConstraint, event, or_
+from sqlalchemy.orm import contains_eager, selectinload, validates
 
 from src import db
 from src.enums.drivers import Drivers
@@ -12,15 +13,21 @@ from src.models.model_point_store import PointStoreModel
 from src.models.model_priority_array import PriorityArrayModel
 
 from src.models.model_base import ModelBase
-from src.utils.math_functions import eval_arithmetic_expression
+from src.services.polling.vectorized import is_vectorizable, compute_values_vectorized
+from src.services.polling.write_queue import PointWriteQueue
+from src.utils.math_functions import compile_arithmetic_expression, validate_arithmetic_expression
 from src.utils.model_utils import validate_json
 
+logger = logging.getLogger(__name__)
+
+PRIORITY_ARRAY_KEYS: Set[str] = {f'_{priority}' for priority in range(1, 17)}
+
 
 class PointModel(ModelBase):
     __tablename__ = 'points'
     uuid = db.Column(db.String(80), primary_key=True, nullable=False)
     name = db.Column(db.String(80), nullable=False)
-    device_uuid = db.Column(db.String, db.ForeignKey('devices.uuid'), nullable=False)
+    device_uuid = db.Column(db.String, db.ForeignKey('devices.uuid'), nullable=False, index=True)
     enable = db.Column(db.Boolean(), nullable=False, default=True)
     writable = db.Column(db.Boolean, nullable=False, default=True)
     priority_array_write = db.relationship('PriorityArrayModel',
@@ -44,6 +51,7 @@ class PointModel(ModelBase):
     data_type = db.Column(db.Enum(ModbusDataType), nullable=False, default=ModbusDataType.RAW)
     data_endian = db.Column(db.Enum(ModbusDataEndian), nullable=False, default=ModbusDataEndian.BEB_LEW)
     write_value_once = db.Column(db.Boolean(), nullable=False, default=False)
+    polling_interval = db.Column(db.Float(), nullable=True)
     mp_gbp_mapping = db.relationship('MPGBPMapping', backref='point', lazy=True, uselist=False, cascade="all,delete")
 
     __table_args__ = (
@@ -62,11 +70,11 @@ class PointModel(ModelBase):
 
     @validates('value_operation')
     def validate_value_operation(self, _, value):
-        try:
-            if value and value.strip():
-                eval_arithmetic_expression(value.lower().replace('x', str(random.randint(1, 9))))
-        except Exception:
-            raise ValueError("Invalid value_operation, must be a valid arithmetic expression")
+        if value and value.strip():
+            try:
+                validate_arithmetic_expression(value.lower())
+            except ValueError as e:
+                raise ValueError(f"Invalid value_operation, {e}")
         return value
 
     @validates('tags')
@@ -151,20 +159,67 @@ class PointModel(ModelBase):
             raise ValueError("Invalid data endian")
         return ModbusDataEndian[value]
 
+    @validates('polling_interval')
+    def validate_polling_interval(self, _, value):
+        if value is not None and value <= 0:
+            raise ValueError('polling_interval should be greater than 0')
+        return value
+
     def update_point_value(self, point_store: PointStoreModel, cov_threshold: float = None) -> bool:
         if not point_store.fault:
             if cov_threshold is None:
                 cov_threshold = self.cov_threshold
-
-            value = point_store.value_original
-            if value is not None:
-                value = self.apply_scale(value, self.input_min, self.input_max, self.scale_min,
-                                         self.scale_max)
-                value = self.apply_value_operation(value, self.value_operation)
-                value = round(value, self.value_round)
-            point_store.value = self.apply_point_type(value)
+            self.compute_point_store_value(point_store)
         return point_store.update(cov_threshold)
 
+    def compute_point_store_value(self, point_store: PointStoreModel):
+        """
+        Scale, operate and round value_original into value
+        """
+        value = point_store.value_original
+        if value is not None:
+            value = self.apply_scale(value, self.input_min, self.input_max, self.scale_min,
+                                     self.scale_max)
+            value = self.apply_value_operation(value, self.value_operation)
+            value = round(value, self.value_round)
+        point_store.value = self.apply_point_type(value)
+
+    @classmethod
+    def update_point_values(cls, points: List['PointModel'], point_stores: List[PointStoreModel], device,
+                            network: NetworkModel) -> List['PointModel']:
+        """
+        Batch update_point_value() and publish_cov() of the points polled by one request
+        :return: changed points
+        """
+        values: Union[List[float], None] = None
+        if is_vectorizable(len(points)) and all(not point_store.fault and point_store.value_original is not None
+                                                for point_store in point_stores):
+            values = compute_values_vectorized(points, [point_store.value_original for point_store in point_stores])
+        if values is not None:
+            for point, point_store, value in zip(points, point_stores, values):
+                point_store.value = point.apply_point_type(round(value, point.value_round))
+        else:
+            for point, point_store in zip(points, point_stores):
+                if not point_store.fault:
+                    try:
+                        point.compute_point_store_value(point_store)
+                    except Exception as e:
+                        # i.e. a value_operation dividing by a zero reading, only that point is faulted
+                        logger.error(f'Point {point.uuid} value computation failed: {e}')
+                        point_store.value = None
+                        point_store.fault = True
+                        point_store.fault_message = f'Value computation failed: {e}'
+        updated: List[PointStoreModel] = PointStoreModel.update_many(point_stores,
+                                                                     [point.cov_threshold for point in points])
+        points_by_uuid: Dict[str, PointModel] = {point.uuid: point for point in points}
+        updated_points: List[PointModel] = [points_by_uuid[point_store.point_uuid] for point_store in updated]
+        for point, point_store in zip(updated_points, updated):
+            try:
+                point.publish_cov(point_store, device, network)
+            except Exception as e:
+                logger.error(f'Point {point.uuid} COV publish failed: {e}')
+        return updated_points
+
     def save_to_db(self):
         self.point_store = PointStoreModel.create_new_point_store_model(self.uuid)
         super().save_to_db()
@@ -189,7 +244,7 @@ class PointModel(ModelBase):
         else:
             self.writable = False
             if self.priority_array_write and self.priority_array_write.point_uuid:
-                self.priority_array_write.delete_from_db()
+                db.session.delete(self.priority_array_write)
 
         data_type = self.data_type
         if not isinstance(data_type, ModbusDataType):
@@ -204,6 +259,8 @@ class PointModel(ModelBase):
         if data_type == ModbusDataType.FLOAT or data_type == ModbusDataType.INT32 or \
                 data_type == ModbusDataType.UINT32:
             self.register_length = 2
+        elif data_type == ModbusDataType.DOUBLE:
+            self.register_length = 4
 
         return True
 
@@ -254,26 +311,71 @@ class PointModel(ModelBase):
             self.publish_cov(point_store)
 
     def update_priority_value(self, value: float, priority: int, priority_array_write: dict):
+        priority_array_write = self.get_priority_array_write(value, priority, priority_array_write)
+        priority_array: PriorityArrayModel = PriorityArrayModel.find_by_point_uuid(self.uuid)
+        if priority_array:
+            priority_array.update(**priority_array_write)
+            self.__queue_write()
+
+    @classmethod
+    def update_priority_values(cls, writes: List[tuple]):
+        """
+        Batch update_priority_value() of points loaded with their priority array, committed at once
+        :param writes: (point, priority_array_write) from get_priority_array_write(), applied in order
+        """
+        queued: Dict[str, str] = {}
+        for point, priority_array_write in writes:
+            if point.priority_array_write:
+                point.priority_array_write.apply(**priority_array_write)
+                if point.__is_write_queued():
+                    queued[point.uuid] = point.device.network_uuid
+        db.session.commit()
+        for point_uuid, network_uuid in queued.items():
+            PointWriteQueue().enqueue(network_uuid, point_uuid)
+
+    @staticmethod
+    def get_priority_array_write(value: float, priority: int, priority_array_write: dict) -> dict:
         if priority_array_write:
-            priority_array: PriorityArrayModel = PriorityArrayModel.find_by_point_uuid(self.uuid)
-            if priority_array:
-                priority_array.update(**priority_array_write)
-            return
+            return priority_array_write
         if not priority:
             priority = 16
         if priority not in range(1, 17):
             raise ValueError('priority should be in range(1, 17)')
-        if priority:
-            priority_array: PriorityArrayModel = PriorityArrayModel.find_by_point_uuid(self.uuid)
-            if priority_array:
-                priority_array.update(**{f"_{priority}": value})
+        return {f"_{priority}": value}
+
+    @staticmethod
+    def validate_priority_array_write(priority_array_write) -> dict:
+        """
+        :return: priority_array_write with float values, ValueError unless it only has _1.._16 keys of numeric or None
+                 values
+        """
+        if not isinstance(priority_array_write, dict):
+            raise ValueError('priority_array_write should be an object')
+        validated: dict = {}
+        for key, value in priority_array_write.items():
+            if key not in PRIORITY_ARRAY_KEYS:
+                raise ValueError(f'priority_array_write key {key} should be one of _1.._16')
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                raise ValueError(f'priority_array_write {key} should be a number or null')
+            validated[key] = None if value is None else float(value)
+        return validated
+
+    def __queue_write(self):
+        """
+        Writes are pushed to the device by the network poller ahead of its scheduled reads
+        """
+        if self.__is_write_queued():
+            PointWriteQueue().enqueue(self.device.network_uuid, self.uuid)
+
+    def __is_write_queued(self) -> bool:
+        return self.enable and self.is_writable(self.function_code)
 
     @classmethod
     def apply_value_operation(cls, original_value, value_operation: str) -> float or None:
         """Do calculations on original value with the help of point details"""
         if original_value is None or value_operation is None or not value_operation.strip():
             return original_value
-        return eval_arithmetic_expression(value_operation.lower().replace('x', str(original_value)))
+        return compile_arithmetic_expression(value_operation.lower())(original_value)
 
     @classmethod
     def apply_scale(cls, value: float, input_min: float, input_max: float, output_min: float, output_max: float) \
@@ -319,6 +421,40 @@ class PointModel(ModelBase):
             .first()
         return results
 
+    @classmethod
+    def find_all_by_uuids_and_names(cls, uuids: List[str], names: List[tuple]) -> List['PointModel']:
+        """
+        Points of the uuids and of the (network_name, device_name, point_name) names, with their device, network and
+        priority array, in one query
+        """
+        from src.models.model_device import DeviceModel
+        if not uuids and not names:
+            return []
+        points: List[PointModel] = cls.query \
+            .join(PointModel.device) \
+            .join(DeviceModel.network) \
+            .outerjoin(PointModel.priority_array_write) \
+            .options(contains_eager(PointModel.device).contains_eager(DeviceModel.network),
+                     contains_eager(PointModel.priority_array_write)) \
+            .filter(or_(PointModel.uuid.in_(uuids), PointModel.name.in_({name[2] for name in names}))) \
+            .all()
+        uuid_set: Set[str] = set(uuids)
+        name_set: Set[tuple] = set(names)
+        return [point for point in points if point.uuid in uuid_set or
+                (point.device.network.name, point.device.name, point.name) in name_set]
+
+    @classmethod
+    def find_all_by_device_uuids(cls, device_uuids: List[str]) -> List['PointModel']:
+        """
+        Points of the devices, with their priority array and point store loaded in the same go
+        """
+        if not device_uuids:
+            return []
+        return cls.query \
+            .options(selectinload(PointModel.priority_array_write), selectinload(PointModel.point_store)) \
+            .filter(PointModel.device_uuid.in_(device_uuids)) \
+            .all()
+
     @staticmethod
     def is_writable(value: ModbusFunctionCode) -> bool:
         return value in [ModbusFunctionCode.WRITE_COIL, ModbusFunctionCode.WRITE_COILS,
@@ -328,3 +464,9 @@ class PointModel(ModelBase):
     def is_writable_by_str(value: str) -> bool:
         return value in [ModbusFunctionCode.WRITE_COIL.name, ModbusFunctionCode.WRITE_COILS.name,
                          ModbusFunctionCode.WRITE_REGISTER.name, ModbusFunctionCode.WRITE_REGISTERS.name]
+
+
+@event.listens_for(PointModel, 'after_delete')
+def evict_mqtt_topics(_, __, target: PointModel):
+    from src.services.mqtt_client import MqttClient
+    MqttClient().evict_topics(target.uuid)
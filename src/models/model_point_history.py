@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import bindparam, text
+
+from src import db
+
+
+class PointHistoryModel(db.Model):
+    """
+    One minute roll-up of the samples of a point
+    """
+    __tablename__ = 'point_histories'
+    point_uuid = db.Column(db.String, db.ForeignKey('points.uuid', ondelete='CASCADE'), primary_key=True,
+                           nullable=False)
+    ts = db.Column(db.DateTime(), primary_key=True, nullable=False, index=True)
+    value_min = db.Column(db.Float(), nullable=False)
+    value_max = db.Column(db.Float(), nullable=False)
+    value_avg = db.Column(db.Float(), nullable=False)
+    count = db.Column(db.Integer(), nullable=False)
+
+    def __repr__(self):
+        return f"PointHistory(point_uuid = {self.point_uuid}, ts = {self.ts})"
+
+    @classmethod
+    def find_by_point_uuid(cls, point_uuid: str, start: datetime, end: datetime) -> List['PointHistoryModel']:
+        return cls.query.filter(cls.point_uuid == point_uuid, cls.ts >= start, cls.ts < end) \
+            .order_by(cls.ts).all()
+
+    @classmethod
+    def write_rows(cls, rows: List[dict]):
+        """
+        Upsert many roll-ups with one executemany statement, the caller commits.
+        A roll-up of a minute which is there already (i.e. written again after a restart) is merged into it, instead of
+        failing the whole batch.
+        """
+        statement = text(
+            'INSERT INTO point_histories (point_uuid, ts, value_min, value_max, value_avg, count) '
+            'VALUES (:point_uuid, :ts, :value_min, :value_max, :value_avg, :count) '
+            'ON CONFLICT (point_uuid, ts) DO UPDATE SET '
+            'value_min = CASE WHEN excluded.value_min < point_histories.value_min '
+            'THEN excluded.value_min ELSE point_histories.value_min END, '
+            'value_max = CASE WHEN excluded.value_max > point_histories.value_max '
+            'THEN excluded.value_max ELSE point_histories.value_max END, '
+            'value_avg = (point_histories.value_avg * point_histories.count + excluded.value_avg * excluded.count) / '
+            '(point_histories.count + excluded.count), '
+            'count = point_histories.count + excluded.count'
+        ).bindparams(bindparam('ts', type_=db.DateTime()))
+        db.session.execute(statement, rows)
+
+    @classmethod
+    def delete_older_than(cls, ts: datetime):
+        db.session.execute(cls.__table__.delete().where(cls.ts < ts))
@@ -1,19 +1,24 @@
 import json
 from ast import literal_eval
-from typing import List
+from typing import Dict, List, Union
 
 import gevent
 from flask import Response
 from rubix_http.method import HttpMethod
 from rubix_http.request import gw_request
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, event, bindparam, select
 
 from src import db
 from src.enums.mapping import MapType, MappingState
-from src.models.model_mapping import MPGBPMapping
 from src.models.model_priority_array import PriorityArrayModel
+from src.services.mapping_index import MappedPoint, MappingIndex
 from src.utils.model_utils import get_datetime
 
+"""
+Columns of the latest state of a point, kept in memory by COV evaluations
+"""
+STATE_COLUMNS: List[str] = ['value', 'value_original', 'value_raw', 'fault', 'fault_message', 'ts_value', 'ts_fault']
+
 
 class PointStoreModel(db.Model):
     __tablename__ = 'point_stores'
@@ -46,6 +51,106 @@ class PointStoreModel(db.Model):
             return None
 
     def update(self, cov_threshold: float = None) -> bool:
+        from src.services.point_history import PointHistory
+        from src.services.point_store_cache import PointStoreCache
+        if not self.fault:
+            PointHistory().record(self.point_uuid, self.value)
+        point_store_cache = PointStoreCache()
+        if point_store_cache.enabled:
+            updated: bool = point_store_cache.update(self, cov_threshold)
+        else:
+            updated: bool = self.__update_db(cov_threshold)
+        if updated:
+            """Modbus > Generic | BACnet point value"""
+            self.__sync_point_value_mp_to_gbp_process()
+        return updated
+
+    @classmethod
+    def update_many(cls, point_stores: List['PointStoreModel'], cov_thresholds: List[float]) -> \
+            List['PointStoreModel']:
+        """
+        Batch update(), changed rows are written with a single statement and commit
+        :return: changed point stores
+        """
+        from src.services.point_history import PointHistory
+        from src.services.point_store_cache import PointStoreCache
+        point_history = PointHistory()
+        for point_store in point_stores:
+            if not point_store.fault:
+                point_history.record(point_store.point_uuid, point_store.value)
+        point_store_cache = PointStoreCache()
+        if point_store_cache.enabled:
+            updated: List[PointStoreModel] = [point_store for point_store, cov_threshold in
+                                              zip(point_stores, cov_thresholds)
+                                              if point_store_cache.update(point_store, cov_threshold)]
+        else:
+            updated: List[PointStoreModel] = cls.__update_many_db(point_stores, cov_thresholds)
+        if updated:
+            """Modbus > Generic | BACnet points values"""
+            cls.__sync_many_point_values_mp_to_gbp_process(updated)
+        return updated
+
+    @classmethod
+    def __update_many_db(cls, point_stores: List['PointStoreModel'], cov_thresholds: List[float]) -> \
+            List['PointStoreModel']:
+        states: Dict[str, dict] = cls.find_states([point_store.point_uuid for point_store in point_stores])
+        ts = get_datetime()
+        updated: List[PointStoreModel] = [point_store for point_store, cov_threshold in zip(point_stores, cov_thresholds)
+                                          if point_store.point_uuid in states and
+                                          point_store.apply_cov(states[point_store.point_uuid], cov_threshold, ts)]
+        if updated:
+            cls.write_states({point_store.point_uuid: states[point_store.point_uuid] for point_store in updated})
+            db.session.commit()
+        return updated
+
+    def apply_cov(self, state: dict, cov_threshold: Union[float, None], ts) -> bool:
+        """
+        In memory counterpart of the conditional UPDATE of update(), state holds the STATE_COLUMNS of the stored row and
+        gets updated when this point store is a change of value
+        """
+        if not self.fault:
+            self.fault = False
+            if not (state['value'] is None or state['fault'] or (
+                    cov_threshold is not None and self.value is not None and
+                    abs(state['value'] - self.value) >= cov_threshold and state['value'] != self.value)):
+                return False
+            state.update(value=self.value, value_original=self.value_original, value_raw=self.value_raw,
+                         fault=False, fault_message=None, ts_value=ts)
+            self.ts_value = ts
+        else:
+            # None fault_message compares like SQL NULL, i.e. never as a change
+            if not (not state['fault'] or (
+                    state['fault_message'] is not None and self.fault_message is not None and
+                    state['fault_message'] != self.fault_message)):
+                return False
+            state.update(fault=True, fault_message=self.fault_message, ts_fault=ts)
+            self.ts_fault = ts
+        return True
+
+    @classmethod
+    def find_states(cls, point_uuids: List[str] = None) -> Dict[str, dict]:
+        """
+        STATE_COLUMNS of the given or all rows, by point_uuid
+        """
+        table = cls.__table__
+        query = select([table.c.point_uuid] + [table.c[column] for column in STATE_COLUMNS])
+        if point_uuids is not None:
+            query = query.where(table.c.point_uuid.in_(point_uuids))
+        return {row['point_uuid']: {column: row[column] for column in STATE_COLUMNS}
+                for row in db.session.execute(query)}
+
+    @classmethod
+    def write_states(cls, states: Dict[str, dict]):
+        """
+        Write STATE_COLUMNS of many rows with one executemany UPDATE, the caller commits
+        """
+        table = cls.__table__
+        db.session.execute(table.update()
+                           .where(table.c.point_uuid == bindparam('b_point_uuid'))
+                           .values({column: bindparam(column) for column in STATE_COLUMNS}),
+                           [{'b_point_uuid': point_uuid, **state} for point_uuid, state in states.items()])
+
+    def __update_db(self, cov_threshold: float = None) -> bool:
         ts = get_datetime()
         if not self.fault:
             self.fault = bool(self.fault)
@@ -78,14 +183,7 @@ class PointStoreModel(db.Model):
             if res.rowcount:  # WARNING: this could cause secondary write to db is store if fetched/linked from DB
                 self.ts_fault = ts
         db.session.commit()
-        updated: bool = bool(res.rowcount)
-        if updated:
-            priority_array_write_obj = PriorityArrayModel.find_by_point_uuid(self.point_uuid)
-            priority_array_write: dict = priority_array_write_obj.to_dict() if priority_array_write_obj \
-                else {"_16": self.value}
-            """Modbus > Generic | BACnet point value"""
-            self.__sync_point_value_mp_to_gbp_process(priority_array_write)
-        return updated
+        return bool(res.rowcount)
 
     @staticmethod
     def __sync_point_value_gp_to_mp(modbus_point_uuid: str, priority_array_write: dict):
@@ -97,7 +195,7 @@ class PointStoreModel(db.Model):
         )
 
     def __sync_point_value_gp_to_mp_process(self, priority_array_write: dict):
-        mapping: MPGBPMapping = MPGBPMapping.find_by_mapped_point_uuid_type(self.point_uuid, MapType.GENERIC)
+        mapping: MappedPoint = MappingIndex().find_by_mapped_point_uuid_type(self.point_uuid, MapType.GENERIC)
         if mapping and mapping.mapping_state == MappingState.MAPPED:
             gevent.spawn(self.__sync_point_value_gp_to_mp, mapping.point_uuid, priority_array_write)
 
@@ -116,38 +214,76 @@ class PointStoreModel(db.Model):
 
     @staticmethod
     def sync_point_value_with_mapping_mp_to_gbp(map_type: str, mapped_point_uuid: str, priority_array_write: dict,
-                                                gp: bool = True, bp: bool = True, ):
+                                                gp: bool = True, bp: bool = True, ) -> Union[Response, None]:
         priority_array_write.pop('point_uuid', None)
         if map_type in (MapType.GENERIC.name, MapType.GENERIC) and gp:
-            gw_request(
+            return gw_request(
                 api=f"/ps/api/generic/points_value/uuid/{mapped_point_uuid}",
                 body={"priority_array_write": priority_array_write},
                 http_method=HttpMethod.PATCH
             )
         elif map_type in (MapType.BACNET.name, MapType.BACNET) and bp:
-            gw_request(
+            return gw_request(
                 api=f"/bacnet/api/bacnet/points/uuid/{mapped_point_uuid}",
                 body={"priority_array_write": priority_array_write},
                 http_method=HttpMethod.PATCH
             )
+        return None
 
-    def __sync_point_value_mp_to_gbp_process(self, priority_array_write: dict, gp: bool = True, bp: bool = True):
-        mapping: MPGBPMapping = MPGBPMapping.find_by_point_uuid(self.point_uuid)
+    def __sync_point_value_mp_to_gbp_process(self, priority_array_write: Union[dict, None] = None, gp: bool = True,
+                                             bp: bool = True):
+        mapping: MappedPoint = MappingIndex().find_by_point_uuid(self.point_uuid)
         if mapping and mapping.mapping_state == MappingState.MAPPED:
-            gevent.spawn(
-                self.sync_point_value_with_mapping_mp_to_gbp,
-                mapping.type, mapping.mapped_point_uuid, priority_array_write,
-                gp, bp
-            )
+            if priority_array_write is None:
+                priority_array_write_obj = PriorityArrayModel.find_by_point_uuid(self.point_uuid)
+                priority_array_write = priority_array_write_obj.to_dict() if priority_array_write_obj \
+                    else {"_16": self.value}
+            from src.services.mapping_sync import MappingSyncOutbox
+            MappingSyncOutbox().enqueue(mapping.type, mapping.mapped_point_uuid, priority_array_write, gp, bp)
 
     @classmethod
-    def sync_points_values_mp_to_gbp_process(cls, gp: bool = True, bp: bool = True):
-        mappings: List[MPGBPMapping] = MPGBPMapping.find_all()
+    def __sync_many_point_values_mp_to_gbp_process(cls, point_stores: List['PointStoreModel']):
+        from src.services.mapping_sync import MappingSyncOutbox
+        point_stores_by_uuid: Dict[str, PointStoreModel] = {point_store.point_uuid: point_store
+                                                             for point_store in point_stores}
+        mapping_index: MappingIndex = MappingIndex()
+        mappings: List[MappedPoint] = []
+        for point_uuid in point_stores_by_uuid:
+            mapping: Union[MappedPoint, None] = mapping_index.find_by_point_uuid(point_uuid)
+            if mapping and mapping.mapping_state == MappingState.MAPPED:
+                mappings.append(mapping)
+        if not mappings:
+            return
+        priority_arrays: Dict[str, PriorityArrayModel] = {
+            priority_array.point_uuid: priority_array for priority_array in PriorityArrayModel.query.filter(
+                PriorityArrayModel.point_uuid.in_([mapping.point_uuid for mapping in mappings]))}
         for mapping in mappings:
-            if mapping.mapping_state == MappingState.MAPPED:
-                point_store: PointStoreModel = PointStoreModel.find_by_point_uuid(mapping.point_uuid)
-                if point_store:
-                    priority_array_write_obj = point_store.point.priority_array_write
-                    priority_array_write: dict = priority_array_write_obj.to_dict() if priority_array_write_obj \
-                        else {"_16": point_store.value}
-                    point_store.__sync_point_value_mp_to_gbp_process(priority_array_write, gp, bp)
+            point_store: PointStoreModel = point_stores_by_uuid[mapping.point_uuid]
+            priority_array_write_obj = priority_arrays.get(mapping.point_uuid)
+            priority_array_write: dict = priority_array_write_obj.to_dict() if priority_array_write_obj \
+                else {"_16": point_store.value}
+            MappingSyncOutbox().enqueue(mapping.type, mapping.mapped_point_uuid, priority_array_write)
+
+    @classmethod
+    def sync_points_values_mp_to_gbp_process(cls, gp: bool = True, bp: bool = True) -> bool:
+        """
+        Start the bulk sync job of all the mapped points
+        :return: False when it is already running
+        """
+        from src.services.mapping_resync import MappingResync
+        return MappingResync().start(gp, bp)
+
+
+@event.listens_for(PointStoreModel, 'load')
+@event.listens_for(PointStoreModel, 'refresh')
+def apply_point_store_cache(target: PointStoreModel, *_):
+    from src.services.point_store_cache import PointStoreCache
+    PointStoreCache().apply(target)
+
+
+@event.listens_for(PointStoreModel, 'after_delete')
+def evict_point_store_cache(_, __, target: PointStoreModel):
+    from src.services.point_history import PointHistory
+    from src.services.point_store_cache import PointStoreCache
+    PointStoreCache().evict(target.point_uuid)
+    PointHistory().evict(target.point_uuid)
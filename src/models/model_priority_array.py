@@ -35,11 +35,14 @@ class PriorityArrayModel(db.Model):
         db.session.commit()
 
     def update(self, **kwargs):
+        self.apply(**kwargs)
+        db.session.commit()
+
+    def apply(self, **kwargs):
         for key, value in kwargs.items():
             if hasattr(self, key):
                 setattr(self, key, value)
         self.check_self()
-        db.session.commit()
 
     def check_self(self) -> (bool, any):
         if self.get_highest_priority_value_from_priority_array(self) is None:
@@ -0,0 +1,95 @@
+from typing import Dict, List, Set, Union
+
+import shortuuid
+from flask_restful.reqparse import request
+from rubix_http.exceptions.exception import BadDataException
+from rubix_http.resource import RubixResource
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from src import db
+from src.models.model_device import DeviceModel
+from src.models.model_network import NetworkModel
+from src.resources.device.device_base import device_marshaller
+from src.resources.rest_schema.schema_device import device_all_attributes
+from src.resources.utils import get_bulk_items, parse_bulk_item
+from src.services.polling.device_health import DeviceHealthRegistry
+from src.services.polling.read_plan import ReadPlanCache
+
+
+class DeviceBulkResource(RubixResource):
+    """
+    Creates or updates a list of devices (JSON or text/csv), matched by uuid else by network_uuid and name.
+    Items are validated in memory against the networks and devices loaded up front, then saved in one transaction, or
+    none of them when one is invalid.
+    """
+
+    @classmethod
+    def post(cls):
+        items: List[dict] = get_bulk_items()
+        uuids: Set[str] = {item['uuid'] for item in items if item.get('uuid')}
+        network_uuids: Set[str] = {item['network_uuid'] for item in items if item.get('network_uuid')}
+        existing: List[DeviceModel] = DeviceModel.query \
+            .filter(or_(DeviceModel.uuid.in_(uuids), DeviceModel.network_uuid.in_(network_uuids))).all()
+        network_uuids.update(device.network_uuid for device in existing)
+        networks: Dict[str, NetworkModel] = {
+            network.uuid: network for network in NetworkModel.query.filter(NetworkModel.uuid.in_(network_uuids))}
+        devices_by_uuid: Dict[str, DeviceModel] = {device.uuid: device for device in existing}
+        devices_by_name: Dict[tuple, DeviceModel] = {(device.network_uuid, device.name): device
+                                                     for device in existing}
+        devices: List[DeviceModel] = []
+        updated: List[str] = []
+        errors: List[str] = []
+        with db.session.no_autoflush:
+            for index, item in enumerate(items):
+                try:
+                    device: Union[DeviceModel, None] = devices_by_uuid.get(item['uuid']) if item.get('uuid') else \
+                        devices_by_name.get((item.get('network_uuid'), item.get('name')))
+                    if item.get('uuid') and not device:
+                        raise ValueError(f'no device found with uuid {item["uuid"]}')
+                    data: dict = parse_bulk_item(item, device_all_attributes, required=device is None)
+                    if device is None:
+                        device = DeviceModel(uuid=shortuuid.uuid(), **data)
+                        db.session.add(device)
+                    else:
+                        for key, value in data.items():
+                            setattr(device, key, value)
+                        updated.append(device.uuid)
+                    network: Union[NetworkModel, None] = networks.get(device.network_uuid)
+                    if network is None:
+                        raise ValueError(f'no network found with uuid {device.network_uuid}')
+                    device.apply_network(network)
+                    devices.append(device)
+                except (TypeError, ValueError) as e:
+                    errors.append(f'item {index}: {e}')
+            errors.extend(cls.__check_unique(existing, devices))
+        if errors:
+            db.session.rollback()
+            raise BadDataException('; '.join(errors))
+        device_uuids: List[str] = [device.uuid for device in devices]
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            raise BadDataException(f'Devices conflict with the existing ones: {e.orig}')
+        for device_uuid in updated:
+            ReadPlanCache().invalidate_device(device_uuid)
+            DeviceHealthRegistry().reset(device_uuid)
+        # reload the committed devices at once, rather than one by one on marshalling
+        devices_by_uuid = {device.uuid: device for device in
+                           DeviceModel.query.filter(DeviceModel.uuid.in_(device_uuids))}
+        return device_marshaller([devices_by_uuid[device_uuid] for device_uuid in device_uuids], request.args)
+
+    @staticmethod
+    def __check_unique(existing: List[DeviceModel], devices: List[DeviceModel]) -> List[str]:
+        errors: List[str] = []
+        names: Dict[tuple, str] = {}
+        addresses: Dict[tuple, str] = {}
+        for device in set(existing).union(devices):
+            name_key: tuple = (device.network_uuid, device.name)
+            address_key: tuple = (device.network_uuid, device.address)
+            if names.setdefault(name_key, device.uuid) != device.uuid:
+                errors.append(f'device name {device.name} is duplicated in network {device.network_uuid}')
+            if addresses.setdefault(address_key, device.uuid) != device.uuid:
+                errors.append(f'device address {device.address} is duplicated in network {device.network_uuid}')
+        return errors
@@ -5,6 +5,8 @@ from rubix_http.exceptions.exception import NotFoundException
 from src.models.model_device import DeviceModel
 from src.resources.device.device_base import DeviceBaseResource, device_marshaller
 from src.resources.rest_schema.schema_device import device_all_attributes
+from src.services.polling.device_health import DeviceHealthRegistry
+from src.services.polling.read_plan import ReadPlanCache
 
 
 class DeviceSingularResource(DeviceBaseResource):
@@ -30,6 +32,8 @@ class DeviceSingularResource(DeviceBaseResource):
             return device_marshaller(cls.add_device(data), request.args)
 
         device.update(**data)
+        ReadPlanCache().invalidate_device(device.uuid)
+        DeviceHealthRegistry().reset(device.uuid)
         return device_marshaller(cls.get_device(**kwargs), request.args)
 
     @classmethod
@@ -39,6 +43,8 @@ class DeviceSingularResource(DeviceBaseResource):
         if device is None:
             raise NotFoundException(f"Does not exist {kwargs}")
         device.update(**data)
+        ReadPlanCache().invalidate_device(device.uuid)
+        DeviceHealthRegistry().reset(device.uuid)
         return device_marshaller(cls.get_device(**kwargs), request.args)
 
     @classmethod
@@ -46,7 +52,10 @@ class DeviceSingularResource(DeviceBaseResource):
         device: DeviceModel = cls.get_device(**kwargs)
         if not device:
             raise NotFoundException(f'Not found {kwargs}')
+        device_uuid: str = device.uuid
         device.delete_from_db()
+        ReadPlanCache().invalidate_device(device_uuid)
+        DeviceHealthRegistry().reset(device_uuid)
         return '', 204
 
     @classmethod
@@ -5,6 +5,7 @@ from rubix_http.exceptions.exception import NotFoundException
 from src.models.model_network import NetworkModel
 from src.resources.network.network_base import NetworkBaseResource, modbus_network_marshaller
 from src.resources.rest_schema.schema_network import network_all_attributes
+from src.services.polling.read_plan import ReadPlanCache
 
 
 class NetworkSingularResource(NetworkBaseResource):
@@ -47,6 +48,7 @@ class NetworkSingularResource(NetworkBaseResource):
         if not network:
             raise NotFoundException(f"Not found {kwargs}")
         network.delete_from_db()
+        ReadPlanCache().invalidate_all()
         return '', 204
 
     @classmethod
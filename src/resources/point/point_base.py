@@ -5,6 +5,7 @@ from rubix_http.resource import RubixResource
 from src.models.model_point import PointModel
 from src.resources.rest_schema.schema_point import point_all_attributes, add_nested_priority_array_write
 from src.models.model_priority_array import PriorityArrayModel
+from src.services.polling.read_plan import ReadPlanCache
 
 
 class PointBaseResource(RubixResource):
@@ -33,5 +34,6 @@ class PointBaseResource(RubixResource):
             **data
         )
         point.save_to_db()
+        ReadPlanCache().invalidate_device(point.device_uuid)
         point.publish_cov(point.point_store)
         return point
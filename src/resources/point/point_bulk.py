@@ -0,0 +1,143 @@
+from typing import Dict, List, Set, Union
+
+import shortuuid
+from flask_restful import marshal_with
+from rubix_http.exceptions.exception import BadDataException
+from rubix_http.resource import RubixResource
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+
+from src import db
+from src.enums.drivers import Drivers
+from src.models.model_device import DeviceModel
+from src.models.model_point import PointModel
+from src.models.model_point_store import PointStoreModel
+from src.models.model_priority_array import PriorityArrayModel
+from src.resources.rest_schema.schema_point import point_all_fields, point_all_attributes
+from src.resources.utils import get_bulk_items, parse_bulk_item
+from src.services.mqtt_client import MqttClient
+from src.services.polling.read_plan import ReadPlanCache
+
+
+class PointBulkResource(RubixResource):
+    """
+    Creates or updates a list of points (JSON or text/csv), matched by uuid else by device_uuid and name, i.e. to
+    import a device template.
+    Items are validated in memory against the devices and points loaded up front, then saved in one transaction, or
+    none of them when one is invalid; the COVs of the created and updated points are published in a batch per device.
+    """
+
+    @classmethod
+    @marshal_with(point_all_fields)
+    def post(cls):
+        items: List[dict] = get_bulk_items()
+        uuids: Set[str] = {item['uuid'] for item in items if item.get('uuid')}
+        device_uuids: Set[str] = {item['device_uuid'] for item in items if item.get('device_uuid')}
+        if uuids:
+            device_uuids.update(device_uuid for device_uuid, in db.session.query(PointModel.device_uuid)
+                                .filter(PointModel.uuid.in_(uuids)).distinct())
+        devices: Dict[str, DeviceModel] = {device.uuid: device for device in DeviceModel.query
+                                           .options(joinedload(DeviceModel.network))
+                                           .filter(DeviceModel.uuid.in_(device_uuids))}
+        existing: List[PointModel] = PointModel.find_all_by_device_uuids(list(devices))
+        points_by_uuid: Dict[str, PointModel] = {point.uuid: point for point in existing}
+        points_by_name: Dict[tuple, PointModel] = {(point.device_uuid, point.name): point for point in existing}
+        points: List[PointModel] = []
+        touched_device_uuids: Set[str] = set()
+        errors: List[str] = []
+        with db.session.no_autoflush:
+            for index, item in enumerate(items):
+                try:
+                    point: Union[PointModel, None] = points_by_uuid.get(item['uuid']) if item.get('uuid') else \
+                        points_by_name.get((item.get('device_uuid'), item.get('name')))
+                    if item.get('uuid') and not point:
+                        raise ValueError(f'no point found with uuid {item["uuid"]}')
+                    data: dict = parse_bulk_item(item, point_all_attributes, required=point is None)
+                    priority_array_write: dict = {key: None if value is None else float(value)
+                                                  for key, value in (data.pop('priority_array_write', None) or
+                                                                     {}).items()}
+                    if point is None:
+                        point = cls.__create_point(data, priority_array_write)
+                    else:
+                        # point could get moved to another device
+                        touched_device_uuids.add(point.device_uuid)
+                        cls.__update_point(point, data, priority_array_write)
+                    if point.device_uuid not in devices:
+                        raise ValueError(f'no device found with uuid {point.device_uuid}')
+                    touched_device_uuids.add(point.device_uuid)
+                    points.append(point)
+                except (TypeError, ValueError) as e:
+                    errors.append(f'item {index}: {e}')
+            errors.extend(cls.__check_unique(existing, points))
+        if errors:
+            db.session.rollback()
+            raise BadDataException('; '.join(errors))
+        point_uuids: List[str] = [point.uuid for point in points]
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            raise BadDataException(f'Points conflict with the existing ones: {e.orig}')
+        for device_uuid in touched_device_uuids:
+            ReadPlanCache().invalidate_device(device_uuid)
+        return cls.__publish_points(point_uuids, touched_device_uuids)
+
+    @staticmethod
+    def __create_point(data: dict, priority_array_write: dict) -> PointModel:
+        uuid: str = shortuuid.uuid()
+        priority_array: Union[PriorityArrayModel, None] = None
+        if PointModel.is_writable_by_str(data['function_code']):
+            priority_array = PriorityArrayModel.create_priority_array_model(uuid, priority_array_write,
+                                                                            data.get('fallback_value'))
+        point: PointModel = PointModel.create_temporary(uuid=uuid, priority_array_write=priority_array, **data)
+        point.point_store = PointStoreModel.create_new_point_store_model(uuid)
+        point.check_self()
+        db.session.add(point)
+        return point
+
+    @staticmethod
+    def __update_point(point: PointModel, data: dict, priority_array_write: dict):
+        if not priority_array_write and \
+                not PriorityArrayModel.get_highest_priority_value_from_priority_array(point.priority_array_write):
+            priority_array_write = {'_16': data.get('fallback_value', None) or point.fallback_value}
+        if priority_array_write and point.priority_array_write:
+            point.priority_array_write.apply(**priority_array_write)
+        for key, value in data.items():
+            setattr(point, key, value)
+        point.check_self()
+
+    @staticmethod
+    def __check_unique(existing: List[PointModel], points: List[PointModel]) -> List[str]:
+        errors: List[str] = []
+        names: Dict[tuple, str] = {}
+        registers: Dict[tuple, str] = {}
+        for point in set(existing).union(points):
+            name_key: tuple = (point.device_uuid, point.name)
+            register_key: tuple = (point.device_uuid, point.register, point.function_code)
+            if names.setdefault(name_key, point.uuid) != point.uuid:
+                errors.append(f'point name {point.name} is duplicated in device {point.device_uuid}')
+            if registers.setdefault(register_key, point.uuid) != point.uuid:
+                errors.append(f'point register {point.register} {point.function_code.name} is duplicated in device '
+                              f'{point.device_uuid}')
+        return errors
+
+    @staticmethod
+    def __publish_points(point_uuids: List[str], device_uuids: Set[str]) -> List[PointModel]:
+        """
+        Reload the committed points at once, rather than one by one on publishing and marshalling
+        """
+        devices: Dict[str, DeviceModel] = {device.uuid: device for device in DeviceModel.query
+                                           .options(joinedload(DeviceModel.network))
+                                           .filter(DeviceModel.uuid.in_(device_uuids))}
+        points_by_uuid: Dict[str, PointModel] = {point.uuid: point for point in
+                                                 PointModel.find_all_by_device_uuids(list(device_uuids))}
+        points_by_device: Dict[str, List[PointModel]] = {}
+        for point_uuid in point_uuids:
+            point: PointModel = points_by_uuid[point_uuid]
+            points_by_device.setdefault(point.device_uuid, []).append(point)
+        for device_uuid, device_points in points_by_device.items():
+            device: DeviceModel = devices[device_uuid]
+            with MqttClient().batch_cov(Drivers.MODBUS.name, device.network, device):
+                for point in device_points:
+                    point.publish_cov(point.point_store, device, device.network)
+        return [points_by_uuid[point_uuid] for point_uuid in point_uuids]
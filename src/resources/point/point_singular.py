@@ -5,6 +5,7 @@ from src.models.model_point import PointModel
 from src.resources.point.point_base import PointBaseResource
 from src.resources.rest_schema.schema_point import point_all_fields, point_all_attributes
 from src.models.model_priority_array import PriorityArrayModel
+from src.services.polling.read_plan import ReadPlanCache
 
 
 class PointSingularResource(PointBaseResource):
@@ -47,7 +48,11 @@ class PointSingularResource(PointBaseResource):
             priority_array = PriorityArrayModel.find_by_point_uuid(point.uuid)
             if priority_array:
                 priority_array.update(**priority_array_write)
+        device_uuid: str = point.device_uuid
         point.update(**data)
+        # point could have been moved to another device
+        ReadPlanCache().invalidate_device(device_uuid)
+        ReadPlanCache().invalidate_device(point.device_uuid)
         return point
 
     @classmethod
@@ -65,7 +70,9 @@ class PointSingularResource(PointBaseResource):
         point.publish_cov(point.point_store, force_clear=True)
         if not point:
             raise NotFoundException('Modbus Point not found')
+        device_uuid: str = point.device_uuid
         point.delete_from_db()
+        ReadPlanCache().invalidate_device(device_uuid)
         return '', 204
 
     @classmethod
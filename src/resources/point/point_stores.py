@@ -1,8 +1,14 @@
+from datetime import timedelta, timezone
 from typing import List
 
+from flask_restful import reqparse, inputs
+from rubix_http.exceptions.exception import NotFoundException, BadDataException
+
 from src.models.model_point import PointModel
 from src.resources.point.point_base import PointBaseResource
 from src.models.model_point_store import PointStoreModel
+from src.services.point_history import PointHistory
+from src.utils.model_utils import get_datetime
 
 
 # TODO: move all to base point_store resource
@@ -30,6 +36,30 @@ class PointStoreResource(PointBaseResource):
             return get_point_store(point, point_store)
 
 
+class PointStoreHistoryResource(PointBaseResource):
+    """
+    start and end are ISO 8601 date times (default to the last hour), bucket is in seconds
+    """
+    get_parser = reqparse.RequestParser()
+    get_parser.add_argument('start', type=inputs.datetime_from_iso8601, location='args')
+    get_parser.add_argument('end', type=inputs.datetime_from_iso8601, location='args')
+    get_parser.add_argument('bucket', type=float, default=60, location='args')
+
+    @classmethod
+    def get(cls, uuid):
+        args = cls.get_parser.parse_args()
+        if PointModel.find_by_uuid(uuid) is None:
+            raise NotFoundException('Modbus Point not found')
+        end = to_utc(args['end']) if args['end'] else get_datetime()
+        start = to_utc(args['start']) if args['start'] else end - timedelta(hours=1)
+        if start >= end:
+            raise BadDataException('start should be before end')
+        try:
+            return PointHistory().query(uuid, start, end, args['bucket'])
+        except ValueError as e:
+            raise BadDataException(str(e))
+
+
 class DevicePointPluralPointStoreResource(PointBaseResource):
     @classmethod
     def get(cls, device_uuid):
@@ -48,3 +78,12 @@ def get_point_store(point: PointModel, point_store: PointStoreModel) -> dict:
         'fault': point_store.fault,
         'value': point_store.value
     }
+
+
+def to_utc(value):
+    """
+    Naive UTC, as the timestamps of the database
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
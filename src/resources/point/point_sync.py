@@ -2,6 +2,7 @@ from rubix_http.resource import RubixResource
 
 from src.background import Background
 from src.models.model_point_store import PointStoreModel
+from src.services.mapping_resync import MappingResync
 
 
 class MPToBPSync(RubixResource):
@@ -9,6 +10,7 @@ class MPToBPSync(RubixResource):
     @classmethod
     def get(cls):
         PointStoreModel.sync_points_values_mp_to_gbp_process(gp=False)
+        return MappingResync().to_dict()
 
 
 class MPSync(RubixResource):
@@ -16,3 +18,11 @@ class MPSync(RubixResource):
     @classmethod
     def get(cls):
         Background.sync_on_start()
+        return MappingResync().to_dict()
+
+
+class MPSyncStatus(RubixResource):
+
+    @classmethod
+    def get(cls):
+        return MappingResync().to_dict()
@@ -1,5 +1,7 @@
 from abc import abstractmethod
+from typing import Dict, List, Union
 
+from flask import request
 from flask_restful import reqparse
 from rubix_http.exceptions.exception import NotFoundException, BadDataException
 from rubix_http.resource import RubixResource
@@ -43,3 +45,53 @@ class PointNameValueWriterResource(PointValueWriterBaseResource):
     def get_point(cls, **kwargs) -> PointModel:
         return PointModel.find_by_name(kwargs.get('network_name'), kwargs.get('device_name'),
                                        kwargs.get('point_name'))
+
+
+class PointValueBulkWriterResource(RubixResource):
+    """
+    Writes of a list of {uuid | name, value, priority, priority_array_write} items, name being
+    network_name:device_name:point_name; they are all applied in one transaction, or none of them when one is invalid
+    """
+
+    @classmethod
+    def patch(cls):
+        items = request.get_json(silent=True)
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise BadDataException('Body should be a list of point writes')
+        uuids: List[str] = []
+        names: List[tuple] = []
+        for item in items:
+            if item.get('uuid'):
+                uuids.append(item['uuid'])
+            else:
+                names.append(cls.__parse_name(item.get('name')))
+        points: List[PointModel] = PointModel.find_all_by_uuids_and_names(uuids, names)
+        points_by_uuid: Dict[str, PointModel] = {point.uuid: point for point in points}
+        points_by_name: Dict[tuple, PointModel] = {
+            (point.device.network.name, point.device.name, point.name): point for point in points}
+        writes: List[tuple] = []
+        for item in items:
+            point: Union[PointModel, None] = points_by_uuid.get(item['uuid']) if item.get('uuid') else \
+                points_by_name.get(cls.__parse_name(item['name']))
+            if not point:
+                raise NotFoundException(f'Modbus Point {item.get("uuid") or item.get("name")} not found')
+            if not point.writable:
+                raise BadDataException(f'Point {point.uuid} is not writable')
+            try:
+                value: Union[float, None] = None if item.get('value') is None else float(item['value'])
+                priority: Union[int, None] = None if item.get('priority') is None else int(item['priority'])
+                priority_array_write: Union[dict, None] = None if item.get('priority_array_write') is None else \
+                    PointModel.validate_priority_array_write(item['priority_array_write'])
+                priority_array_write = PointModel.get_priority_array_write(value, priority, priority_array_write)
+            except (TypeError, ValueError) as e:
+                raise BadDataException(f'Invalid write of point {point.uuid}: {e}')
+            writes.append((point, priority_array_write))
+        PointModel.update_priority_values(writes)
+        return {}
+
+    @staticmethod
+    def __parse_name(name) -> tuple:
+        names = name.split(':') if isinstance(name, str) else []
+        if len(names) != 3:
+            raise BadDataException('name should be colon (:) delimited network_name:device_name:point_name')
+        return tuple(names)
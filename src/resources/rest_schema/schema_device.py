@@ -36,6 +36,15 @@ device_all_attributes = {
     },
     'supports_multiple_rw': {
         'type': bool,
+    },
+    'polling_interval': {
+        'type': float,
+    },
+    'max_register_gap': {
+        'type': int,
+    },
+    'max_block_size': {
+        'type': int,
     }
 }
 
@@ -53,6 +62,21 @@ device_return_attributes = {
     },
     'updated_on': {
         'type': str,
+    },
+    'health_state': {
+        'type': str,
+        'nested': True,
+        'dict': 'health.state.name'
+    },
+    'health_failures': {
+        'type': int,
+        'nested': True,
+        'dict': 'health.failures'
+    },
+    'health_next_probe': {
+        'type': str,
+        'nested': True,
+        'dict': 'health.next_probe'
     }
 }
 
@@ -37,12 +37,23 @@ network_all_attributes = {
     'rtu_byte_size': {
         'type': int,
     },
+    'rtu_learn_turnaround': {
+        'type': bool,
+    },
     'tcp_ip': {
         'type': str,
     },
     'tcp_port': {
         'type': int,
     },
+    'tcp_max_in_flight': {
+        'type': int,
+    },
+    'tcp_transport': {
+        'type': str,
+        'nested': True,
+        'dict': 'tcp_transport.name'
+    },
     'type': {
         'type': str,
         'required': True,
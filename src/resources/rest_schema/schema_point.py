@@ -106,6 +106,9 @@ point_all_attributes = {
     },
     'write_value_once': {
         'type': bool,
+    },
+    'polling_interval': {
+        'type': float,
     }
 }
 
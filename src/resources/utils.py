@@ -1,5 +1,10 @@
+import csv
+import io
+import json
 from distutils.util import strtobool
+from typing import List
 
+from flask import request
 from flask_restful import fields
 from flask_restful import marshal
 from rubix_http.exceptions.exception import BadDataException
@@ -63,3 +68,44 @@ def map_rest_schema(schema, resource_fields):
             resource_fields[attr] = schema[attr]['type']
         if schema[attr].get('nested', False):
             resource_fields[attr].__init__(attribute=schema[attr]['dict'])
+
+
+def get_bulk_items() -> List[dict]:
+    """
+    Items of a bulk request body, a JSON list or a text/csv table with a header row; empty CSV cells are left out
+    """
+    if request.mimetype == 'text/csv':
+        reader = csv.DictReader(io.StringIO(request.get_data(as_text=True)))
+        return [{key.strip(): value for key, value in row.items() if key and value not in (None, '')}
+                for row in reader]
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise BadDataException('Body should be a list of items or a text/csv table')
+    return items
+
+
+def parse_bulk_item(item: dict, attributes: dict, required: bool) -> dict:
+    """
+    Cast the values of a bulk item to the types of the schema attributes, like the request parser does
+    :param required: whether the required attributes should be there, i.e. for an item to create
+    """
+    data: dict = {}
+    for attr, schema in attributes.items():
+        if attr not in item:
+            if required and schema.get('required', False):
+                raise ValueError(f'{attr} is required')
+            continue
+        value = item[attr]
+        attr_type = schema['type']
+        if value is None:
+            pass
+        elif attr_type == bool:
+            value = bool(strtobool(value)) if isinstance(value, str) else bool(value)
+        elif attr_type == dict:
+            value = json.loads(value) if isinstance(value, str) else value
+            if not isinstance(value, dict):
+                raise ValueError(f'{attr} should be an object')
+        else:
+            value = attr_type(value)
+        data[attr] = value
+    return data
@@ -1,6 +1,7 @@
 from flask import Blueprint
 from flask_restful import Api
 
+from src.resources.device.device_bulk import DeviceBulkResource
 from src.resources.device.device_plural import DevicePluralResource
 from src.resources.device.device_singular import DeviceSingularResourceByUUID, DeviceSingularResourceByName
 from src.resources.mapping.mapping import MPGBPMappingResourceList, MPGBPMappingResourceListByUUID, \
@@ -8,13 +9,15 @@ from src.resources.mapping.mapping import MPGBPMappingResourceList, MPGBPMapping
     MPGBPMappingResourceByGenericPointUUID, MPGBPMappingResourceByBACnetPointUUID, MPGBMappingResourceUpdateMappingState
 from src.resources.network.netwrok_plural import NetworkPluralResource
 from src.resources.network.netwrok_singular import NetworkSingularResourceByUUID, NetworkSingularResourceByName
+from src.resources.point.point_bulk import PointBulkResource
 from src.resources.point.point_plural import PointPluralResource
 from src.resources.point.point_poll import PointPollResource, PointPollNonExistingResource, PointPollResourceByName, PointPollResourceByUUID
 from src.resources.point.point_singular import PointSingularResourceByUUID, PointSingularResourceByName
 from src.resources.point.point_stores import PointPluralPointStoreResource, PointStoreResource, \
-    DevicePointPluralPointStoreResource
-from src.resources.point.point_sync import MPToBPSync, MPSync
-from src.resources.point.point_value_writer import PointUUIDValueWriterResource, PointNameValueWriterResource
+    DevicePointPluralPointStoreResource, PointStoreHistoryResource
+from src.resources.point.point_sync import MPToBPSync, MPSync, MPSyncStatus
+from src.resources.point.point_value_writer import PointUUIDValueWriterResource, PointNameValueWriterResource, \
+    PointValueBulkWriterResource
 from src.system.resources.memory import GetSystemMem
 from src.system.resources.ping import Ping
 
@@ -29,9 +32,11 @@ api_modbus.add_resource(NetworkPluralResource, '/networks')
 api_modbus.add_resource(NetworkSingularResourceByUUID, '/networks/uuid/<string:uuid>')
 api_modbus.add_resource(NetworkSingularResourceByName, '/networks/name/<string:name>')
 api_modbus.add_resource(DevicePluralResource, '/devices')
+api_modbus.add_resource(DeviceBulkResource, '/devices/bulk')
 api_modbus.add_resource(DeviceSingularResourceByUUID, '/devices/uuid/<string:uuid>')
 api_modbus.add_resource(DeviceSingularResourceByName, '/devices/name/<string:network_name>/<string:device_name>')
 api_modbus.add_resource(PointPluralResource, '/points')
+api_modbus.add_resource(PointBulkResource, '/points/bulk')
 api_modbus.add_resource(PointSingularResourceByUUID, '/points/uuid/<string:uuid>')
 api_modbus.add_resource(PointSingularResourceByName,
                         '/points/name/<string:network_name>/<string:device_name>/<string:point_name>')
@@ -41,10 +46,12 @@ api_modbus.add_resource(PointPollResourceByName,
 api_modbus.add_resource(PointPollNonExistingResource, '/poll/point')
 api_modbus.add_resource(PointPluralPointStoreResource, '/point_stores')
 api_modbus.add_resource(PointStoreResource, '/point_stores/<string:uuid>')
+api_modbus.add_resource(PointStoreHistoryResource, '/point_stores/<string:uuid>/history')
 api_modbus.add_resource(DevicePointPluralPointStoreResource, '/<string:device_uuid>/point_stores')
 api_modbus.add_resource(PointUUIDValueWriterResource, '/points_value/uuid/<string:uuid>')
 api_modbus.add_resource(PointNameValueWriterResource,
                         '/points_value/name/<string:network_name>/<string:device_name>/<string:point_name>')
+api_modbus.add_resource(PointValueBulkWriterResource, '/points_value/bulk')
 
 # Modbus <> Generic|BACnet points mappings
 bp_mapping_mp_gbp = Blueprint('mappings_mp_gbp', __name__, url_prefix='/api/mappings/mp_gbp')
@@ -62,3 +69,4 @@ bp_sync = Blueprint('sync', __name__, url_prefix='/api/sync')
 api_sync = Api(bp_sync)
 api_sync.add_resource(MPToBPSync, '/mp_to_bp')
 api_sync.add_resource(MPSync, '/mp')
+api_sync.add_resource(MPSyncStatus, '/mp/status')
@@ -0,0 +1,79 @@
+import logging
+from typing import Dict, Tuple, Union
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src import db
+from src.enums.mapping import MapType, MappingState
+from src.models.model_mapping import MPGBPMapping
+from src.utils import Singleton
+
+logger = logging.getLogger(__name__)
+
+MAPPINGS_CHANGED_KEY: str = 'mappings_changed'
+
+
+class MappedPoint:
+    def __init__(self, point_uuid: str, mapped_point_uuid: str, map_type: MapType, mapping_state: MappingState):
+        self.point_uuid: str = point_uuid
+        self.mapped_point_uuid: str = mapped_point_uuid
+        self.type: MapType = map_type
+        self.mapping_state: MappingState = mapping_state
+
+
+class MappingIndex(metaclass=Singleton):
+    """
+    Process-wide copy of mappings_mp_gbp, looked up both ways on the COV path, so unmapped points cost no query.
+    It is loaded with one query and dropped after each commit which adds, deletes or changes a mapping (through the
+    mapping resources or the cascade of a point deletion), so it gets reloaded with the committed state.
+    """
+
+    def __init__(self):
+        self.__by_point_uuid: Union[Dict[str, MappedPoint], None] = None
+        self.__by_mapped_point: Dict[Tuple[str, MapType], MappedPoint] = {}
+
+    def find_by_point_uuid(self, point_uuid: str) -> Union[MappedPoint, None]:
+        self.__load()
+        return self.__by_point_uuid.get(point_uuid)
+
+    def find_by_mapped_point_uuid_type(self, mapped_point_uuid: str, map_type: MapType) -> Union[MappedPoint, None]:
+        self.__load()
+        return self.__by_mapped_point.get((mapped_point_uuid, map_type))
+
+    def invalidate(self):
+        self.__by_point_uuid = None
+
+    def __load(self):
+        if self.__by_point_uuid is not None:
+            return
+        by_point_uuid: Dict[str, MappedPoint] = {}
+        by_mapped_point: Dict[Tuple[str, MapType], MappedPoint] = {}
+        rows = db.session.query(MPGBPMapping.point_uuid, MPGBPMapping.mapped_point_uuid, MPGBPMapping.type,
+                                MPGBPMapping.mapping_state)
+        for point_uuid, mapped_point_uuid, map_type, mapping_state in rows:
+            mapped_point: MappedPoint = MappedPoint(point_uuid, mapped_point_uuid, map_type, mapping_state)
+            by_point_uuid.setdefault(point_uuid, mapped_point)
+            by_mapped_point.setdefault((mapped_point_uuid, map_type), mapped_point)
+        self.__by_mapped_point = by_mapped_point
+        self.__by_point_uuid = by_point_uuid
+        logger.debug(f'Loaded {len(by_point_uuid)} mappings')
+
+
+@event.listens_for(Session, 'after_flush')
+def mark_mappings_changed(session: Session, _):
+    if any(isinstance(instance, MPGBPMapping) for instance in session.new) or \
+            any(isinstance(instance, MPGBPMapping) for instance in session.deleted) or \
+            any(isinstance(instance, MPGBPMapping) for instance in session.dirty):
+        session.info[MAPPINGS_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_mappings(session: Session):
+    if session.info.pop(MAPPINGS_CHANGED_KEY, None):
+        MappingIndex().invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_mappings_changed(session: Session):
+    session.info.pop(MAPPINGS_CHANGED_KEY, None)
@@ -0,0 +1,123 @@
+import logging
+import time
+from datetime import datetime
+from typing import List, Union
+
+from gevent.pool import Pool
+
+from src import db
+from src.enums.mapping import MapType, MappingState, SyncJobState
+from src.models.model_mapping import MPGBPMapping
+from src.models.model_point_store import PointStoreModel
+from src.models.model_priority_array import PriorityArrayModel
+from src.services.mapping_sync import MappingSyncOutbox
+from src.utils import Singleton
+from src.utils.model_utils import get_datetime
+
+logger = logging.getLogger(__name__)
+
+"""
+Progress is logged every PROGRESS_STEP mapped points
+"""
+PROGRESS_STEP: int = 500
+
+
+class MappingResync(metaclass=Singleton):
+    """
+    Bulk sync of all the mapped point values from Modbus > Generic | BACnet points.
+    Stores and priority arrays of the mapped points are loaded in one query and delivered by a pool of
+    mapping_sync.concurrency greenlets, so peers are not flooded on boot; failed deliveries are left to the retries of
+    the MappingSyncOutbox. A single job runs at a time.
+    """
+
+    def __init__(self):
+        self.__state: SyncJobState = SyncJobState.IDLE
+        self.__gp: bool = True
+        self.__bp: bool = True
+        self.__total: int = 0
+        self.__delivered: int = 0
+        self.__failed: int = 0
+        self.__skipped: int = 0
+        self.__started_at: Union[datetime, None] = None
+        self.__duration: Union[float, None] = None
+
+    @property
+    def state(self) -> SyncJobState:
+        return self.__state
+
+    def start(self, gp: bool = True, bp: bool = True) -> bool:
+        """
+        :return: False when a job is already running
+        """
+        from src import FlaskThread
+        if self.__state == SyncJobState.RUNNING:
+            return False
+        self.__state = SyncJobState.RUNNING
+        self.__gp, self.__bp = gp, bp
+        self.__total = self.__delivered = self.__failed = self.__skipped = 0
+        self.__started_at = get_datetime()
+        self.__duration = None
+        FlaskThread(target=self.__run, daemon=True).start()
+        return True
+
+    def to_dict(self) -> dict:
+        return {
+            'state': self.__state.name,
+            'gp': self.__gp,
+            'bp': self.__bp,
+            'total': self.__total,
+            'delivered': self.__delivered,
+            'failed': self.__failed,
+            'skipped': self.__skipped,
+            'started_at': str(self.__started_at) if self.__started_at else None,
+            'duration': self.__duration
+        }
+
+    def __run(self):
+        started: float = time.monotonic()
+        try:
+            items: List[tuple] = self.__load_items()
+            self.__total = len(items)
+            logger.info(f'Syncing {self.__total} mapped point values')
+            outbox: MappingSyncOutbox = MappingSyncOutbox()
+            pool: Pool = Pool(max(outbox.setting.concurrency, 1))
+            for (key, priority_array_write), delivered in zip(items, pool.imap(self.__deliver, items)):
+                if delivered is None:
+                    self.__skipped += 1
+                elif delivered:
+                    self.__delivered += 1
+                else:
+                    self.__failed += 1
+                    outbox.enqueue(key[0], key[1], priority_array_write)
+                done: int = self.__delivered + self.__failed + self.__skipped
+                if done % PROGRESS_STEP == 0:
+                    logger.info(f'Synced {done}/{self.__total} mapped point values')
+        except Exception as e:
+            logger.error(f'Mapping sync job failed: {e}')
+        finally:
+            self.__duration = round(time.monotonic() - started, 3)
+            self.__state = SyncJobState.FINISHED
+            logger.info(f'Finished syncing mapped point values: {self.to_dict()}')
+
+    def __load_items(self) -> List[tuple]:
+        map_types: List[MapType] = [map_type for map_type, enabled in ((MapType.GENERIC, self.__gp),
+                                                                       (MapType.BACNET, self.__bp)) if enabled]
+        rows = db.session.query(MPGBPMapping.type, MPGBPMapping.mapped_point_uuid, PointStoreModel,
+                                PriorityArrayModel) \
+            .join(PointStoreModel, PointStoreModel.point_uuid == MPGBPMapping.point_uuid) \
+            .outerjoin(PriorityArrayModel, PriorityArrayModel.point_uuid == MPGBPMapping.point_uuid) \
+            .filter(MPGBPMapping.mapping_state == MappingState.MAPPED, MPGBPMapping.type.in_(map_types))
+        return [((map_type, mapped_point_uuid),
+                 priority_array.to_dict() if priority_array else {"_16": point_store.value})
+                for map_type, mapped_point_uuid, point_store, priority_array in rows]
+
+    @staticmethod
+    def __deliver(item: tuple) -> Union[bool, None]:
+        """
+        A value change queued meanwhile is newer than the value loaded, it is left to the outbox
+        :return: None when skipped
+        """
+        (map_type, mapped_point_uuid), _ = item
+        if MappingSyncOutbox().is_pending(map_type, mapped_point_uuid):
+            return None
+        return MappingSyncOutbox.deliver(item)
@@ -0,0 +1,117 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Union
+
+from flask import Response
+from gevent import sleep
+from gevent.pool import Pool
+
+from src.enums.mapping import MapType
+from src.setting import MappingSyncSetting
+from src.utils import Singleton
+
+logger = logging.getLogger(__name__)
+
+"""
+Seconds a value is held back after its first failed delivery, doubled on each failure up to RETRY_MAX
+"""
+RETRY_INITIAL: float = 2
+RETRY_MAX: float = 300
+
+
+class MappingSyncOutbox(metaclass=Singleton):
+    """
+    Outbox of the Modbus point values synced to their mapped Generic | BACnet points.
+    Values are coalesced per mapped point, the latest one wins, and delivered in rounds of batch_size by a pool of
+    concurrency greenlets, instead of a greenlet and a connection per value change. A failed delivery is retried with an
+    exponential backoff, unless a newer value of the mapped point got queued meanwhile.
+    """
+
+    def __init__(self):
+        self.__setting: MappingSyncSetting = MappingSyncSetting()
+        self.__pending: OrderedDict = OrderedDict()
+        self.__failures: Dict[Tuple[MapType, str], int] = {}
+        self.__retry_at: Dict[Tuple[MapType, str], float] = {}
+
+    @property
+    def setting(self) -> MappingSyncSetting:
+        return self.__setting
+
+    @property
+    def depth(self) -> int:
+        return len(self.__pending)
+
+    def is_pending(self, map_type: MapType, mapped_point_uuid: str) -> bool:
+        return (map_type, mapped_point_uuid) in self.__pending
+
+    def start(self, setting: MappingSyncSetting):
+        from src import FlaskThread
+        self.__setting = setting
+        FlaskThread(target=self.__flush_loop, daemon=True).start()
+
+    def enqueue(self, map_type: Union[MapType, str], mapped_point_uuid: str, priority_array_write: dict,
+                gp: bool = True, bp: bool = True):
+        if not isinstance(map_type, MapType):
+            map_type = MapType[map_type]
+        if (map_type == MapType.GENERIC and not gp) or (map_type == MapType.BACNET and not bp):
+            return
+        self.__pending[(map_type, mapped_point_uuid)] = {key: value for key, value in priority_array_write.items()
+                                                         if key != 'point_uuid'}
+
+    def flush(self) -> int:
+        """
+        Deliver one round of the values which are not held back
+        :return: values delivered or failed
+        """
+        now: float = time.monotonic()
+        batch: List[tuple] = []
+        for key in list(self.__pending):
+            if self.__retry_at.get(key, 0) <= now:
+                batch.append((key, self.__pending.pop(key)))
+                if len(batch) >= self.__setting.batch_size:
+                    break
+        if not batch:
+            return 0
+        pool: Pool = Pool(max(self.__setting.concurrency, 1))
+        for (key, priority_array_write), delivered in zip(batch, pool.map(self.deliver, batch)):
+            if delivered:
+                self.__failures.pop(key, None)
+                self.__retry_at.pop(key, None)
+                continue
+            failures: int = self.__failures.get(key, 0) + 1
+            self.__failures[key] = failures
+            if key in self.__pending:
+                # only the failed value is backed off, the newer value queued meanwhile goes on the next flush
+                self.__retry_at.pop(key, None)
+                logger.warning(f'Sync of mapped point {key[1]} failed {failures} time(s), sending its newer value')
+                continue
+            backoff: float = min(RETRY_INITIAL * 2 ** (failures - 1), RETRY_MAX)
+            self.__retry_at[key] = now + backoff
+            self.__pending[key] = priority_array_write
+            logger.warning(f'Sync of mapped point {key[1]} failed {failures} time(s), retrying in {backoff} seconds')
+        return len(batch)
+
+    def __flush_loop(self):
+        while True:
+            sleep(self.__setting.flush_interval)
+            try:
+                while self.flush() >= self.__setting.batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f'Mapping sync failed: {e}')
+
+    @staticmethod
+    def deliver(item: tuple) -> bool:
+        """
+        Client errors (i.e. the mapped point is gone) are not retried
+        """
+        from src.models.model_point_store import PointStoreModel
+        (map_type, mapped_point_uuid), priority_array_write = item
+        try:
+            response: Union[Response, None] = PointStoreModel.sync_point_value_with_mapping_mp_to_gbp(
+                map_type, mapped_point_uuid, dict(priority_array_write))
+        except Exception as e:
+            logger.debug(f'Sync of mapped point {mapped_point_uuid} failed: {e}')
+            return False
+        return response is None or response.status_code < 500
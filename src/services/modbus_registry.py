@@ -1,5 +1,6 @@
 import logging
 from abc import abstractmethod
+from contextlib import contextmanager
 from typing import Dict
 
 import shortuuid
@@ -32,6 +33,14 @@ class ModbusRegistryConnection:
         self.connection_key: str = connection_key
         self.client: BaseModbusClient = client
         self.is_running: bool = False
+        self.max_in_flight: int = 1
+
+    @contextmanager
+    def acquire_client(self) -> BaseModbusClient:
+        yield self.client
+
+    def close(self):
+        self.client.close()
 
 
 class ModbusRegistry(metaclass=Singleton):
@@ -83,7 +92,7 @@ class ModbusRegistry(metaclass=Singleton):
         logger.debug(f'Removing rtu_connection {key}')
         connection: ModbusRegistryConnection = self.connections.get(key)
         if connection:
-            connection.client.close()
+            connection.close()
             del self.connections[key]
 
     @abstractmethod
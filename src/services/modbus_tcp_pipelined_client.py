@@ -0,0 +1,102 @@
+import logging
+import socket
+from typing import Dict, Union
+
+import gevent
+from gevent.event import AsyncResult
+from gevent.lock import Semaphore
+from pymodbus.client.sync import ModbusTcpClient
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+from pymodbus.pdu import ModbusRequest, ModbusResponse
+
+logger = logging.getLogger(__name__)
+
+
+class ModbusTcpPipelinedClient(ModbusTcpClient):
+    """
+    Modbus TCP client which keeps several requests outstanding on one socket, replies are matched to their requests by
+    the MBAP transaction id.
+    A reader greenlet owns the receiving side of the socket, so any number of greenlets can execute requests at once.
+    """
+
+    def __init__(self, host: str, port: int, timeout: int, **kwargs):
+        super().__init__(host=host, port=port, timeout=timeout, **kwargs)
+        self.__pending: Dict[int, AsyncResult] = {}
+        self.__send_lock: Semaphore = Semaphore()
+        self.__connect_lock: Semaphore = Semaphore()
+        self.__reader: Union[gevent.Greenlet, None] = None
+
+    def connect(self) -> bool:
+        # the first requests of concurrent greenlets would open a socket each otherwise
+        with self.__connect_lock:
+            if self.socket:
+                return True
+            if not super().connect():
+                return False
+            # replies are waited for per request, the reader itself never times out
+            self.socket.settimeout(None)
+            self.__reader = gevent.spawn(self.__read_loop, self.socket)
+            return True
+
+    def close(self):
+        super().close()
+        self.__fail_pending(ConnectionException(f'Connection closed[{self}]'))
+        if self.__reader is not None and self.__reader is not gevent.getcurrent():
+            self.__reader.kill(block=False)
+        self.__reader = None
+
+    def execute(self, request: ModbusRequest = None) -> Union[ModbusResponse, ModbusIOException]:
+        if not self.connect():
+            raise ConnectionException(f'Failed to connect[{self}]')
+        request.transaction_id = self.transaction.getNextTID()
+        result: AsyncResult = AsyncResult()
+        self.__pending[request.transaction_id] = result
+        try:
+            with self.__send_lock:
+                self.socket.sendall(self.framer.buildPacket(request))
+            return result.get(timeout=self.timeout)
+        except gevent.Timeout:
+            return ModbusIOException(f'No response received within {self.timeout} seconds', request.function_code)
+        except (socket.error, AttributeError) as e:
+            # AttributeError: socket got closed by another greenlet in the meantime
+            self.close()
+            raise ConnectionException(f'{self}: {e}')
+        finally:
+            self.__pending.pop(request.transaction_id, None)
+
+    def __read_loop(self, sock: socket.socket):
+        try:
+            while True:
+                data: bytes = sock.recv(1024)
+                if not data:
+                    break
+                try:
+                    self.framer.processIncomingPacket(data, self.__on_response, unit=0, single=True)
+                except ModbusIOException as e:
+                    logger.error(f'{self}: {e}')
+                    self.framer.resetFrame()
+        except socket.error as e:
+            logger.error(f'{self}: {e}')
+        except Exception as e:
+            # i.e. InvalidMessageReceivedException of a garbled frame, the stream can't be resynchronised
+            logger.error(f'{self}: reader failed: {e}')
+        finally:
+            # whatever ended the reader, connect() must not hand out a socket nobody reads from anymore
+            if self.socket is sock:
+                self.__reader = None
+                self.close()
+
+    def __on_response(self, response: ModbusResponse):
+        result: Union[AsyncResult, None] = self.__pending.get(response.transaction_id)
+        if result is None:
+            logger.debug(f'{self}: dropping reply of unknown or timed out transaction {response.transaction_id}')
+            return
+        result.set(response)
+
+    def __fail_pending(self, error: Exception):
+        for result in self.__pending.values():
+            result.set_exception(error)
+        self.__pending.clear()
+
+    def __str__(self):
+        return f'ModbusTcpPipelinedClient({self.host}:{self.port})'
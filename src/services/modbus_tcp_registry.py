@@ -1,17 +1,50 @@
 import logging
+from contextlib import contextmanager
+from typing import List
 
-from pymodbus.client.sync import ModbusTcpClient
+from gevent.queue import Queue
+from pymodbus.client.sync import ModbusTcpClient, BaseModbusClient
 
+from src.enums.network import ModbusTcpTransport
 from src.models.model_network import NetworkModel, ModbusType
 from src.services.modbus_registry import ModbusRegistryKey, ModbusRegistry, \
     ModbusRegistryConnection
+from src.services.modbus_tcp_pipelined_client import ModbusTcpPipelinedClient
 
 logger = logging.getLogger(__name__)
 
 
 class ModbusTcpRegistryKey(ModbusRegistryKey):
     def create_connection_key(self) -> str:
-        return f'{self.network.tcp_ip}:{self.network.tcp_port}:{self.network.timeout}'
+        return f'{self.network.tcp_ip}:{self.network.tcp_port}:{self.network.timeout}:' \
+               f'{self.network.tcp_max_in_flight}:{self.network.tcp_transport.name}'
+
+
+class ModbusTcpRegistryConnection(ModbusRegistryConnection):
+    """
+    Holds tcp_max_in_flight clients to the same target, a client is used by one request at a time.
+    A pipelined client is shared by all of them, it is listed tcp_max_in_flight times.
+    """
+
+    def __init__(self, connection_key: str, clients: List[BaseModbusClient]):
+        super().__init__(connection_key, clients[0])
+        self.clients: List[BaseModbusClient] = clients
+        self.max_in_flight: int = len(clients)
+        self.__idle_clients: Queue = Queue()
+        for client in clients:
+            self.__idle_clients.put(client)
+
+    @contextmanager
+    def acquire_client(self) -> BaseModbusClient:
+        client: BaseModbusClient = self.__idle_clients.get()
+        try:
+            yield client
+        finally:
+            self.__idle_clients.put(client)
+
+    def close(self):
+        for client in set(self.clients):
+            client.close()
 
 
 class ModbusTcpRegistry(ModbusRegistry):
@@ -20,13 +53,17 @@ class ModbusTcpRegistry(ModbusRegistry):
         host: str = network.tcp_ip
         port: int = network.tcp_port
         timeout: int = network.timeout
+        max_in_flight: int = network.tcp_max_in_flight or 1
         registry_key: ModbusTcpRegistryKey = ModbusTcpRegistryKey(network)
         self.remove_connection_if_exist(registry_key.key)
         logger.debug(f'Adding tcp_connection {registry_key.key}')
-        self.connections[registry_key.key] = ModbusRegistryConnection(
-            registry_key.connection_key,
-            ModbusTcpClient(host=host, port=port, timeout=timeout)
-        )
+        if network.tcp_transport is ModbusTcpTransport.PIPELINED:
+            clients: List[BaseModbusClient] = [ModbusTcpPipelinedClient(host=host, port=port,
+                                                                        timeout=timeout)] * max_in_flight
+        else:
+            clients: List[BaseModbusClient] = [ModbusTcpClient(host=host, port=port, timeout=timeout)
+                                               for _ in range(max_in_flight)]
+        self.connections[registry_key.key] = ModbusTcpRegistryConnection(registry_key.connection_key, clients)
         return self.connections[registry_key.key]
 
     def get_registry_key(self, network: NetworkModel) -> ModbusRegistryKey:
@@ -1,13 +1,18 @@
 import json
 import logging
-from typing import Union
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Union
 
+from gevent import sleep
+from paho.mqtt.client import MQTT_ERR_SUCCESS
 from registry.models.model_device_info import DeviceInfoModel
 from registry.resources.resource_device_info import get_device_info
 
+from src import FlaskThread
 from src.models.model_point import PointModel
 from src.models.model_point_store import PointStoreModel
 from src.services.mqtt_client.mqtt_listener import MqttListener
+from src.services.mqtt_client.publish_queue import MqttPublishQueue
 from ...models.model_device import DeviceModel
 from ...models.model_network import NetworkModel
 from ...setting import MqttSetting
@@ -20,6 +25,7 @@ SERVICE_NAME_MQTT_CLIENT = 'mqtt'
 MQTT_TOPIC_COV = 'cov'
 MQTT_TOPIC_COV_ALL = 'all'
 MQTT_TOPIC_COV_VALUE = 'value'
+MQTT_TOPIC_COV_BATCH = 'batch'
 
 device_info: Union[DeviceInfoModel, None] = get_device_info()
 
@@ -35,16 +41,40 @@ def allow_only_on_prefix(func):
 
 
 class MqttClient(MqttListener, metaclass=Singleton):
+    """
+    Messages go through a bounded latest-value-per-topic queue drained by a publisher thread, so a slow or disconnected
+    broker does not stall polling; while disconnected the queue holds the latest message of each topic, which gets
+    flushed on reconnect.
+    COV topics are built once per point and rebuilt when the network, device or point gets renamed.
+    """
+    __prefix_topic: Union[str, None] = None
+
+    def __init__(self):
+        self.__queue: Union[MqttPublishQueue, None] = None
+        self.__cov_topics: Dict[str, Tuple[tuple, str, str]] = {}
+        self.__batch_topics: Dict[str, Tuple[tuple, str]] = {}
+        self.__batches: Dict[str, List[dict]] = {}
+        super().__init__()
+
     @property
     def config(self) -> MqttSetting:
         return super().config if isinstance(super().config, MqttSetting) else MqttSetting()
 
+    @property
+    def publish_queue(self) -> Union[MqttPublishQueue, None]:
+        return self.__queue
+
+    def start(self, config: MqttSetting, subscribe_topics: List[str] = None, callback=lambda: None):
+        self.__queue = MqttPublishQueue(config.publish_queue_size)
+        FlaskThread(target=self.__publish_loop, daemon=True).start()
+        super().start(config, subscribe_topics, callback)
+
     @classmethod
     def publish_point_cov(cls, driver_name, network: NetworkModel, device: DeviceModel, point: PointModel,
                           point_store: PointStoreModel, clear_value: bool, priority: int):
-        payload: str = ''
+        output: dict = {}
         if not clear_value:
-            output: dict = {
+            output = {
                 'fault': point_store.fault,
                 'value': point_store.value,
                 'value_raw': point_store.value_raw,
@@ -53,22 +83,35 @@ class MqttClient(MqttListener, metaclass=Singleton):
             }
             if point_store.fault:
                 output = {**output, 'fault_message': point_store.fault_message, 'ts': str(point_store.ts_fault)}
-            payload = json.dumps(output)
         client = MqttClient()
+        batch: Union[List[dict], None] = client.__batches.get(device.uuid)
+        if batch is not None and not clear_value:
+            batch.append({'uuid': point.uuid, 'name': point.name, **output})
         if client.config.publish_value:
-            topic: str = client.__make_topic((client.config.topic, MQTT_TOPIC_COV, MQTT_TOPIC_COV_ALL, driver_name,
-                                              network.uuid, network.name,
-                                              device.uuid, device.name,
-                                              point.uuid, point.name))
-            client._publish_mqtt_value(topic, payload)
-
+            topic_all, topic_value = client.__get_cov_topics(driver_name, network, device, point)
+            client._publish_mqtt_value(topic_all, json.dumps(output) if output else '')
             if not point_store.fault:
-                topic: str = client.__make_topic(
-                    (client.config.topic, MQTT_TOPIC_COV, MQTT_TOPIC_COV_VALUE, driver_name,
-                     network.uuid, network.name,
-                     device.uuid, device.name,
-                     point.uuid, point.name))
-                client._publish_mqtt_value(topic, '' if clear_value else str(point_store.value))
+                client._publish_mqtt_value(topic_value, '' if clear_value else str(point_store.value))
+
+    @contextmanager
+    def batch_cov(self, driver_name, network: NetworkModel, device: DeviceModel):
+        """
+        With publish_batch, the COVs of the device inside this block are published as one message on its batch topic
+        """
+        if not self.config.publish_batch or device.uuid in self.__batches:
+            yield
+            return
+        self.__batches[device.uuid] = []
+        try:
+            yield
+        finally:
+            points: List[dict] = self.__batches.pop(device.uuid)
+            if points:
+                self._publish_mqtt_value(self.__get_batch_topic(driver_name, network, device),
+                                         json.dumps({'points': points}), False)
+
+    def evict_topics(self, point_uuid: str):
+        self.__cov_topics.pop(point_uuid, None)
 
     @classmethod
     @allow_only_on_prefix
@@ -78,20 +121,71 @@ class MqttClient(MqttListener, metaclass=Singleton):
             client._publish_mqtt_value(client.__make_topic((client.config.debug_topic,)), payload)
 
     def _publish_mqtt_value(self, topic: str, payload: str, retain: bool = True):
-        if not self.status():
-            logger.error(f"MQTT client {self.to_string()} is not connected...")
+        if self.__queue is None:
+            if not self.status():
+                logger.error(f"MQTT client {self.to_string()} is not connected...")
+                return
+            self.__publish(topic, payload, retain)
             return
+        self.__queue.put(topic, payload, retain)
+
+    def __publish_loop(self):
+        while True:
+            self.__queue.wait()
+            if not self.status():
+                logger.warning(f'MQTT client {self.to_string()} is not connected, holding the latest messages of '
+                               f'{self.__queue.depth} topics')
+                while not self.status():
+                    sleep(1)
+                logger.info(f'MQTT client {self.to_string()} connected, flushing {self.__queue.depth} messages')
+            message: Union[tuple, None] = self.__queue.pop()
+            if message is None:
+                continue
+            topic, payload, retain = message
+            try:
+                if not self.__publish(topic, payload, retain):
+                    self.__queue.put_back(topic, payload, retain)
+                    sleep(1)
+            except Exception as e:
+                logger.error(f'MQTT publish on {topic} failed: {e}')
+
+    def __publish(self, topic: str, payload: str, retain: bool) -> bool:
         logger.debug(f"MQTT_PUBLISH: 'topic': {topic}, 'payload': {payload}, 'retain':{retain}")
-        self.client.publish(topic, str(payload), qos=self.config.qos, retain=retain)
+        info = self.client.publish(topic, str(payload), qos=self.config.qos, retain=retain)
+        return info.rc == MQTT_ERR_SUCCESS
+
+    def __get_cov_topics(self, driver_name, network: NetworkModel, device: DeviceModel,
+                         point: PointModel) -> Tuple[str, str]:
+        names: tuple = (driver_name, network.uuid, network.name, device.uuid, device.name, point.name)
+        topics: Union[Tuple[tuple, str, str], None] = self.__cov_topics.get(point.uuid)
+        if topics is None or topics[0] != names:
+            parts: tuple = (driver_name, network.uuid, network.name, device.uuid, device.name, point.uuid, point.name)
+            topics = self.__cov_topics[point.uuid] = (
+                names,
+                self.__make_topic((self.config.topic, MQTT_TOPIC_COV, MQTT_TOPIC_COV_ALL) + parts),
+                self.__make_topic((self.config.topic, MQTT_TOPIC_COV, MQTT_TOPIC_COV_VALUE) + parts)
+            )
+        return topics[1], topics[2]
+
+    def __get_batch_topic(self, driver_name, network: NetworkModel, device: DeviceModel) -> str:
+        names: tuple = (driver_name, network.uuid, network.name, device.name)
+        topic: Union[Tuple[tuple, str], None] = self.__batch_topics.get(device.uuid)
+        if topic is None or topic[0] != names:
+            topic = self.__batch_topics[device.uuid] = (names, self.__make_topic(
+                (self.config.topic, MQTT_TOPIC_COV, MQTT_TOPIC_COV_BATCH, driver_name, network.uuid, network.name,
+                 device.uuid, device.name)))
+        return topic[1]
 
     @classmethod
     def prefix_topic(cls) -> str:
         if not device_info:
             logger.error('Please add device_info on Rubix Service')
             return ''
-        return cls.SEPARATOR.join((device_info.client_id, device_info.client_name,
-                                   device_info.site_id, device_info.site_name,
-                                   device_info.device_id, device_info.device_name))
+        if cls.__prefix_topic is None:
+            cls.__prefix_topic = cls.SEPARATOR.join((device_info.client_id, device_info.client_name,
+                                                     device_info.site_id, device_info.site_name,
+                                                     device_info.device_id, device_info.device_name))
+        return cls.__prefix_topic
 
     @classmethod
     def __make_topic(cls, parts: tuple) -> str:
@@ -13,9 +13,7 @@ from rubix_mqtt.mqtt import MqttClientBase
 from src import FlaskThread
 from src.enums.drivers import Drivers
 from src.handlers.exception import exception_handler
-from src.models.model_device import DeviceModel
-from src.models.model_network import NetworkModel
-from src.models.model_point import PointModel
+from src.services.mqtt_client.topic_index import MqttTopicIndex
 from src.setting import MqttSetting
 
 logger = logging.getLogger(__name__)
@@ -30,6 +28,8 @@ class MqttListener(MqttClientBase):
     def __init__(self):
         self.__config: Union[MqttSetting, None] = None
         self.__app_context: Union[AppContext, None] = None
+        self.__cov_topic_match: str = ''
+        self.__cov_value_topic_length: int = 0
         MqttClientBase.__init__(self)
 
     @property
@@ -46,6 +46,8 @@ class MqttListener(MqttClientBase):
         if not device_info:
             logger.error('Please add device-info on Rubix Service')
             return
+        self.__cov_topic_match = self.get_value_topic_prefix()[:-10]
+        self.__cov_value_topic_length = self._mqtt_cov_value_topic_length()
         subscribe_topics: List[str] = []
         if self.config.publish_value:
             topic: str = self.__make_topic((self.get_value_topic_prefix(), '#'))
@@ -83,7 +85,7 @@ class MqttListener(MqttClientBase):
         with self.__app_context():
             if not message.payload:
                 return
-            if self.get_value_topic_prefix()[:-10] in message.topic:
+            if self.__cov_topic_match in message.topic:
                 self.__check_and_clear_value_topic(message)
             else:
                 self.__clear_mqtt_retain_value(message)
@@ -93,7 +95,7 @@ class MqttListener(MqttClientBase):
         Checks whether the subscribed data value exist or not on models, if it doesn't exist we clear retain value
         """
         topic: List[str] = message.topic.split(self.SEPARATOR)
-        if len(topic) == self._mqtt_cov_value_topic_length():
+        if len(topic) == self.__cov_value_topic_length:
             self.__check_and_clear_cov_point(topic, message)
 
     def __check_and_clear_cov_point(self, topic: List[str], message: MQTTMessage):
@@ -105,11 +107,8 @@ class MqttListener(MqttClientBase):
         network_uuid: str = topic[-6]
         driver: str = topic[-7]
         if driver == Drivers.MODBUS.name:
-            point_by_uuid: PointModel = PointModel.find_by_uuid(point_uuid)
-            if point_by_uuid is None or \
-                    PointModel.find_by_name(network_name, device_name, point_name) is None or \
-                    DeviceModel.find_by_uuid(device_uuid) is None or \
-                    NetworkModel.find_by_uuid(network_uuid) is None:
+            if not MqttTopicIndex().contains((network_uuid, network_name, device_uuid, device_name, point_uuid,
+                                              point_name)):
                 logger.warning(f'No point with topic: {message.topic}')
                 self.__clear_mqtt_retain_value(message)
 
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from typing import Tuple, Union
+
+from gevent.event import Event
+
+
+class MqttPublishQueue:
+    """
+    Bounded queue of the messages to publish, holding the latest message of each topic.
+    A message replaces the one of its topic still waiting in the queue (merged) and keeps its place in the queue, so a
+    fast changing point does not starve the others; when the queue is full the oldest topic is dropped.
+    """
+
+    def __init__(self, size: int):
+        self.__size: int = max(size, 1)
+        self.__messages: OrderedDict = OrderedDict()
+        self.__event: Event = Event()
+        self.__merged: int = 0
+        self.__dropped: int = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self.__messages)
+
+    @property
+    def merged(self) -> int:
+        return self.__merged
+
+    @property
+    def dropped(self) -> int:
+        return self.__dropped
+
+    def put(self, topic: str, payload: str, retain: bool):
+        if topic in self.__messages:
+            self.__merged += 1
+        elif len(self.__messages) >= self.__size:
+            self.__messages.popitem(last=False)
+            self.__dropped += 1
+        self.__messages[topic] = (payload, retain)
+        self.__event.set()
+
+    def put_back(self, topic: str, payload: str, retain: bool):
+        """
+        Requeue a message which failed to publish at the head of the queue, unless a newer one of its topic is queued
+        """
+        if topic in self.__messages:
+            return
+        if len(self.__messages) >= self.__size:
+            self.__dropped += 1
+            return
+        self.__messages[topic] = (payload, retain)
+        self.__messages.move_to_end(topic, last=False)
+        self.__event.set()
+
+    def pop(self) -> Union[Tuple[str, str, bool], None]:
+        if not self.__messages:
+            return None
+        topic, (payload, retain) = self.__messages.popitem(last=False)
+        return topic, payload, retain
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Sleep till a message is queued, returns False on timeout
+        """
+        if not self.__messages:
+            self.__event.clear()
+        return bool(self.__event.wait(timeout))
+
+    def to_dict(self) -> dict:
+        return {
+            'depth': self.depth,
+            'merged': self.merged,
+            'dropped': self.dropped
+        }
@@ -0,0 +1,70 @@
+import logging
+from typing import Set, Union
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from src import db
+from src.models.model_device import DeviceModel
+from src.models.model_network import NetworkModel
+from src.models.model_point import PointModel
+from src.utils import Singleton
+
+logger = logging.getLogger(__name__)
+
+TOPICS_CHANGED_KEY: str = 'mqtt_topics_changed'
+
+
+class MqttTopicIndex(metaclass=Singleton):
+    """
+    (network_uuid, network_name, device_uuid, device_name, point_uuid, point_name) of the existing points, which the
+    retained COV topics are checked against.
+    It is loaded with one query and dropped after each commit which adds, deletes or renames a network, device or
+    point, so it gets reloaded with the committed state.
+    """
+
+    def __init__(self):
+        self.__topics: Union[Set[tuple], None] = None
+
+    def contains(self, key: tuple) -> bool:
+        topics: Union[Set[tuple], None] = self.__topics
+        if topics is None:
+            topics = self.__topics = self.__load()
+        return key in topics
+
+    def invalidate(self):
+        self.__topics = None
+
+    @staticmethod
+    def __load() -> Set[tuple]:
+        rows = db.session.query(NetworkModel.uuid, NetworkModel.name, DeviceModel.uuid, DeviceModel.name,
+                                PointModel.uuid, PointModel.name) \
+            .join(DeviceModel, DeviceModel.network_uuid == NetworkModel.uuid) \
+            .join(PointModel, PointModel.device_uuid == DeviceModel.uuid)
+        topics: Set[tuple] = {tuple(row) for row in rows}
+        logger.debug(f'Loaded {len(topics)} MQTT COV topics')
+        return topics
+
+
+def is_topic_changed(instance) -> bool:
+    return isinstance(instance, (NetworkModel, DeviceModel, PointModel))
+
+
+@event.listens_for(Session, 'after_flush')
+def mark_topics_changed(session: Session, _):
+    if any(is_topic_changed(instance) for instance in session.new) or \
+            any(is_topic_changed(instance) for instance in session.deleted) or \
+            any(is_topic_changed(instance) and inspect(instance).attrs.name.history.has_changes()
+                for instance in session.dirty):
+        session.info[TOPICS_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_topics(session: Session):
+    if session.info.pop(TOPICS_CHANGED_KEY, None):
+        MqttTopicIndex().invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_topics_changed(session: Session):
+    session.info.pop(TOPICS_CHANGED_KEY, None)
@@ -1,15 +1,29 @@
 import logging
-from typing import List
+import time
+from typing import List, Union
 
 from gevent import thread
+from sqlalchemy.orm import contains_eager
 
+from src import db
+from src.models.model_device import DeviceModel
 from src.models.model_point import PointModel
-from src.models.model_point_store import PointStoreModel
 from src.services.mqtt_client import MqttClient
+from src.services.mqtt_client.publish_queue import MqttPublishQueue
 from src.utils import Singleton
 
 logger = logging.getLogger(__name__)
 
+"""
+The republish rate is spread in bursts over each second
+"""
+REPUBLISH_BURSTS_PER_SECOND: int = 10
+
+"""
+Points loaded by one query, the transaction is closed before they get published
+"""
+REPUBLISH_PAGE_SIZE: int = 1000
+
 
 class MqttRepublish(metaclass=Singleton):
     @staticmethod
@@ -18,8 +32,55 @@ class MqttRepublish(metaclass=Singleton):
         while not MqttClient().status():
             logger.warning('Waiting for MQTT connection to be connected...')
             thread.sleep(2)
-        points: List[PointModel] = PointModel.find_all()
-        for point in points:
-            point_store: PointStoreModel = PointStoreModel.find_by_point_uuid(point.uuid)
-            point.publish_cov(point_store)
-        logger.info(f"Finished MQTT republish")
+        client: MqttClient = MqttClient()
+        if not client.config.publish_value:
+            return
+        rate: float = max(client.config.republish_rate, 1)
+        burst: int = max(int(rate) // REPUBLISH_BURSTS_PER_SECOND, 1)
+        next_burst: float = time.monotonic()
+        messages: int = 0
+        count: int = 0
+        last_uuid: str = ''
+        while True:
+            points: List[PointModel] = MqttRepublish.__query_points(last_uuid)
+            # the points stay loaded, no cursor nor transaction is kept open across the sleeps
+            db.session.close()
+            if not points:
+                break
+            last_uuid = points[-1].uuid
+            for point in points:
+                point.publish_cov(point.point_store, point.device, point.device.network)
+                count += 1
+                messages += 1 if point.point_store.fault else 2
+                if messages >= burst:
+                    next_burst += messages / rate
+                    messages = 0
+                    thread.sleep(max(next_burst - time.monotonic(), 0))
+                    MqttRepublish.__wait_for_queue(client, burst / rate)
+        logger.info(f"Finished MQTT republish of {count} points")
+
+    @staticmethod
+    def __query_points(last_uuid: str) -> List[PointModel]:
+        """
+        Next page of points after last_uuid, with their device, network, store and priority array in one query
+        """
+        return PointModel.query \
+            .join(PointModel.device) \
+            .join(DeviceModel.network) \
+            .join(PointModel.point_store) \
+            .outerjoin(PointModel.priority_array_write) \
+            .options(contains_eager(PointModel.device).contains_eager(DeviceModel.network),
+                     contains_eager(PointModel.point_store),
+                     contains_eager(PointModel.priority_array_write)) \
+            .filter(PointModel.uuid > last_uuid) \
+            .order_by(PointModel.uuid) \
+            .limit(REPUBLISH_PAGE_SIZE).all()
+
+    @staticmethod
+    def __wait_for_queue(client: MqttClient, interval: float):
+        """
+        Do not run ahead of a broker slower than the rate, the queue would drop the oldest messages
+        """
+        queue: Union[MqttPublishQueue, None] = client.publish_queue
+        while queue is not None and queue.depth >= client.config.publish_queue_size // 2:
+            thread.sleep(interval)
@@ -0,0 +1,266 @@
+import atexit
+import logging
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, Set, Tuple, Union
+
+from flask import current_app
+from gevent import sleep
+from sqlalchemy.exc import IntegrityError
+
+from src import db
+from src.models.model_point_history import PointHistoryModel
+from src.setting import PointHistorySetting
+from src.utils import Singleton
+from src.utils.model_utils import get_datetime
+
+logger = logging.getLogger(__name__)
+
+"""
+Seconds of samples rolled up into one row of point_histories
+"""
+ROLL_UP_SECONDS: int = 60
+
+"""
+Most buckets returned by one history query
+"""
+MAX_BUCKETS: int = 10000
+
+EPOCH: datetime = datetime(1970, 1, 1)
+
+
+def to_timestamp(value: datetime) -> float:
+    return (value - EPOCH).total_seconds()
+
+
+def to_datetime(timestamp: float) -> datetime:
+    return EPOCH + timedelta(seconds=timestamp)
+
+
+class PointHistoryBuffer:
+    """
+    Ring buffer of the (timestamp, value) samples of a point, 16 bytes a sample; it counts the samples which are not
+    rolled up yet, so a roll-up only walks the new ones
+    """
+
+    def __init__(self, size: int):
+        self.__size: int = size
+        self.__timestamps: array = array('d', bytes(8 * size))
+        self.__values: array = array('d', bytes(8 * size))
+        self.__next: int = 0
+        self.__count: int = 0
+        self.__pending: int = 0
+
+    @property
+    def pending(self) -> int:
+        return self.__pending
+
+    def append(self, timestamp: float, value: float):
+        self.__timestamps[self.__next] = timestamp
+        self.__values[self.__next] = value
+        self.__next = (self.__next + 1) % self.__size
+        self.__count = min(self.__count + 1, self.__size)
+        self.__pending = min(self.__pending + 1, self.__size)
+
+    def pending_samples(self, until: float) -> List[Tuple[float, float]]:
+        """
+        Samples appended since they were last consumed which are before until, oldest first
+        """
+        first: int = (self.__next - self.__pending) % self.__size
+        samples: List[Tuple[float, float]] = []
+        for i in range(self.__pending):
+            index: int = (first + i) % self.__size
+            timestamp: float = self.__timestamps[index]
+            if timestamp >= until:
+                break
+            samples.append((timestamp, self.__values[index]))
+        return samples
+
+    def consume(self, count: int):
+        self.__pending = max(self.__pending - count, 0)
+
+    def samples(self, start: float, end: float) -> List[Tuple[float, float]]:
+        """
+        Samples of [start, end), oldest first
+        """
+        first: int = (self.__next - self.__count) % self.__size
+        samples: List[Tuple[float, float]] = []
+        for i in range(self.__count):
+            index: int = (first + i) % self.__size
+            timestamp: float = self.__timestamps[index]
+            if start <= timestamp < end:
+                samples.append((timestamp, self.__values[index]))
+        return samples
+
+
+class PointHistory(metaclass=Singleton):
+    """
+    History of the point values, fed with the samples which go through PointStoreModel.update.
+    Samples of the minutes which are over get rolled up (min, max, avg and count) into point_histories, so queries read
+    the roll-ups of the past and the raw samples of the last minutes.
+    """
+
+    def __init__(self):
+        self.__enabled: bool = False
+        self.__setting: Union[PointHistorySetting, None] = None
+        self.__buffers: Dict[str, PointHistoryBuffer] = {}
+        self.__pending_point_uuids: Set[str] = set()
+        self.__rolled_up_until: float = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    def start(self, setting: PointHistorySetting):
+        if not setting.enabled:
+            logger.info('Point history disabled')
+            return
+        from src import FlaskThread
+        self.__setting = setting
+        self.__rolled_up_until = self.__floor(time.time())
+        self.__enabled = True
+        atexit.register(self.__roll_up_on_exit, current_app._get_current_object())
+        FlaskThread(target=self.__roll_up_loop, daemon=True).start()
+        logger.info(f'Point history enabled, keeping {setting.buffer_size} samples per point')
+
+    def record(self, point_uuid: str, value: Union[float, None]):
+        if not self.__enabled or value is None:
+            return
+        buffer: Union[PointHistoryBuffer, None] = self.__buffers.get(point_uuid)
+        if buffer is None:
+            buffer = self.__buffers[point_uuid] = PointHistoryBuffer(self.__setting.buffer_size)
+        buffer.append(time.time(), value)
+        self.__pending_point_uuids.add(point_uuid)
+
+    def evict(self, point_uuid: str):
+        self.__buffers.pop(point_uuid, None)
+        self.__pending_point_uuids.discard(point_uuid)
+
+    def query(self, point_uuid: str, start: datetime, end: datetime, bucket: float) -> List[dict]:
+        """
+        min, max, avg and count of the samples of each bucket of bucket seconds from start, empty buckets are left out.
+        Roll-ups are a minute long, so buckets shorter than a minute get whole minutes out of them, and the minute start
+        falls in goes whole into the first bucket.
+        """
+        if bucket <= 0:
+            raise ValueError('bucket should be greater than 0')
+        start_ts: float = to_timestamp(start)
+        end_ts: float = to_timestamp(end)
+        if (end_ts - start_ts) / bucket > MAX_BUCKETS:
+            raise ValueError(f'time range can not be split into more than {MAX_BUCKETS} buckets')
+        buckets: Dict[int, List[float]] = {}
+
+        def add(timestamp: float, value_min: float, value_max: float, total: float, count: int):
+            index: int = int((timestamp - start_ts) // bucket)
+            aggregate: Union[List[float], None] = buckets.get(index)
+            if aggregate is None:
+                buckets[index] = [value_min, value_max, total, count]
+            else:
+                aggregate[0] = min(aggregate[0], value_min)
+                aggregate[1] = max(aggregate[1], value_max)
+                aggregate[2] += total
+                aggregate[3] += count
+
+        rolled_up_until: float = min(end_ts, self.__rolled_up_until) if self.__enabled else end_ts
+        if rolled_up_until > start_ts:
+            # raw samples start where the roll-ups end, the roll-up of the minute start falls in is needed as well
+            for row in PointHistoryModel.find_by_point_uuid(point_uuid, to_datetime(self.__floor(start_ts)),
+                                                            to_datetime(rolled_up_until)):
+                add(max(to_timestamp(row.ts), start_ts), row.value_min, row.value_max, row.value_avg * row.count,
+                    row.count)
+        buffer: Union[PointHistoryBuffer, None] = self.__buffers.get(point_uuid)
+        if buffer is not None:
+            for timestamp, value in buffer.samples(max(start_ts, self.__rolled_up_until), end_ts):
+                add(timestamp, value, value, value, 1)
+        return [{
+            'ts': str(to_datetime(start_ts + index * bucket)),
+            'min': value_min,
+            'max': value_max,
+            'avg': total / count,
+            'count': count
+        } for index, (value_min, value_max, total, count) in sorted(buckets.items())]
+
+    def roll_up(self):
+        """
+        Roll up the samples recorded since the last roll-up, of the points which got any
+        """
+        until: float = self.__floor(time.time())
+        if until <= self.__rolled_up_until:
+            return
+        pending: Dict[str, Tuple[PointHistoryBuffer, int, List[dict]]] = {}
+        for point_uuid in list(self.__pending_point_uuids):
+            buffer: Union[PointHistoryBuffer, None] = self.__buffers.get(point_uuid)
+            if buffer is None:
+                self.__pending_point_uuids.discard(point_uuid)
+                continue
+            samples: List[Tuple[float, float]] = buffer.pending_samples(until)
+            minutes: Dict[float, List[float]] = {}
+            for timestamp, value in samples:
+                minute: float = self.__floor(timestamp)
+                aggregate: Union[List[float], None] = minutes.get(minute)
+                if aggregate is None:
+                    minutes[minute] = [value, value, value, 1]
+                else:
+                    aggregate[0] = min(aggregate[0], value)
+                    aggregate[1] = max(aggregate[1], value)
+                    aggregate[2] += value
+                    aggregate[3] += 1
+            pending[point_uuid] = (buffer, len(samples), [{
+                'point_uuid': point_uuid,
+                'ts': to_datetime(minute),
+                'value_min': value_min,
+                'value_max': value_max,
+                'value_avg': total / count,
+                'count': count
+            } for minute, (value_min, value_max, total, count) in minutes.items()])
+        try:
+            self.__write_rows([row for _, _, rows in pending.values() for row in rows])
+            for buffer, count, _ in pending.values():
+                buffer.consume(count)
+        except IntegrityError:
+            # i.e. a point got deleted meanwhile, only the roll-ups of that point are dropped
+            for point_uuid, (buffer, count, rows) in pending.items():
+                try:
+                    self.__write_rows(rows)
+                except IntegrityError as e:
+                    logger.error(f'Point history roll-up of point {point_uuid} dropped: {e}')
+                buffer.consume(count)
+        for point_uuid, (buffer, _, _) in pending.items():
+            if not buffer.pending:
+                self.__pending_point_uuids.discard(point_uuid)
+        try:
+            PointHistoryModel.delete_older_than(get_datetime() - timedelta(days=self.__setting.retention_days))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self.__rolled_up_until = until
+        logger.debug(f'Rolled up {sum(len(rows) for _, _, rows in pending.values())} point history rows')
+
+    @staticmethod
+    def __write_rows(rows: List[dict]):
+        if not rows:
+            return
+        try:
+            PointHistoryModel.write_rows(rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def __roll_up_loop(self):
+        while True:
+            sleep(self.__setting.flush_interval)
+            try:
+                self.roll_up()
+            except Exception as e:
+                logger.error(f'Point history roll-up failed: {e}')
+
+    def __roll_up_on_exit(self, app):
+        with app.app_context():
+            self.roll_up()
+
+    @staticmethod
+    def __floor(timestamp: float) -> float:
+        return timestamp - timestamp % ROLL_UP_SECONDS
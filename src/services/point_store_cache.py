@@ -0,0 +1,101 @@
+import atexit
+import logging
+from typing import Dict, Set, Union
+
+from flask import current_app
+from gevent import sleep
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src import db
+from src.models.model_point_store import PointStoreModel, STATE_COLUMNS
+from src.setting import PointStoreSetting
+from src.utils import Singleton
+from src.utils.model_utils import get_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class PointStoreCache(metaclass=Singleton):
+    """
+    Authoritative latest values of the points when write-behind is enabled.
+    COV is evaluated in memory with the same rules as the conditional UPDATE of PointStoreModel, changed rows are
+    marked dirty and written to the point_stores table in one transaction every flush_interval seconds.
+    """
+
+    def __init__(self):
+        self.__enabled: bool = False
+        self.__flush_interval: float = 0
+        self.__states: Dict[str, dict] = {}
+        self.__dirty: Set[str] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    def start(self, setting: PointStoreSetting):
+        if not setting.flush_interval or setting.flush_interval <= 0:
+            logger.info('Point store write-behind disabled')
+            return
+        from src import FlaskThread
+        self.__flush_interval = setting.flush_interval
+        self.__states = PointStoreModel.find_states()
+        self.__enabled = True
+        atexit.register(self.__flush_on_exit, current_app._get_current_object())
+        FlaskThread(target=self.__flush_loop, daemon=True).start()
+        logger.info(f'Point store write-behind enabled, flushing every {self.__flush_interval} seconds')
+
+    def update(self, point_store, cov_threshold: float = None) -> bool:
+        state: Union[dict, None] = self.__get_state(point_store.point_uuid)
+        if state is None or not point_store.apply_cov(state, cov_threshold, get_datetime()):
+            return False
+        self.__dirty.add(point_store.point_uuid)
+        return True
+
+    def apply(self, point_store):
+        """
+        Overlay the cached state on a point store loaded from the database, without marking it modified
+        """
+        state: Union[dict, None] = self.__states.get(point_store.point_uuid)
+        if state is not None:
+            for column in STATE_COLUMNS:
+                set_committed_value(point_store, column, state[column])
+
+    def evict(self, point_uuid: str):
+        self.__states.pop(point_uuid, None)
+        self.__dirty.discard(point_uuid)
+
+    def flush(self):
+        if not self.__dirty:
+            return
+        dirty: Set[str] = self.__dirty
+        self.__dirty = set()
+        states: Dict[str, dict] = {point_uuid: self.__states[point_uuid]
+                                   for point_uuid in dirty if point_uuid in self.__states}
+        try:
+            PointStoreModel.write_states(states)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            self.__dirty |= dirty
+            raise
+        logger.debug(f'Flushed {len(states)} point stores')
+
+    def __flush_loop(self):
+        while True:
+            sleep(self.__flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f'Point store flush failed: {e}')
+
+    def __flush_on_exit(self, app):
+        with app.app_context():
+            self.flush()
+
+    def __get_state(self, point_uuid: str) -> Union[dict, None]:
+        state: Union[dict, None] = self.__states.get(point_uuid)
+        if state is None:
+            state = PointStoreModel.find_states([point_uuid]).get(point_uuid)
+            if state is not None:
+                self.__states[point_uuid] = state
+        return state
@@ -0,0 +1,55 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Union
+
+from src.enums.device import DeviceHealthState
+from src.utils import Singleton
+from src.utils.model_utils import get_datetime
+
+logger = logging.getLogger(__name__)
+
+"""
+Seconds a device is skipped after its first failure, doubled on each failure up to BACKOFF_MAX
+"""
+BACKOFF_INITIAL: float = 5
+BACKOFF_MAX: float = 300
+
+
+class DeviceHealth:
+    def __init__(self):
+        self.state: DeviceHealthState = DeviceHealthState.ONLINE
+        self.failures: int = 0
+        self.next_probe: Union[datetime, None] = None
+
+
+class DeviceHealthRegistry(metaclass=Singleton):
+    """
+    Devices which do not answer are quarantined: they are skipped with an exponential backoff and probed with a single
+    request once it is over, so a dead device does not cost a timeout on each sweep of its network
+    """
+
+    def __init__(self):
+        self.__health: Dict[str, DeviceHealth] = {}
+
+    def get_health(self, device_uuid: str) -> DeviceHealth:
+        return self.__health.get(device_uuid) or DeviceHealth()
+
+    def is_due(self, device_uuid: str) -> bool:
+        health: Union[DeviceHealth, None] = self.__health.get(device_uuid)
+        return health is None or get_datetime() >= health.next_probe
+
+    def record_success(self, device_uuid: str):
+        if self.__health.pop(device_uuid, None):
+            logger.info(f'Device {device_uuid} is back online')
+
+    def record_failure(self, device_uuid: str):
+        health: DeviceHealth = self.__health.setdefault(device_uuid, DeviceHealth())
+        health.state = DeviceHealthState.QUARANTINED
+        health.failures += 1
+        backoff: float = min(BACKOFF_INITIAL * 2 ** (health.failures - 1), BACKOFF_MAX)
+        health.next_probe = get_datetime() + timedelta(seconds=backoff)
+        logger.warning(f'Device {device_uuid} is not answering, failures: {health.failures}, '
+                       f'next probe in {backoff} seconds')
+
+    def reset(self, device_uuid: str):
+        self.__health.pop(device_uuid, None)
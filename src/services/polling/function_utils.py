@@ -1,11 +1,12 @@
 from typing import List
 
 from pymodbus.constants import Endian
-from pymodbus.payload import BinaryPayloadDecoder, BinaryPayloadBuilder
+from pymodbus.payload import BinaryPayloadBuilder
 
 from src.enums.point import ModbusDataEndian, ModbusDataType
 from src.models.model_point import PointModel
 from src.models.model_priority_array import PriorityArrayModel
+from src.services.polling.register_decoders import RegisterDecoder, get_register_decoder
 
 
 def _set_data_length(data_type: ModbusDataType, reg_length: int) -> int:
@@ -62,22 +63,10 @@ def convert_to_data_type(data, data_type: ModbusDataType, byteorder: Endian, wor
     Converts the data to int, int32, float and so on
     :return: value in the selected data type
     """
-    decoder = BinaryPayloadDecoder.fromRegisters(data, byteorder=byteorder,
-                                                 wordorder=word_order)
-    value = None
-    if data_type == ModbusDataType.INT16:
-        value = decoder.decode_16bit_int()
-    if data_type == ModbusDataType.UINT16:
-        value = decoder.decode_16bit_uint()
-    if data_type == ModbusDataType.INT32:
-        value = decoder.decode_32bit_int()
-    if data_type == ModbusDataType.UINT32:
-        value = decoder.decode_32bit_uint()
-    if data_type == ModbusDataType.FLOAT:
-        value = decoder.decode_32bit_float()
-    elif data_type == ModbusDataType.DOUBLE:
-        value = decoder.decode_16bit_float()
-    return value
+    decoder: RegisterDecoder = get_register_decoder(data_type, byteorder, word_order)
+    if decoder is None:
+        return None
+    return decoder.decode(data)
 
 
 def _builder_data_type(payload, data_type: ModbusDataType, byteorder: Endian, word_order: Endian):
@@ -12,6 +12,12 @@ from src.services.polling.function_utils import _set_data_length, _assertion, \
 logger = logging.getLogger(__name__)
 
 
+class ModbusExceptionResponseError(ModbusIOException):
+    """
+    Error response of a device, which means it is online
+    """
+
+
 def read_analogue(client: BaseModbusClient, reg_start: int, reg_length: int, _unit: int, data_type: ModbusDataType,
                   endian: ModbusDataEndian, func: ModbusFunctionCode) -> (any, list):
     """
@@ -44,7 +50,7 @@ def read_analogue(client: BaseModbusClient, reg_start: int, reg_length: int, _un
         return val, read.registers
     else:
         if not isinstance(read, ModbusIOException):
-            read = ModbusIOException(read)
+            read = ModbusExceptionResponseError(read)
         raise read
 
 
@@ -76,7 +82,7 @@ def read_digital(client: BaseModbusClient, reg_start: int, reg_length: int, _uni
         return val, read.bits[0:reg_length]
     else:
         if not isinstance(read, ModbusIOException):
-            read = ModbusIOException(read)
+            read = ModbusExceptionResponseError(read)
         raise read
 
 
@@ -119,7 +125,7 @@ def write_digital(client: BaseModbusClient, reg_start: int, reg_length: int, _un
             return write_values_[0], write_values_
     else:
         if not isinstance(write, ModbusIOException):
-            write = ModbusIOException(write)
+            write = ModbusExceptionResponseError(write)
         raise write
 
 
@@ -153,7 +159,7 @@ def write_analogue(client: BaseModbusClient, reg_start: int, reg_length: int, _u
         return write_value, payload
     else:
         if not isinstance(write, ModbusIOException):
-            write = ModbusIOException(write)
+            write = ModbusExceptionResponseError(write)
         raise write
 
 
@@ -180,7 +186,7 @@ def write_analogue_aggregate(client: BaseModbusClient, reg_start: int, reg_lengt
         return None, payload
     else:
         if not isinstance(write, ModbusIOException):
-            write = ModbusIOException(write)
+            write = ModbusExceptionResponseError(write)
         raise write
 
 
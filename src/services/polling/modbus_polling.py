@@ -2,22 +2,33 @@ import logging
 import time
 from abc import abstractmethod
 from copy import deepcopy
-from typing import Union, List
+from typing import Union, List, Set, Dict
 
+from flask import current_app
 from gevent import sleep
+from gevent.pool import Pool
 from pymodbus.client.sync import BaseModbusClient
 from pymodbus.exceptions import ConnectionException, ModbusIOException
+from sqlalchemy.orm import contains_eager, selectinload
 from sqlalchemy.orm.exc import ObjectDeletedError
 
 from src import db, FlaskThread
-from src.enums.point import ModbusFunctionCode
+from src.enums.drivers import Drivers
 from src.models.model_device import DeviceModel
 from src.models.model_network import NetworkModel, ModbusType
 from src.models.model_point import PointModel
 from src.services.modbus_registry import ModbusRegistryConnection, ModbusRegistry
 from src.services.modbus_rtu_registry import ModbusRtuRegistry
 from src.services.modbus_tcp_registry import ModbusTcpRegistry, ModbusTcpRegistryKey
+from src.services.mqtt_client import MqttClient
+from src.services.polling.device_health import DeviceHealthRegistry
+from src.services.polling.functions import ModbusExceptionResponseError
 from src.services.polling.poll import poll_point, poll_point_aggregate
+from src.services.polling.poll_scheduler import PollScheduler, get_polling_interval
+from src.services.polling.read_plan import DeviceReadPlan, PlanBlock, ReadPlanCache, group_contiguous_points, \
+    get_max_block_size, group_write_points
+from src.services.polling.rtu_pacing import RtuPacing
+from src.services.polling.write_queue import PointWriteQueue
 from src.models.model_point_store import PointStoreModel
 from src.models.model_priority_array import PriorityArrayModel
 from src.utils import Singleton
@@ -66,111 +77,195 @@ class ModbusPolling(metaclass=Singleton):
         Poll connection points on a thread
         """
         self.__log_debug(f'Starting thread for {network}')
+        scheduler: PollScheduler = PollScheduler()
+        network_uuid: str = network.uuid
+        # models are loaded once per sweep, commits of the sweep must not expire them
+        db.session().expire_on_commit = False
         while True:
+            db.session.expire_all()
             current_connection: Union[ModbusRegistryConnection, None] = \
                 self.get_registry().get_connection(network)
             if not current_connection:
                 self.__log_debug(f'Stopping thread for {network}, no connection')
+                PointWriteQueue().remove_network(network_uuid)
                 break
-            network: Union[NetworkModel, None] = self.__get_network(network.uuid)
+            network: Union[NetworkModel, None] = self.__get_network(network_uuid)
             if not network:
                 self.__log_debug(f'Stopping thread for {network}, network not found')
+                PointWriteQueue().remove_network(network_uuid)
                 return
             try:
-                self.__poll_network_devices(current_connection, network)
+                self.__poll_network_devices(current_connection, network, scheduler)
                 db.session.commit()
             except Exception as e:
                 self.__log_error(str(e))
-            time.sleep(network.polling_interval_runtime)
+            # queued writes wake the thread up before the next point is due
+            PointWriteQueue().wait(network_uuid, self.__get_sleep_time(network, scheduler))
 
-    def __poll_network_devices(self, current_connection, network: NetworkModel):
+    @staticmethod
+    def __get_sleep_time(network: NetworkModel, scheduler: PollScheduler) -> float:
+        """
+        Sleep till the next point is due, but wake up at least every polling_interval_runtime for new points
+        """
+        next_deadline: Union[float, None] = scheduler.next_deadline()
+        if next_deadline is None:
+            return network.polling_interval_runtime
+        return min(max(next_deadline - time.monotonic(), 0), network.polling_interval_runtime)
+
+    def __poll_network_devices(self, current_connection: ModbusRegistryConnection, network: NetworkModel,
+                               scheduler: PollScheduler):
         current_connection.is_running = True
+        with current_connection.acquire_client() as client:
+            if not self.__write_queued_points(client, network):
+                return
+        now: float = time.monotonic()
+        due: Set[str] = scheduler.pop_due(now)
         devices: List[DeviceModel] = self.__get_network_devices(network.uuid)
+        due_devices: List[tuple] = []
         for device in devices:
-            if not self.__ping_point(current_connection, network, device):
-                # we suppose that device is offline, so we are not wasting time for looping
+            points: List[PointModel] = [point for point in device.points if point.enable]
+            plan: DeviceReadPlan = ReadPlanCache().get_plan(device, points)
+            blocks: List[PlanBlock] = [block for block in plan.blocks if scheduler.is_due(block.key, due)]
+            if not blocks:
+                # nothing is due on this device, so we are not wasting time on pinging it
                 continue
-            points: List[PointModel] = self.__get_all_device_points(device.uuid)
+            points_by_uuid: Dict[str, PointModel] = {point.uuid: point for point in points}
+            for block in blocks:
+                scheduler.schedule(block.key,
+                                   get_polling_interval(network, device, points_by_uuid[block.point_uuids[0]]), now)
+            due_devices.append((device, points_by_uuid, blocks))
+
+        if current_connection.max_in_flight > 1 and len(due_devices) > 1:
+            # workers write from their own sessions, the sweep must not keep the SQLite writer lock meanwhile
+            db.session.commit()
+            self.__poll_devices_concurrently(current_connection, network, due_devices)
+            return
+        for device, points_by_uuid, blocks in due_devices:
+            with current_connection.acquire_client() as client:
+                if not self.__poll_device(client, network, device, points_by_uuid, blocks):
+                    return
+
+    def __poll_devices_concurrently(self, current_connection: ModbusRegistryConnection, network: NetworkModel,
+                                    due_devices: List[tuple]):
+        """
+        Devices are spread across max_in_flight workers, each of them holding one client of the connection at a time
+        """
+        app = current_app._get_current_object()
+        pool: Pool = Pool(current_connection.max_in_flight)
+        for device, _, blocks in due_devices:
+            pool.spawn(self.__poll_device_worker, app, current_connection, network.uuid, device.uuid, blocks)
+        pool.join()
+
+    def __poll_device_worker(self, app, current_connection: ModbusRegistryConnection, network_uuid: str,
+                             device_uuid: str, blocks: List[PlanBlock]):
+        """
+        Workers have their own session, so they load the models by their uuids rather than sharing the ones of the
+        sweep; blocks of the points deleted meanwhile are skipped
+        """
+        with app.app_context():
+            db.session().expire_on_commit = False
+            try:
+                network: Union[NetworkModel, None] = NetworkModel.find_by_uuid(network_uuid)
+                device: Union[DeviceModel, None] = DeviceModel.find_by_uuid(device_uuid)
+                if network is None or device is None:
+                    return
+                points_by_uuid: Dict[str, PointModel] = {
+                    point.uuid: point for point in
+                    self.__get_points(list({point_uuid for block in blocks for point_uuid in block.point_uuids}))}
+                blocks = [block for block in blocks
+                          if all(point_uuid in points_by_uuid for point_uuid in block.point_uuids)]
+                with current_connection.acquire_client() as client:
+                    self.__poll_device(client, network, device, points_by_uuid, blocks)
+                db.session.commit()
+            except Exception as e:
+                self.__log_error(str(e))
 
-            if not device.supports_multiple_rw:
-                self.__log_debug(f'Device {device.uuid} aggregate R/W UNSUPPORTED')
-                for point in points:
-                    try:
-                        if not self.is_point_to_be_written(point):
-                            continue
-                        self.__poll_point(current_connection.client, network, device, [point])
-                    except ConnectionException:
-                        return
-                    except ModbusIOException:
-                        pass
-            else:
-                self.__log_debug(f'Device {device.uuid} aggregate R/W SUPPORTED')
-                """
-                group and sort points into corresponding FCs
-                """
-                fc_lists: List[List[PointModel]] = [[], [], [], [], [], []]
-
-                for point in points:
-                    if point.function_code is ModbusFunctionCode.READ_COILS:
-                        fc_lists[0].append(point)
-                    elif point.function_code is ModbusFunctionCode.READ_DISCRETE_INPUTS:
-                        fc_lists[1].append(point)
-                    elif point.function_code is ModbusFunctionCode.READ_HOLDING_REGISTERS:
-                        fc_lists[2].append(point)
-                    elif point.function_code is ModbusFunctionCode.READ_INPUT_REGISTERS:
-                        fc_lists[3].append(point)
-                    elif point.function_code is ModbusFunctionCode.WRITE_COIL or \
-                            point.function_code is ModbusFunctionCode.WRITE_COILS:
-                        fc_lists[4].append(point)
-                    elif point.function_code is ModbusFunctionCode.WRITE_REGISTER or \
-                            point.function_code is ModbusFunctionCode.WRITE_REGISTERS:
-                        fc_lists[5].append(point)
-                    else:
-                        raise Exception(f'FC {point.function_code} unsupported for aggregate')
+    def __poll_device(self, client: BaseModbusClient, network: NetworkModel, device: DeviceModel,
+                      points_by_uuid: Dict[str, PointModel], blocks: List[PlanBlock]) -> bool:
+        with MqttClient().batch_cov(Drivers.MODBUS.name, network, device):
+            return self.__poll_device_blocks(client, network, device, points_by_uuid, blocks)
 
+    def __poll_device_blocks(self, client: BaseModbusClient, network: NetworkModel, device: DeviceModel,
+                             points_by_uuid: Dict[str, PointModel], blocks: List[PlanBlock]) -> bool:
+        """
+        Returns False when the connection got lost.
+        The ping point, or else the first request, tells whether the device is online; a quarantined device is not
+        polled till its backoff is over, and then only that single request probes it.
+        """
+        health: DeviceHealthRegistry = DeviceHealthRegistry()
+        if not health.is_due(device.uuid):
+            return True
+        if not self.__ping_point(client, network, device):
+            # we suppose that device is offline, so we are not wasting time for looping
+            health.record_failure(device.uuid)
+            return True
+
+        self.__log_debug(f'Device {device.uuid} aggregate R/W '
+                         f'{"SUPPORTED" if device.supports_multiple_rw else "UNSUPPORTED"}')
+        answered: bool = bool(device.ping_point)
+        for block in blocks:
+            if PointWriteQueue().has_pending(network.uuid) and not self.__write_queued_points(client, network):
+                return False
+            block_points: List[PointModel] = block.get_points(points_by_uuid)
+            if block.is_write:
                 # not the most efficient in respect to polling loop time (i.e. lora netowrks)
                 #  but most efficient in respect to wear on end device individual register writes
-                fc_lists[4][:] = [p for p in fc_lists[4] if self.is_point_to_be_written(p)]
-                fc_lists[5][:] = [p for p in fc_lists[5] if self.is_point_to_be_written(p)]
-
-                for fc_list in fc_lists:
-                    fc_list.sort(key=lambda p: p.register)
-
-                    last_point = 0
-                    response_size = 0
-                    for i in range(len(fc_list)):
-                        response_size += fc_list[i].register_length
-                        next_reg = 0
-                        if i < len(fc_list) - 1:
-                            next_reg: int = fc_list[i].register + fc_list[i].register_length
-
-                        """
-                        if - end of list
-                           - response size limit reached
-                           - next point is not continuous from current point
-                        """
-                        if i == len(fc_list) - 1 or response_size + fc_list[i + 1].register_length >= 253 or \
-                                fc_list[i + 1].register != next_reg:
-                            try:
-                                if last_point == i:
-                                    self.__log_debug(f'Polling SINGLE FC {fc_list[i].function_code}')
-                                    self.__poll_point(current_connection.client, network, device, fc_list[i:i + 1])
-                                    last_point += 1
-                                else:
-                                    self.__log_debug(f'Polling AGGREGATE FC {fc_list[i].function_code}')
-                                    self.__poll_point(current_connection.client, network, device,
-                                                      fc_list[last_point:i + 1])
-                                    last_point = i + 1
-                                response_size = 0
-                            except ConnectionException:
-                                return
-                            except ModbusIOException:
-                                pass
-                        else:
-                            continue
+                block_points = [point for point in block_points if self.is_point_to_be_written(point)]
+                max_block_size: int = get_max_block_size(device, block.function_code)
+                requests: List[tuple] = [(group, None) for group in
+                                         group_contiguous_points(block_points, max_block_size)]
+            else:
+                requests: List[tuple] = [(block_points, block.offsets)]
+            for point_group, offsets in requests:
+                try:
+                    if len(point_group) == 1:
+                        self.__log_debug(f'Polling SINGLE FC {point_group[0].function_code}')
+                    else:
+                        self.__log_debug(f'Polling AGGREGATE FC {point_group[0].function_code}')
+                    self.__poll_point(client, network, device, point_group, offsets=offsets)
+                    answered = True
+                except ConnectionException:
+                    return False
+                except ModbusExceptionResponseError:
+                    answered = True
+                except ModbusIOException:
+                    if not answered:
+                        health.record_failure(device.uuid)
+                        return True
+        if answered:
+            health.record_success(device.uuid)
+        return True
 
-    def __ping_point(self, current_connection: ModbusRegistryConnection, network: NetworkModel,
-                     device: DeviceModel) -> bool:
+    def __write_queued_points(self, client: BaseModbusClient, network: NetworkModel) -> bool:
+        """
+        Write the queued points of the network, preempting the scheduled polling.
+        Returns False when the connection got lost, the scheduled write blocks retry them on their next due time.
+        """
+        point_uuids: List[str] = PointWriteQueue().pop_all(network.uuid)
+        if not point_uuids:
+            return True
+        points: Dict[str, PointModel] = {point.uuid: point for point in
+                                         self.__get_network_points(network.uuid, point_uuids)}
+        device_points: Dict[str, List[PointModel]] = {}
+        for point_uuid in point_uuids:
+            point: Union[PointModel, None] = points.get(point_uuid)
+            if point is not None and self.is_point_to_be_written(point):
+                device_points.setdefault(point.device_uuid, []).append(point)
+        for point_list in device_points.values():
+            device: DeviceModel = point_list[0].device
+            if not DeviceHealthRegistry().is_due(device.uuid):
+                continue
+            for point_group in group_write_points(device, point_list):
+                try:
+                    self.__log_debug(f'Writing queued {len(point_group)} point(s) FC {point_group[0].function_code}')
+                    self.__poll_point(client, network, device, point_group)
+                except ConnectionException:
+                    return False
+                except ModbusIOException:
+                    pass
+        return True
+
+    def __ping_point(self, client: BaseModbusClient, network: NetworkModel, device: DeviceModel) -> bool:
         """
         Poll connection points
         Checks whether the pinging point is fine or not?
@@ -178,7 +273,7 @@ class ModbusPolling(metaclass=Singleton):
         if device.ping_point:
             try:
                 ping_point = PointModel.create_temporary_from_string(device.ping_point)
-                self.__poll_point(current_connection.client, network, device, [ping_point], True, False)
+                self.__poll_point(client, network, device, [ping_point], True, False)
             except (ConnectionException, ModbusIOException):
                 return False
             except ValueError as e:
@@ -195,16 +290,30 @@ class ModbusPolling(metaclass=Singleton):
 
     @staticmethod
     def __get_network_devices(network_uuid: str) -> List[DeviceModel]:
-        return DeviceModel.query.filter_by(network_uuid=network_uuid, enable=True).all()
+        """
+        Devices with their points, priority arrays and point stores, loaded with four queries whatever their count
+        """
+        return DeviceModel.query.filter_by(network_uuid=network_uuid, enable=True) \
+            .options(selectinload(DeviceModel.points).selectinload(PointModel.priority_array_write),
+                     selectinload(DeviceModel.points).selectinload(PointModel.point_store)).all()
 
     @staticmethod
-    def __get_all_device_points(device_uuid: str) -> List[PointModel]:
-        return PointModel.query.filter_by(device_uuid=device_uuid, enable=True).all()
+    def __get_points(point_uuids: List[str]) -> List[PointModel]:
+        return PointModel.query.filter(PointModel.uuid.in_(point_uuids)) \
+            .options(selectinload(PointModel.priority_array_write), selectinload(PointModel.point_store)).all()
+
+    @staticmethod
+    def __get_network_points(network_uuid: str, point_uuids: List[str]) -> List[PointModel]:
+        return PointModel.query.filter(PointModel.uuid.in_(point_uuids)).filter_by(enable=True) \
+            .join(DeviceModel).filter_by(network_uuid=network_uuid, enable=True) \
+            .options(contains_eager(PointModel.device), selectinload(PointModel.priority_array_write),
+                     selectinload(PointModel.point_store)).all()
 
     def poll_point_not_existing(self, point: PointModel, device: DeviceModel, network: NetworkModel):
         self.__log_debug(f'Manual poll request Non Existing Point {point}')
         connection: ModbusRegistryConnection = self.get_registry().add_edit_and_get_connection(network)
-        point_store = self.__poll_point(connection.client, network, device, [point], False, False)
+        with connection.acquire_client() as client:
+            point_store = self.__poll_point(client, network, device, [point], False, False)
         return point_store
 
     def poll_point(self, point: PointModel) -> PointModel:
@@ -213,14 +322,16 @@ class ModbusPolling(metaclass=Singleton):
         network: NetworkModel = NetworkModel.find_by_uuid(device.network_uuid)
         self.__log_debug(f'Manual poll request: network: {network.uuid}, device: {device.uuid}, point: {point.uuid}')
         connection: ModbusRegistryConnection = self.get_registry().add_edit_and_get_connection(network)
-        self.__poll_point(connection.client, network, device, [point])
+        with connection.acquire_client() as client:
+            self.__poll_point(client, network, device, [point])
         return point
 
     @staticmethod
     def __poll_point(client: BaseModbusClient, network: NetworkModel, device: DeviceModel,
                      point_list: List[PointModel], update_device_and_network: bool = True,
-                     update_point_store: bool = True) -> Union[PointStoreModel, None]:
+                     update_point_store: bool = True, offsets: List[int] = None) -> Union[PointStoreModel, None]:
         point_store: Union[PointStoreModel, None] = None
+        started: float = ModbusPolling.__wait_for_bus(client, network)
         if update_device_and_network:
             if len(point_list) > 0:
                 try:
@@ -229,7 +340,7 @@ class ModbusPolling(metaclass=Singleton):
                         if len(point_list) == 1:
                             point_store = poll_point(client, network, device, point_list[0], update_point_store)
                         elif len(point_list) > 1:
-                            poll_point_aggregate(client, network, device, point_list)
+                            poll_point_aggregate(client, network, device, point_list, offsets)
                         else:
                             raise Exception("Invalid __poll_point point_list length")
                     except ConnectionException as e:
@@ -247,16 +358,33 @@ class ModbusPolling(metaclass=Singleton):
                             not isinstance(error, ConnectionException):
                         device.set_fault(False)
 
+                    ModbusPolling.__release_bus(client, network, device, point_list, started, error is None)
                     if error is not None:
                         raise error
                 except ObjectDeletedError:
                     return None
-                time.sleep(float(network.point_interval_ms_between_points) / 1000)
         else:
             point_store = poll_point(client, network, device, point_list[0], update_point_store)
-            time.sleep(float(network.point_interval_ms_between_points) / 1000)
+            ModbusPolling.__release_bus(client, network, device, point_list, started, True)
         return point_store
 
+    @staticmethod
+    def __wait_for_bus(client: BaseModbusClient, network: NetworkModel) -> float:
+        if network.type == ModbusType.RTU:
+            RtuPacing().wait(client, network)
+        return time.time()
+
+    @staticmethod
+    def __release_bus(client: BaseModbusClient, network: NetworkModel, device: DeviceModel,
+                      point_list: List[PointModel], started: float, replied: bool):
+        """
+        Serial buses are paced by RtuPacing, TCP networks sleep point_interval_ms_between_points after each success
+        """
+        if network.type == ModbusType.RTU:
+            RtuPacing().complete(client, network, device, point_list, started, replied)
+        elif replied:
+            time.sleep(float(network.point_interval_ms_between_points) / 1000)
+
     @staticmethod
     def is_point_to_be_written(point: PointModel) -> bool:
         write_value: float = PriorityArrayModel.get_highest_priority_value_from_priority_array(
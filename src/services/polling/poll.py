@@ -1,6 +1,6 @@
 import logging
 import numbers
-from typing import List
+from typing import List, Union
 
 from pymodbus.client.sync import BaseModbusClient
 from pymodbus.exceptions import ModbusIOException
@@ -9,25 +9,31 @@ from src.enums.point import ModbusFunctionCode, ModbusDataType, ModbusDataEndian
 from src.models.model_device import DeviceModel
 from src.models.model_network import NetworkModel
 from src.models.model_point import PointModel
-from src.services.polling.function_utils import _mod_point_data_endian, convert_to_data_type, \
-    pack_point_write_registers
+from src.services.polling.function_utils import _mod_point_data_endian, pack_point_write_registers
 from src.services.polling.functions import read_digital, write_digital, \
     read_analogue, write_analogue, write_analogue_aggregate
 from src.models.model_point_store import PointStoreModel
 from src.models.model_priority_array import PriorityArrayModel
+from src.services.polling.register_decoders import RegisterDecoder, decode_registers, get_register_decoder
 
 logger = logging.getLogger(__name__)
 
 
 def poll_point_aggregate(client: BaseModbusClient, network: NetworkModel,
-                         device: DeviceModel, point_slice) -> None:
+                         device: DeviceModel, point_slice, offsets: List[int] = None) -> None:
+    """
+    Poll a block of points with a single request
+    :param offsets: register offsets of the points from the first point, contiguous points by default, registers
+                    between the points are read and thrown away
+    """
     device_address: int = device.address
     zero_based: bool = device.zero_based
     point_register: int = point_slice[0].register
-    point_register_length = 0
+    if offsets is None:
+        offsets = [point.register - point_register for point in point_slice]
+    point_register_length = max(offset + point.register_length for point, offset in zip(point_slice, offsets))
     write_values = []
     for point in point_slice:
-        point_register_length += point.register_length
         write_value: float = PriorityArrayModel.get_highest_priority_value_from_priority_array(
             point.priority_array_write) or 0
         write_values.append(write_value)
@@ -54,41 +60,53 @@ def poll_point_aggregate(client: BaseModbusClient, network: NetworkModel,
         fault_message = str(e)
         error = e
 
-    arr_ind = 0
-    for point in point_slice:
+    decoders: List[tuple] = [
+        (get_register_decoder(point.data_type, *_mod_point_data_endian(point.data_endian)), arr_ind)
+        if point.data_type is not ModbusDataType.RAW and point.data_type is not ModbusDataType.DIGITAL
+        else (None, arr_ind) for point, arr_ind in zip(point_slice, offsets)]
+    decoded_values: List[any] = []
+    if not fault:
+        decoded_values = decode_registers(array, decoders)
+
+    point_stores: List[PointStoreModel] = []
+    for index, (point, arr_ind) in enumerate(zip(point_slice, offsets)):
         point_store_new = None
         if not fault:
 
             if point.data_type is not ModbusDataType.RAW and point.data_type is not ModbusDataType.DIGITAL:
-                byteorder, word_order = _mod_point_data_endian(point.data_endian)
                 arr_slice = array[arr_ind:arr_ind + point.register_length]
-                val = convert_to_data_type(arr_slice, point.data_type, byteorder,
-                                           word_order)
+                val = decoded_values[index]
             elif point.data_type is ModbusDataType.DIGITAL:
                 arr_slice = array[arr_ind:arr_ind + 1]
                 val = array[arr_ind]
             else:
-                arr_slice = array[arr_ind:point.register_length]
+                arr_slice = array[arr_ind:arr_ind + point.register_length]
                 val = array[arr_ind]
 
-            arr_ind += point.register_length
-
             if isinstance(val, numbers.Number):
                 point_store_new = PointStoreModel(value_original=float(str(val)), value_raw=str(arr_slice),
                                                   point_uuid=point.uuid)
             else:
-                fault_message = f"Received not numeric value, type is: {type(val)}"
-                fault = True
-                logger.error(fault_message)
+                decoder: Union[RegisterDecoder, None] = decoders[index][0]
+                if decoder is not None and arr_ind + decoder.register_length > len(array):
+                    # i.e. register_length of the point is stale, shorter than its data type
+                    point_fault_message = f"{point.data_type.name} registers {arr_ind}-" \
+                                          f"{arr_ind + decoder.register_length - 1} out of the block of " \
+                                          f"{len(array)} registers"
+                else:
+                    point_fault_message = f"Received not numeric value, type is: {type(val)}"
+                logger.error(f'Point {point.uuid}: {point_fault_message}')
+                point_store_new = PointStoreModel(fault=True, fault_message=point_fault_message,
+                                                  point_uuid=point.uuid)
 
         if not point_store_new:
             point_store_new = PointStoreModel(fault=fault, fault_message=fault_message, point_uuid=point.uuid)
+        point_stores.append(point_store_new)
 
-        try:
-            if point.update_point_value(point_store_new):
-                point.publish_cov(point_store_new, device, network)
-        except BaseException as e:
-            logger.error(e)
+    try:
+        PointModel.update_point_values(point_slice, point_stores, device, network)
+    except BaseException as e:
+        logger.error(e)
 
     if error is not None:
         raise error
@@ -0,0 +1,51 @@
+import heapq
+from typing import Dict, List, Set, Tuple, Union
+
+from src.models.model_device import DeviceModel
+from src.models.model_network import NetworkModel
+from src.models.model_point import PointModel
+
+
+def get_polling_interval(network: NetworkModel, device: DeviceModel, point: PointModel) -> float:
+    """
+    Point interval wins over device interval, which wins over the network polling_interval_runtime
+    """
+    if point.polling_interval:
+        return point.polling_interval
+    if device.polling_interval:
+        return device.polling_interval
+    return network.polling_interval_runtime
+
+
+class PollScheduler:
+    """
+    Deadline ordered scheduler of a network polling thread.
+    Keys which never have been scheduled are due straight away, keys which are not re-scheduled after being due are
+    forgotten (i.e. deleted or disabled points).
+    """
+
+    def __init__(self):
+        self.__deadlines: Dict[str, float] = {}
+        self.__queue: List[Tuple[float, str]] = []
+
+    def pop_due(self, now: float) -> Set[str]:
+        due: Set[str] = set()
+        while self.__queue and self.__queue[0][0] <= now:
+            deadline, key = heapq.heappop(self.__queue)
+            if self.__deadlines.get(key) == deadline:
+                del self.__deadlines[key]
+                due.add(key)
+        return due
+
+    def is_due(self, key: str, due: Set[str]) -> bool:
+        return key in due or key not in self.__deadlines
+
+    def schedule(self, key: str, interval: float, now: float):
+        deadline: float = now + interval
+        self.__deadlines[key] = deadline
+        heapq.heappush(self.__queue, (deadline, key))
+
+    def next_deadline(self) -> Union[float, None]:
+        while self.__queue and self.__deadlines.get(self.__queue[0][1]) != self.__queue[0][0]:
+            heapq.heappop(self.__queue)
+        return self.__queue[0][0] if self.__queue else None
@@ -0,0 +1,163 @@
+import logging
+from typing import Dict, FrozenSet, List
+
+from src.enums.point import ModbusFunctionCode
+from src.models.model_device import DeviceModel
+from src.models.model_point import PointModel
+from src.utils import Singleton
+
+logger = logging.getLogger(__name__)
+
+"""
+Maximum quantity of coils/registers per request allowed by the Modbus specification
+"""
+MAX_BLOCK_SIZES: Dict[ModbusFunctionCode, int] = {
+    ModbusFunctionCode.READ_COILS: 2000,
+    ModbusFunctionCode.READ_DISCRETE_INPUTS: 2000,
+    ModbusFunctionCode.READ_HOLDING_REGISTERS: 125,
+    ModbusFunctionCode.READ_INPUT_REGISTERS: 125,
+    ModbusFunctionCode.WRITE_COIL: 1968,
+    ModbusFunctionCode.WRITE_COILS: 1968,
+    ModbusFunctionCode.WRITE_REGISTER: 123,
+    ModbusFunctionCode.WRITE_REGISTERS: 123,
+}
+
+"""
+Function codes which can be aggregated into a single request
+"""
+FC_GROUPS: Dict[ModbusFunctionCode, int] = {
+    ModbusFunctionCode.READ_COILS: 0,
+    ModbusFunctionCode.READ_DISCRETE_INPUTS: 1,
+    ModbusFunctionCode.READ_HOLDING_REGISTERS: 2,
+    ModbusFunctionCode.READ_INPUT_REGISTERS: 3,
+    ModbusFunctionCode.WRITE_COIL: 4,
+    ModbusFunctionCode.WRITE_COILS: 4,
+    ModbusFunctionCode.WRITE_REGISTER: 5,
+    ModbusFunctionCode.WRITE_REGISTERS: 5,
+}
+
+
+def get_max_block_size(device: DeviceModel, function_code: ModbusFunctionCode) -> int:
+    max_block_size: int = MAX_BLOCK_SIZES[function_code]
+    if device.max_block_size:
+        return min(device.max_block_size, max_block_size)
+    return max_block_size
+
+
+def group_contiguous_points(points: List[PointModel], max_block_size: int, max_gap: int = 0,
+                            allow_overlap: bool = False) -> List[List[PointModel]]:
+    """
+    Split register sorted points on holes bigger than max_gap or when the block size limit is reached.
+    Filler registers of the holes are read and thrown away, so max_gap must be 0 and overlaps are not allowed for
+    writes.
+    """
+    groups: List[List[PointModel]] = []
+    block_start: int = 0
+    block_end: int = 0
+    for point in points:
+        point_end: int = point.register + point.register_length
+        gap: int = point.register - block_end
+        if groups and (allow_overlap or gap >= 0) and gap <= max_gap and \
+                max(block_end, point_end) - block_start <= max_block_size:
+            groups[-1].append(point)
+            block_end = max(block_end, point_end)
+            continue
+        groups.append([point])
+        block_start = point.register
+        block_end = point_end
+    return groups
+
+
+def group_write_points(device: DeviceModel, points: List[PointModel]) -> List[List[PointModel]]:
+    """
+    Points of adjacent registers are written with a single FC15/FC16 request when the device supports it
+    """
+    if not device.supports_multiple_rw:
+        return [[point] for point in points]
+    fc_lists: Dict[int, List[PointModel]] = {}
+    for point in points:
+        fc_lists.setdefault(FC_GROUPS[point.function_code], []).append(point)
+    groups: List[List[PointModel]] = []
+    for group_key in sorted(fc_lists):
+        fc_list: List[PointModel] = sorted(fc_lists[group_key], key=lambda p: p.register)
+        groups.extend(group_contiguous_points(fc_list, get_max_block_size(device, fc_list[0].function_code)))
+    return groups
+
+
+class PlanBlock:
+    """
+    Points which are polled with a single Modbus request, along with the register offsets to decode them from the
+    response
+    """
+
+    def __init__(self, device_uuid: str, points: List[PointModel]):
+        self.key: str = f'{device_uuid}:{points[0].uuid}'
+        self.function_code: ModbusFunctionCode = points[0].function_code
+        self.is_write: bool = PointModel.is_writable(self.function_code)
+        self.point_uuids: List[str] = [point.uuid for point in points]
+        self.offsets: List[int] = [point.register - points[0].register for point in points]
+
+    def get_points(self, points_by_uuid: Dict[str, PointModel]) -> List[PointModel]:
+        return [points_by_uuid[point_uuid] for point_uuid in self.point_uuids]
+
+
+class DeviceReadPlan:
+    """
+    Grouped, sorted and coalesced request blocks of a device
+    """
+
+    def __init__(self, device: DeviceModel, points: List[PointModel]):
+        self.point_uuids: FrozenSet[str] = frozenset(point.uuid for point in points)
+        self.supports_multiple_rw: bool = device.supports_multiple_rw
+        self.max_register_gap: int = device.max_register_gap
+        self.max_block_size: int = device.max_block_size
+        self.blocks: List[PlanBlock] = []
+        if not device.supports_multiple_rw:
+            self.blocks = [PlanBlock(device.uuid, [point]) for point in points]
+            return
+        fc_lists: Dict[tuple, List[PointModel]] = {}
+        for point in points:
+            if point.function_code not in FC_GROUPS:
+                raise Exception(f'FC {point.function_code} unsupported for aggregate')
+            # points with different polling_interval are never read together, they are not due at the same time
+            fc_lists.setdefault((FC_GROUPS[point.function_code], point.polling_interval or 0), []).append(point)
+        for group_key in sorted(fc_lists):
+            fc_list: List[PointModel] = sorted(fc_lists[group_key], key=lambda p: p.register)
+            function_code: ModbusFunctionCode = fc_list[0].function_code
+            max_block_size: int = get_max_block_size(device, function_code)
+            if PointModel.is_writable(function_code):
+                groups: List[List[PointModel]] = group_contiguous_points(fc_list, max_block_size)
+            else:
+                groups: List[List[PointModel]] = group_contiguous_points(fc_list, max_block_size,
+                                                                         device.max_register_gap or 0, True)
+            for group in groups:
+                self.blocks.append(PlanBlock(device.uuid, group))
+
+    def is_valid(self, device: DeviceModel, points: List[PointModel]) -> bool:
+        return self.supports_multiple_rw == device.supports_multiple_rw and \
+               self.max_register_gap == device.max_register_gap and \
+               self.max_block_size == device.max_block_size and \
+               self.point_uuids == frozenset(point.uuid for point in points)
+
+
+class ReadPlanCache(metaclass=Singleton):
+    """
+    Read plans are built on first poll and kept till the device or its points get created, edited or deleted
+    """
+
+    def __init__(self):
+        self.__plans: Dict[str, DeviceReadPlan] = {}
+
+    def get_plan(self, device: DeviceModel, points: List[PointModel]) -> DeviceReadPlan:
+        plan: DeviceReadPlan = self.__plans.get(device.uuid)
+        if plan is None or not plan.is_valid(device, points):
+            logger.debug(f'Building read plan for device {device.uuid}')
+            plan = DeviceReadPlan(device, points)
+            self.__plans[device.uuid] = plan
+        return plan
+
+    def invalidate_device(self, device_uuid: str):
+        self.__plans.pop(device_uuid, None)
+
+    def invalidate_all(self):
+        self.__plans.clear()
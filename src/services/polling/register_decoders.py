@@ -0,0 +1,91 @@
+from functools import lru_cache
+from struct import Struct
+from typing import Dict, List, Tuple, Union
+
+from pymodbus.constants import Endian
+
+from src.enums.point import ModbusDataType
+
+"""
+Struct format and register count of the data types decoded from registers
+"""
+DATA_TYPE_FORMATS: Dict[ModbusDataType, Tuple[str, int]] = {
+    ModbusDataType.INT16: ('h', 1),
+    ModbusDataType.UINT16: ('H', 1),
+    ModbusDataType.INT32: ('i', 2),
+    ModbusDataType.UINT32: ('I', 2),
+    ModbusDataType.FLOAT: ('f', 2),
+    ModbusDataType.DOUBLE: ('d', 4),
+}
+
+
+class RegisterDecoder:
+    """
+    Bit-exact counterpart of pymodbus BinaryPayloadDecoder.fromRegisters for a single value: registers are packed with
+    the byte order, reversed for a little endian word order and the value is unpacked big endian
+    """
+
+    def __init__(self, data_type: ModbusDataType, byteorder: Endian, word_order: Endian):
+        fmt, register_length = DATA_TYPE_FORMATS[data_type]
+        self.byteorder: Endian = byteorder
+        self.register_length: int = register_length
+        self.reverse_words: bool = word_order == Endian.Little and register_length > 1
+        self.value_struct: Struct = Struct(f'>{fmt}')
+        self.__words_struct: Struct = Struct(f'{byteorder}{register_length}H')
+
+    def decode(self, registers: List[int], offset: int = 0) -> Union[int, float]:
+        words: List[int] = registers[offset:offset + self.register_length]
+        if self.reverse_words:
+            words = words[::-1]
+        return self.value_struct.unpack(self.__words_struct.pack(*words))[0]
+
+
+@lru_cache(maxsize=None)
+def get_register_decoder(data_type: ModbusDataType, byteorder: Endian, word_order: Endian) -> \
+        Union[RegisterDecoder, None]:
+    if data_type not in DATA_TYPE_FORMATS:
+        return None
+    return RegisterDecoder(data_type, byteorder, word_order)
+
+
+@lru_cache(maxsize=None)
+def get_run_struct(value_format: str, count: int) -> Struct:
+    return Struct(f'>{count}{value_format[1:]}')
+
+
+def decode_registers(registers: List[int], decoders: List[Tuple[Union[RegisterDecoder, None], int]]) -> \
+        List[Union[int, float, None]]:
+    """
+    Decode many values out of one block of registers.
+    The block is packed once per byte order and word order, a value with a little endian word order is unpacked from
+    the reversed block where its words are in reversed order already. Back to back values of the same decoder are
+    unpacked with a single call.
+    :param decoders: decoder and register offset of each value, None decoders and values which don't fit in the block
+                     (i.e. of a point with a stale register_length) give None values
+    """
+    values: List[Union[int, float, None]] = [None] * len(decoders)
+    groups: Dict[RegisterDecoder, List[int]] = {}
+    for index, (decoder, offset) in enumerate(decoders):
+        if decoder is not None and offset + decoder.register_length <= len(registers):
+            groups.setdefault(decoder, []).append(index)
+    buffers: Dict[Tuple[Endian, bool], bytes] = {}
+    for decoder, indexes in groups.items():
+        buffer_key: Tuple[Endian, bool] = (decoder.byteorder, decoder.reverse_words)
+        buffer: Union[bytes, None] = buffers.get(buffer_key)
+        if buffer is None:
+            words: List[int] = registers[::-1] if decoder.reverse_words else registers
+            buffer = buffers[buffer_key] = Struct(f'{decoder.byteorder}{len(words)}H').pack(*words)
+        positions: List[int] = [decoders[index][1] for index in indexes]
+        if decoder.reverse_words:
+            positions = [len(registers) - position - decoder.register_length for position in positions]
+        step: int = positions[-1] - positions[0]
+        if len(positions) > 1 and abs(step) == (len(positions) - 1) * decoder.register_length and \
+                all(abs(b - a) == decoder.register_length for a, b in zip(positions, positions[1:])):
+            run: tuple = get_run_struct(decoder.value_struct.format, len(positions)) \
+                .unpack_from(buffer, min(positions) * 2)
+            for index, value in zip(indexes, run if step > 0 else reversed(run)):
+                values[index] = value
+        else:
+            for index, position in zip(indexes, positions):
+                values[index] = decoder.value_struct.unpack_from(buffer, position * 2)[0]
+    return values
@@ -0,0 +1,113 @@
+import logging
+import time
+from typing import Dict, List, Union
+
+from pymodbus.client.sync import BaseModbusClient
+from pymodbus.utilities import ModbusTransactionState
+
+from src.enums.network import ModbusRtuParity
+from src.enums.point import ModbusFunctionCode
+from src.models.model_device import DeviceModel
+from src.models.model_network import NetworkModel
+from src.models.model_point import PointModel
+from src.utils import Singleton
+
+logger = logging.getLogger(__name__)
+
+"""
+Above 19200 baud the Modbus over serial line specification fixes the inter-frame silence to 1.75 ms
+"""
+FIXED_SILENCE_BAUD_RATE: int = 19200
+FIXED_SILENCE: float = 0.00175
+
+"""
+Weight of the last measure in the learned turnaround of a device
+"""
+TURNAROUND_SMOOTHING: float = 0.2
+
+
+def get_character_time(network: NetworkModel) -> float:
+    """
+    Start bit, data bits, parity bit and stop bits of one character
+    """
+    parity_bits: int = 0 if network.rtu_parity in (None, ModbusRtuParity.N) else 1
+    bits: int = 1 + (network.rtu_byte_size or 8) + parity_bits + (network.rtu_stop_bits or 1)
+    return bits / (network.rtu_speed or 9600)
+
+
+def get_inter_frame_silence(network: NetworkModel) -> float:
+    if (network.rtu_speed or 9600) > FIXED_SILENCE_BAUD_RATE:
+        return FIXED_SILENCE
+    return 3.5 * get_character_time(network)
+
+
+def get_frame_characters(function_code: ModbusFunctionCode, quantity: int) -> int:
+    """
+    Characters of a request and its response on the wire (address, PDU and CRC)
+    """
+    if function_code in (ModbusFunctionCode.READ_COILS, ModbusFunctionCode.READ_DISCRETE_INPUTS):
+        return 8 + 5 + (quantity + 7) // 8
+    if function_code in (ModbusFunctionCode.READ_HOLDING_REGISTERS, ModbusFunctionCode.READ_INPUT_REGISTERS):
+        return 8 + 5 + 2 * quantity
+    if function_code is ModbusFunctionCode.WRITE_COILS or \
+            (function_code is ModbusFunctionCode.WRITE_COIL and quantity > 1):
+        return 9 + (quantity + 7) // 8 + 8
+    if function_code is ModbusFunctionCode.WRITE_REGISTERS or \
+            (function_code is ModbusFunctionCode.WRITE_REGISTER and quantity > 1):
+        return 9 + 2 * quantity + 8
+    return 8 + 8
+
+
+class RtuPacing(metaclass=Singleton):
+    """
+    Gap between the transactions of a serial bus.
+    The bus is ready again after the inter-frame silence plus the turnaround learned for the device which replied last,
+    point_interval_ms_between_points being the floor of the gap. The gap counts from the end of the transaction, so the
+    time spent processing the response is not waited for twice.
+    """
+
+    def __init__(self):
+        self.__ready_at: Dict[str, float] = {}
+        self.__turnarounds: Dict[str, float] = {}
+
+    def wait(self, client: BaseModbusClient, network: NetworkModel):
+        delay: float = self.__ready_at.get(network.uuid, 0) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        if client.state == ModbusTransactionState.TRANSACTION_COMPLETE:
+            # the silence is already waited for here, otherwise the framer sleeps it again before sending
+            client.state = ModbusTransactionState.IDLE
+
+    def complete(self, client: BaseModbusClient, network: NetworkModel, device: DeviceModel,
+                 point_list: List[PointModel], started: float, replied: bool):
+        """
+        :param started: time.time() before the request got sent, the framer stamps the end of the reply with it
+        :param replied: the device answered the request
+        """
+        silence: float = get_inter_frame_silence(network)
+        turnaround: float = 0
+        if network.rtu_learn_turnaround:
+            turnaround = self.__turnarounds.get(device.uuid, 0)
+            if replied and client.last_frame_end:
+                turnaround = self.__learn_turnaround(network, device, point_list, client.last_frame_end - started,
+                                                     silence)
+        floor: float = float(network.point_interval_ms_between_points or 0) / 1000
+        self.__ready_at[network.uuid] = time.monotonic() + max(floor, silence + turnaround)
+
+    def __learn_turnaround(self, network: NetworkModel, device: DeviceModel, point_list: List[PointModel],
+                           reply_time: float, silence: float) -> float:
+        """
+        Time the device took to answer on top of the wire time of the request and of the response
+        """
+        first_register: int = min(point.register for point in point_list)
+        quantity: int = max(point.register + point.register_length for point in point_list) - first_register
+        wire_time: float = get_frame_characters(point_list[0].function_code, quantity) * get_character_time(network)
+        measure: float = max(reply_time - wire_time - silence, 0)
+        turnaround: Union[float, None] = self.__turnarounds.get(device.uuid)
+        if turnaround is None:
+            turnaround = measure
+        else:
+            turnaround += TURNAROUND_SMOOTHING * (measure - turnaround)
+        self.__turnarounds[device.uuid] = turnaround
+        logger.debug(f'Device {device.uuid} turnaround {round(turnaround * 1000, 2)} ms')
+        return turnaround
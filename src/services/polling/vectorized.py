@@ -0,0 +1,57 @@
+import logging
+from typing import Dict, List, Union
+
+import numpy as np
+
+from src.utils.math_functions import compile_arithmetic_expression
+
+logger = logging.getLogger(__name__)
+
+"""
+Smaller blocks are scaled point by point, numpy call overhead outweighs the gain on them
+"""
+VECTORIZE_MIN_POINTS: int = 32
+
+
+def is_vectorizable(point_count: int) -> bool:
+    return point_count >= VECTORIZE_MIN_POINTS
+
+
+def compute_values_vectorized(points: List, values_original: List[float]) -> Union[List[float], None]:
+    """
+    Vector counterpart of PointModel.apply_scale and apply_value_operation, rounding is left to the caller so it stays
+    the one of round()
+    :return: None on arithmetic errors, the scalar path then gives the exact same errors and results
+    """
+    values = np.array(values_original, dtype=np.float64)
+    scales = np.array([(point.input_min, point.input_max, point.scale_min, point.scale_max) for point in points],
+                      dtype=np.float64)
+    input_min, input_max, scale_min, scale_max = scales.T
+    operations: Dict[str, List[int]] = {}
+    for index, point in enumerate(points):
+        if point.value_operation is not None and point.value_operation.strip():
+            operations.setdefault(point.value_operation.lower(), []).append(index)
+    try:
+        with np.errstate(all='raise'):
+            # None scale attributes are NaN
+            scaled = ~np.isnan(scales).any(axis=1) & (input_min != input_max) & (scale_min != scale_max)
+            if scaled.any():
+                input_range = np.where(scaled, input_max - input_min, 1)
+                result = ((values - input_min) / input_range) * (scale_max - scale_min) + scale_min
+                upper = np.maximum(scale_max, scale_min)
+                lower = np.minimum(scale_max, scale_min)
+                result = np.where(result > upper, upper, np.where(result < lower, lower, result))
+                values = np.where(scaled, result, values)
+            for expression, indexes in operations.items():
+                if '**' in expression:
+                    # numpy squares with a multiplication, which is not bit exact with the pow() of python floats
+                    operation = compile_arithmetic_expression(expression)
+                    values[indexes] = [operation(value) for value in values[indexes].tolist()]
+                elif len(indexes) == len(points):
+                    values[:] = compile_arithmetic_expression(expression)(values)
+                else:
+                    values[indexes] = compile_arithmetic_expression(expression)(values[indexes])
+    except (ArithmeticError, TypeError) as e:
+        logger.debug(f'Falling back to scalar computation: {e}')
+        return None
+    return values.tolist()
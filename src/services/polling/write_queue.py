@@ -0,0 +1,53 @@
+import logging
+from typing import Dict, List
+
+from gevent.event import Event
+
+from src.utils import Singleton
+
+logger = logging.getLogger(__name__)
+
+
+class PointWriteQueue(metaclass=Singleton):
+    """
+    Points waiting to be written, per network.
+    A point is queued once however many times it gets written before the poller drains it, the value written is the
+    highest priority value of its priority array at that time, so only the latest write reaches the device.
+    """
+
+    def __init__(self):
+        self.__queues: Dict[str, Dict[str, None]] = {}
+        self.__events: Dict[str, Event] = {}
+
+    def enqueue(self, network_uuid: str, point_uuid: str):
+        self.__queues.setdefault(network_uuid, {})[point_uuid] = None
+        self.__get_event(network_uuid).set()
+        logger.debug(f'Queued write of point {point_uuid} on network {network_uuid}')
+
+    def has_pending(self, network_uuid: str) -> bool:
+        return bool(self.__queues.get(network_uuid))
+
+    def pop_all(self, network_uuid: str) -> List[str]:
+        """
+        Point uuids in the order they got queued first
+        """
+        return list(self.__queues.pop(network_uuid, {}))
+
+    def wait(self, network_uuid: str, timeout: float) -> bool:
+        """
+        Sleep up to timeout seconds, returns True when woken up by a queued write
+        """
+        event: Event = self.__get_event(network_uuid)
+        woken: bool = event.wait(timeout)
+        event.clear()
+        return bool(woken) or self.has_pending(network_uuid)
+
+    def remove_network(self, network_uuid: str):
+        self.__queues.pop(network_uuid, None)
+        self.__events.pop(network_uuid, None)
+
+    def __get_event(self, network_uuid: str) -> Event:
+        event: Event = self.__events.get(network_uuid)
+        if event is None:
+            event = self.__events[network_uuid] = Event()
+        return event
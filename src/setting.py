@@ -31,6 +31,65 @@ class DriverSetting(BaseSetting):
         self.modbus_tcp: bool = False
 
 
+class PointStoreSetting(BaseSetting):
+    """
+    Point values are written to the database straight away by default (flush_interval 0), with a flush_interval they
+    are kept in memory and written every flush_interval seconds instead, values of that window are lost on a crash
+    """
+
+    KEY = 'point_store'
+
+    def __init__(self):
+        self.flush_interval: float = 0
+
+
+class PointHistorySetting(BaseSetting):
+    """
+    The last buffer_size samples of each point are kept in memory and rolled up into one row per minute of the
+    point_histories table every flush_interval seconds, rows are kept for retention_days
+    """
+
+    KEY = 'point_history'
+
+    def __init__(self):
+        self.enabled: bool = True
+        self.buffer_size: int = 360
+        self.flush_interval: float = 60
+        self.retention_days: float = 7
+
+
+class MappingSyncSetting(BaseSetting):
+    """
+    Values synced to the mapped Generic | BACnet points are delivered every flush_interval seconds, up to batch_size of
+    them per round, concurrency at a time
+    """
+
+    KEY = 'mapping_sync'
+
+    def __init__(self):
+        self.flush_interval: float = 1
+        self.batch_size: int = 100
+        self.concurrency: int = 4
+
+
+class SqliteSetting(BaseSetting):
+    """
+    Connection PRAGMAs of the SQLite database, busy_timeout is in seconds.
+    single_writer makes the writers of the process take turns on a gevent lock instead of blocking the whole process
+    in the busy handler of SQLite.
+    """
+
+    KEY = 'sqlite'
+
+    def __init__(self):
+        self.journal_mode: str = 'WAL'
+        self.synchronous: str = 'NORMAL'
+        self.cache_size: int = -16000
+        self.mmap_size: int = 67108864
+        self.busy_timeout: float = 60
+        self.single_writer: bool = True
+
+
 class MqttSetting(MqttSettingBase):
     KEY = 'mqtt'
 
@@ -40,6 +99,9 @@ class MqttSetting(MqttSettingBase):
         self.retain_clear_interval = 60
         self.publish_value = True
         self.topic = 'rubix/points/value'
+        self.publish_batch = False
+        self.publish_queue_size = 1000
+        self.republish_rate = 1000
         self.publish_debug = True
         self.debug_topic = 'rubix/points/debug'
         self.listen = True
@@ -70,6 +132,10 @@ class AppSetting:
         self.__prod = kwargs.get('prod') or False
         self.__driver_setting = DriverSetting()
         self.__mqtt_setting = MqttSetting()
+        self.__point_store_setting = PointStoreSetting()
+        self.__point_history_setting = PointHistorySetting()
+        self.__mapping_sync_setting = MappingSyncSetting()
+        self.__sqlite_setting = SqliteSetting()
 
     @property
     def port(self):
@@ -99,10 +165,30 @@ class AppSetting:
     def mqtt_setting(self) -> MqttSetting:
         return self.__mqtt_setting
 
+    @property
+    def point_store_setting(self) -> PointStoreSetting:
+        return self.__point_store_setting
+
+    @property
+    def point_history_setting(self) -> PointHistorySetting:
+        return self.__point_history_setting
+
+    @property
+    def mapping_sync_setting(self) -> MappingSyncSetting:
+        return self.__mapping_sync_setting
+
+    @property
+    def sqlite_setting(self) -> SqliteSetting:
+        return self.__sqlite_setting
+
     def serialize(self, pretty=True) -> str:
         m = {
             DriverSetting.KEY: self.drivers,
             MqttSetting.KEY: self.mqtt_setting,
+            PointStoreSetting.KEY: self.point_store_setting,
+            PointHistorySetting.KEY: self.point_history_setting,
+            MappingSyncSetting.KEY: self.mapping_sync_setting,
+            SqliteSetting.KEY: self.sqlite_setting,
             'prod': self.prod, 'global_dir': self.global_dir, 'data_dir': self.data_dir, 'config_dir': self.config_dir
         }
         return json.dumps(m, default=lambda o: o.to_dict() if isinstance(o, BaseSetting) else o.__dict__,
@@ -112,6 +198,10 @@ class AppSetting:
         data = self.__read_file(setting_file, self.__config_dir, is_json_str)
         self.__driver_setting = self.__driver_setting.reload(data.get(DriverSetting.KEY))
         self.__mqtt_setting = self.__mqtt_setting.reload(data.get(MqttSetting.KEY, None))
+        self.__point_store_setting = self.__point_store_setting.reload(data.get(PointStoreSetting.KEY, None))
+        self.__point_history_setting = self.__point_history_setting.reload(data.get(PointHistorySetting.KEY, None))
+        self.__mapping_sync_setting = self.__mapping_sync_setting.reload(data.get(MappingSyncSetting.KEY, None))
+        self.__sqlite_setting = self.__sqlite_setting.reload(data.get(SqliteSetting.KEY, None))
         return self
 
     def init_app(self, app: Flask):
@@ -37,6 +37,7 @@ class Ping(RubixResource):
             'up_hour': up_hour,
             'deployment_mode': deployment_mode,
             'mqtt_client_statuses': {MqttClient().to_string(): MqttClient().status()},
+            'mqtt_publish_queue': MqttClient().publish_queue.to_dict() if MqttClient().publish_queue else None,
             'settings': {
                 setting.drivers.KEY: setting.drivers.to_dict()
             }
@@ -1,5 +1,8 @@
 import ast
+import numbers
 import operator as op
+from functools import lru_cache
+from typing import Callable
 
 # supported operators
 operators = {ast.Add: op.add, ast.Sub: op.sub, ast.Mult: op.mul, ast.Div: op.truediv, ast.FloorDiv: op.floordiv,
@@ -39,3 +42,79 @@ def __eval(node):
         return operators[type(node.op)](__eval(node.operand))
     else:
         raise TypeError(node)
+
+
+@lru_cache(maxsize=1024)
+def compile_arithmetic_expression(expression: str) -> Callable[[float], float]:
+    """
+    Compile an arithmetic expression of x once into a callable taking x, compiled callables are cached by expression
+    >>> compile_arithmetic_expression('x * 2 + 1')(3)
+    7
+    >>> compile_arithmetic_expression('x / 3')(0.1)
+    0.03333333333333333
+    >>> compile_arithmetic_expression('x ** 2')(-5)
+    25
+    >>> compile_arithmetic_expression('2x')(5)
+    25
+    """
+    try:
+        return __compile(ast.parse(expression, mode='eval').body)
+    except (SyntaxError, TypeError, KeyError):
+        return __compile_legacy(expression)
+
+
+def validate_arithmetic_expression(expression: str):
+    """
+    Raise ValueError unless the expression compiles the way compile_arithmetic_expression() compiles it, as a function
+    of x or else as a legacy expression with x spliced in as text; it is not evaluated, so runtime errors (i.e. a
+    division by a zero x) are left to the point they occur on
+    >>> validate_arithmetic_expression('(x - 32) * 5 / 9')
+    >>> validate_arithmetic_expression('100 / x')
+    >>> validate_arithmetic_expression('2x')
+    >>> validate_arithmetic_expression('x +')
+    Traceback (most recent call last):
+    ...
+    ValueError: must be a valid arithmetic expression of x
+    """
+    try:
+        __compile(ast.parse(expression, mode='eval').body)
+        return
+    except (SyntaxError, TypeError, KeyError):
+        pass
+    try:
+        __compile(ast.parse(expression.replace('x', '1'), mode='eval').body)
+    except (SyntaxError, TypeError, KeyError):
+        raise ValueError('must be a valid arithmetic expression of x')
+
+
+def __compile(node) -> Callable[[float], float]:
+    if isinstance(node, ast.Num):  # <number>
+        number = node.n
+        return lambda x: number
+    elif isinstance(node, ast.Name) and node.id == 'x':  # <x>
+        return lambda x: x
+    elif isinstance(node, ast.BinOp):  # <left> <operator> <right>
+        operator = operators[type(node.op)]
+        left = __compile(node.left)
+        right = __compile(node.right)
+        return lambda x: operator(left(x), right(x))
+    elif isinstance(node, ast.UnaryOp):  # <operator> <operand> e.g., -1
+        operator = operators[type(node.op)]
+        operand = __compile(node.operand)
+        return lambda x: operator(operand(x))
+    else:
+        raise TypeError(node)
+
+
+def __compile_legacy(expression: str) -> Callable[[float], float]:
+    """
+    Expressions stored before x became a variable, i.e. '2x', are still evaluated the way they were: with the value
+    spliced into the text in place of x
+    """
+
+    def operation(x):
+        if not isinstance(x, numbers.Number):
+            raise TypeError(f'{expression} is only evaluated for a single value')
+        return eval_arithmetic_expression(expression.replace('x', str(x)))
+
+    return operation
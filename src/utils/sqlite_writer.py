@@ -0,0 +1,51 @@
+import logging
+import re
+
+from gevent.lock import BoundedSemaphore
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+logger = logging.getLogger(__name__)
+
+"""
+Statements which make SQLite take the write lock of the database
+"""
+WRITE_STATEMENT = re.compile(r'^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b', re.IGNORECASE)
+
+WRITER_KEY: str = 'sqlite_writer'
+
+
+class SqliteWriterLock:
+    """
+    Single-writer funnel of the process: a connection takes the lock on its first write statement and keeps it till its
+    transaction ends, the same span SQLite holds its own write lock for.
+    Waiting on a gevent lock lets the other greenlets (REST reads, polling) go on, where the busy handler of SQLite would
+    sleep the whole process. On timeout the statement goes on and is left to the busy handler.
+    """
+
+    def __init__(self, timeout: float):
+        self.__lock: BoundedSemaphore = BoundedSemaphore()
+        self.__timeout: float = timeout
+
+    def register(self):
+        event.listen(Engine, 'before_cursor_execute', self.__before_cursor_execute)
+        event.listen(Engine, 'commit', self.__release)
+        event.listen(Engine, 'rollback', self.__release)
+        event.listen(Pool, 'reset', self.__release_on_reset)
+
+    def __before_cursor_execute(self, conn, _, statement: str, *__):
+        if WRITER_KEY in conn.info or not WRITE_STATEMENT.match(statement):
+            return
+        if self.__lock.acquire(timeout=self.__timeout):
+            conn.info[WRITER_KEY] = True
+        else:
+            logger.warning(f'Waited {self.__timeout} seconds for the SQLite writer lock, writing anyway')
+
+    def __release(self, conn):
+        if conn.info.pop(WRITER_KEY, None):
+            self.__lock.release()
+
+    def __release_on_reset(self, _, connection_record):
+        if connection_record.info.pop(WRITER_KEY, None):
+            self.__lock.release()
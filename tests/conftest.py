@@ -0,0 +1,84 @@
+# patched like the gunicorn workers of the app, before anything imports the modules it patches
+from gevent import monkey
+
+monkey.patch_all()
+
+import os
+from typing import List
+
+import pytest
+import shortuuid
+from flask_migrate import Migrate, upgrade
+
+from src import AppSetting, create_app, db
+from src.models.model_network import NetworkModel
+from src.models.model_point import PointModel
+
+"""
+SQLite of the tests gives up on a locked database quickly, so a writer stuck behind another one fails the test rather
+than stalling it
+"""
+TEST_SETTING: str = '{"sqlite": {"busy_timeout": 1}}'
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    app_setting = AppSetting(global_dir=str(tmp_path_factory.mktemp('out'))).reload(TEST_SETTING, is_json_str=True)
+    _app = create_app(app_setting)
+    with _app.app_context():
+        Migrate(_app, db)
+        upgrade(directory=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations'))
+        yield _app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def point(client):
+    """
+    A holding register point of its own disabled TCP network, deleted with the network after the test
+    """
+    network_uuid: str = client.post('/api/modbus/networks', json={
+        'name': shortuuid.uuid(), 'enable': False, 'type': 'TCP', 'tcp_ip': '127.0.0.1', 'tcp_port': 502}).json['uuid']
+    device_uuid: str = client.post('/api/modbus/devices', json={
+        'network_uuid': network_uuid, 'name': 'd1', 'enable': True, 'address': 1}).json['uuid']
+    point_uuid: str = client.post('/api/modbus/points', json={
+        'device_uuid': device_uuid, 'name': 'p1', 'enable': True, 'register': 1, 'register_length': 1,
+        'function_code': 'READ_HOLDING_REGISTERS', 'data_type': 'INT16'}).json['uuid']
+    yield PointModel.find_by_uuid(point_uuid)
+    db.session.rollback()
+    client.delete(f'/api/modbus/networks/uuid/{network_uuid}')
+
+
+@pytest.fixture
+def write_point(client, point) -> PointModel:
+    """
+    A holding register point written by the tests, next to the read one
+    """
+    point_uuid: str = client.post('/api/modbus/points', json={
+        'device_uuid': point.device_uuid, 'name': 'w1', 'enable': True, 'writable': True, 'register': 2,
+        'register_length': 1, 'function_code': 'WRITE_REGISTER', 'data_type': 'INT16'}).json['uuid']
+    return PointModel.find_by_uuid(point_uuid)
+
+
+@pytest.fixture
+def network(client):
+    """
+    A disabled TCP network of three devices, each of them with a holding register point
+    """
+    network_uuid: str = client.post('/api/modbus/networks', json={
+        'name': shortuuid.uuid(), 'enable': False, 'type': 'TCP', 'tcp_ip': '127.0.0.1', 'tcp_port': 502,
+        'tcp_max_in_flight': 2}).json['uuid']
+    point_uuids: List[str] = []
+    for address in (1, 2, 3):
+        device_uuid: str = client.post('/api/modbus/devices', json={
+            'network_uuid': network_uuid, 'name': f'd{address}', 'enable': True, 'address': address,
+            'zero_based': True}).json['uuid']
+        point_uuids.append(client.post('/api/modbus/points', json={
+            'device_uuid': device_uuid, 'name': 'p1', 'enable': True, 'register': 1, 'register_length': 1,
+            'function_code': 'READ_HOLDING_REGISTERS', 'data_type': 'INT16'}).json['uuid'])
+    yield NetworkModel.find_by_uuid(network_uuid), point_uuids
+    client.delete(f'/api/modbus/networks/uuid/{network_uuid}')
@@ -0,0 +1,24 @@
+from contextlib import contextmanager
+
+
+class FakeConnection:
+    """
+    Registry connection without clients, counting how many of them are acquired at once
+    """
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight: int = max_in_flight
+        self.is_running: bool = False
+        self.acquired: int = 0
+        self.in_use: int = 0
+        self.max_in_use: int = 0
+
+    @contextmanager
+    def acquire_client(self):
+        self.acquired += 1
+        self.in_use += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+        try:
+            yield None
+        finally:
+            self.in_use -= 1
@@ -0,0 +1,23 @@
+from contextlib import contextmanager
+from typing import List
+
+from sqlalchemy import event
+
+from src import db
+
+
+@contextmanager
+def count_queries() -> List[str]:
+    """
+    Statements sent to the database inside the block
+    """
+    statements: List[str] = []
+
+    def before_cursor_execute(_, __, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
@@ -0,0 +1,80 @@
+from typing import List
+
+import pytest
+from rubix_http.exceptions.exception import BadDataException
+
+from src.models.model_point import PointModel
+from src.resources.device.device_bulk import DeviceBulkResource
+from src.resources.point.point_bulk import PointBulkResource
+from src.resources.rest_schema.schema_point import point_all_attributes
+from src.resources.utils import get_bulk_items, parse_bulk_item
+
+
+def test_parse_bulk_item_casts_to_the_schema_types():
+    data: dict = parse_bulk_item({'name': 'p1', 'register': '7', 'enable': 'false', 'cov_threshold': '0.5',
+                                  'priority_array_write': '{"_16": 1}', 'unknown': 1}, point_all_attributes, False)
+    assert data == {'name': 'p1', 'register': 7, 'enable': False, 'cov_threshold': 0.5,
+                    'priority_array_write': {'_16': 1}}
+
+
+def test_parse_bulk_item_checks_required_attributes_of_new_items():
+    with pytest.raises(ValueError, match='is required'):
+        parse_bulk_item({'name': 'p1'}, point_all_attributes, True)
+    assert parse_bulk_item({'name': 'p1'}, point_all_attributes, False) == {'name': 'p1'}
+    with pytest.raises(ValueError):
+        parse_bulk_item({'register': 'one'}, point_all_attributes, False)
+
+
+def test_get_bulk_items(app):
+    with app.test_request_context(data='name,register,enable\np1,1,\np2,2,true\n', content_type='text/csv'):
+        assert get_bulk_items() == [{'name': 'p1', 'register': '1'}, {'name': 'p2', 'register': '2', 'enable': 'true'}]
+    with app.test_request_context(json=[{'name': 'p1'}]):
+        assert get_bulk_items() == [{'name': 'p1'}]
+    with app.test_request_context(json={'name': 'p1'}):
+        with pytest.raises(BadDataException):
+            get_bulk_items()
+
+
+@pytest.fixture
+def published(monkeypatch) -> List[str]:
+    published: List[str] = []
+    monkeypatch.setattr(PointModel, 'publish_cov',
+                        lambda point, point_store, device=None, network=None, force_clear=False:
+                        published.append(point.uuid))
+    return published
+
+
+def test_points_bulk_creates_and_updates(client, point, published):
+    response = client.post('/api/modbus/points/bulk', json=[
+        {'uuid': point.uuid, 'name': 'renamed', 'register': 10},
+        {'device_uuid': point.device_uuid, 'name': 'p2', 'enable': True, 'register': 2, 'register_length': 1,
+         'function_code': 'WRITE_REGISTER', 'data_type': 'INT16', 'priority_array_write': {'_8': 5}}])
+    assert response.status_code == 200
+    updated, created = response.json
+    assert (updated['uuid'], updated['name'], updated['register']) == (point.uuid, 'renamed', 10)
+    assert created['name'] == 'p2' and created['priority_array_write']['_8'] == 5
+    assert published == [point.uuid, created['uuid']]
+
+
+def test_points_bulk_saves_none_of_an_invalid_list(app, point, published):
+    with app.test_request_context(data=(
+            'device_uuid,name,enable,register,register_length,function_code,data_type\n'
+            f'{point.device_uuid},p2,true,2,1,READ_HOLDING_REGISTERS,INT16\n'
+            f'{point.device_uuid},p3,true,1,1,READ_HOLDING_REGISTERS,INT16\n'), content_type='text/csv'):
+        with pytest.raises(BadDataException, match='point register 1 READ_HOLDING_REGISTERS is duplicated'):
+            PointBulkResource.post()
+    assert [p.name for p in PointModel.find_all_by_device_uuids([point.device_uuid])] == ['p1']
+    assert published == []
+
+
+def test_devices_bulk_creates_and_updates(app, client, point):
+    response = client.post('/api/modbus/devices/bulk', json=[
+        {'uuid': point.device_uuid, 'address': 5},
+        {'network_uuid': point.device.network_uuid, 'name': 'd2', 'enable': True, 'address': 2}])
+    assert response.status_code == 200
+    assert [(device['name'], device['address']) for device in response.json] == [('d1', 5), ('d2', 2)]
+    with app.test_request_context(json=[
+            {'network_uuid': point.device.network_uuid, 'name': 'd3', 'enable': True, 'address': 2},
+            {'uuid': 'unknown'}]):
+        with pytest.raises(BadDataException, match='no device found with uuid unknown'):
+            DeviceBulkResource.post()
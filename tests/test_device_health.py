@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+import shortuuid
+from pymodbus.exceptions import ModbusIOException
+
+from src.enums.device import DeviceHealthState
+from src.services.polling import device_health
+from src.services.polling.device_health import BACKOFF_INITIAL, BACKOFF_MAX, DeviceHealthRegistry
+from src.services.polling.modbus_polling import ModbusPolling, TcpPolling
+from src.services.polling.read_plan import ReadPlanCache
+
+
+class Clock:
+    def __init__(self):
+        self.now: datetime = datetime(2026, 1, 1)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock: Clock = Clock()
+    monkeypatch.setattr(device_health, 'get_datetime', clock)
+    return clock
+
+
+@pytest.fixture
+def device_uuid() -> str:
+    device_uuid: str = shortuuid.uuid()
+    yield device_uuid
+    DeviceHealthRegistry().reset(device_uuid)
+
+
+def test_unknown_device_is_online_and_due(device_uuid):
+    health: device_health.DeviceHealth = DeviceHealthRegistry().get_health(device_uuid)
+    assert (health.state, health.failures, health.next_probe) == (DeviceHealthState.ONLINE, 0, None)
+    assert DeviceHealthRegistry().is_due(device_uuid)
+
+
+def test_backoff_doubles_on_each_failure_up_to_the_max(clock, device_uuid):
+    registry: DeviceHealthRegistry = DeviceHealthRegistry()
+    backoffs: List[float] = []
+    for _ in range(9):
+        registry.record_failure(device_uuid)
+        backoffs.append((registry.get_health(device_uuid).next_probe - clock.now).total_seconds())
+    assert backoffs == [5, 10, 20, 40, 80, 160, 300, 300, 300]
+    assert backoffs[0] == BACKOFF_INITIAL and backoffs[-1] == BACKOFF_MAX
+    assert registry.get_health(device_uuid).state == DeviceHealthState.QUARANTINED
+
+
+def test_quarantined_device_is_due_once_its_backoff_is_over(clock, device_uuid):
+    registry: DeviceHealthRegistry = DeviceHealthRegistry()
+    registry.record_failure(device_uuid)
+    clock.advance(BACKOFF_INITIAL - 1)
+    assert not registry.is_due(device_uuid)
+    clock.advance(1)
+    assert registry.is_due(device_uuid)
+
+
+def test_success_and_reset_bring_the_device_back_online(clock, device_uuid):
+    registry: DeviceHealthRegistry = DeviceHealthRegistry()
+    registry.record_failure(device_uuid)
+    registry.record_success(device_uuid)
+    assert registry.is_due(device_uuid)
+    assert registry.get_health(device_uuid).failures == 0
+    registry.record_failure(device_uuid)
+    registry.reset(device_uuid)
+    assert registry.get_health(device_uuid).state == DeviceHealthState.ONLINE
+
+
+def test_offline_device_is_probed_with_a_single_request_after_its_backoff(client, point, clock, monkeypatch):
+    device = point.device
+    requests: List[str] = []
+    answering: List[bool] = [False]
+
+    def poll_point(_, __, network, device_, points, *args, **kwargs):
+        requests.append(points[0].uuid)
+        if not answering[0]:
+            raise ModbusIOException('no response')
+
+    monkeypatch.setattr(ModbusPolling, '_ModbusPolling__poll_point', poll_point)
+    poll_device = getattr(TcpPolling(), '_ModbusPolling__poll_device')
+    blocks = ReadPlanCache().get_plan(device, [point]).blocks
+    try:
+        assert poll_device(None, device.network, device, {point.uuid: point}, blocks)
+        assert len(requests) == 1
+        assert client.get(f'/api/modbus/devices/uuid/{device.uuid}').json['health_state'] == 'QUARANTINED'
+        # skipped while quarantined
+        poll_device(None, device.network, device, {point.uuid: point}, blocks)
+        assert len(requests) == 1
+        clock.advance(BACKOFF_INITIAL)
+        poll_device(None, device.network, device, {point.uuid: point}, blocks)
+        assert len(requests) == 2
+        assert DeviceHealthRegistry().get_health(device.uuid).failures == 2
+        clock.advance(2 * BACKOFF_INITIAL)
+        answering[0] = True
+        poll_device(None, device.network, device, {point.uuid: point}, blocks)
+        assert len(requests) == 3
+        assert DeviceHealthRegistry().get_health(device.uuid).state == DeviceHealthState.ONLINE
+    finally:
+        DeviceHealthRegistry().reset(device.uuid)
+
+
+def test_editing_a_device_lifts_its_quarantine(client, point):
+    DeviceHealthRegistry().record_failure(point.device_uuid)
+    client.patch(f'/api/modbus/devices/uuid/{point.device_uuid}', json={'polling_interval': 5})
+    assert DeviceHealthRegistry().is_due(point.device_uuid)
+    assert client.get(f'/api/modbus/devices/uuid/{point.device_uuid}').json['health_failures'] == 0
@@ -0,0 +1,46 @@
+from sqlalchemy import inspect
+
+from src import db
+from src.services.polling.modbus_polling import TcpPolling
+from tests.sql_queries import count_queries
+
+
+def touch(points):
+    for point in points:
+        assert point.priority_array_write is None or point.priority_array_write.point_uuid == point.uuid
+        assert point.point_store.point_uuid == point.uuid
+
+
+def test_sweep_loads_devices_and_points_in_four_queries(client, network):
+    network, point_uuids = network
+    for device_point_uuid in point_uuids[:2]:
+        device_uuid: str = client.get(f'/api/modbus/points/uuid/{device_point_uuid}').json['device_uuid']
+        for register in (2, 3):
+            client.post('/api/modbus/points', json={
+                'device_uuid': device_uuid, 'name': f'w{register}', 'enable': True, 'writable': True,
+                'register': register, 'register_length': 1, 'function_code': 'WRITE_REGISTER', 'data_type': 'INT16'})
+    network_uuid: str = network.uuid
+    db.session.expire_all()
+    with count_queries() as statements:
+        devices = getattr(TcpPolling(), '_ModbusPolling__get_network_devices')(network_uuid)
+        assert sorted(len(device.points) for device in devices) == [1, 3, 3]
+        for device in devices:
+            touch(device.points)
+    assert len(statements) == 4
+
+
+def test_queued_writes_load_their_points_with_the_device(network):
+    network, point_uuids = network
+    network_uuid: str = network.uuid
+    db.session.expire_all()
+    with count_queries() as statements:
+        points = getattr(TcpPolling(), '_ModbusPolling__get_network_points')(network_uuid, point_uuids)
+        assert sorted(point.device.address for point in points) == [1, 2, 3]
+        touch(points)
+    assert len(statements) == 3
+
+
+def test_foreign_keys_of_the_sweep_are_indexed(app):
+    inspector = inspect(db.engine)
+    for table, column in (('points', 'device_uuid'), ('devices', 'network_uuid'), ('mappings_mp_gbp', 'point_uuid')):
+        assert any(index['column_names'] == [column] for index in inspector.get_indexes(table)), (table, column)
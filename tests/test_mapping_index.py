@@ -0,0 +1,74 @@
+from typing import List
+
+import pytest
+import shortuuid
+
+from src import db
+from src.enums.mapping import MapType, MappingState
+from src.models.model_mapping import MPGBPMapping
+from src.models.model_point_store import PointStoreModel
+from src.services.mapping_index import MappingIndex
+from src.services.mapping_sync import MappingSyncOutbox
+from tests.sql_queries import count_queries
+
+
+@pytest.fixture
+def mapping(point) -> MPGBPMapping:
+    """
+    The point mapped to a generic point, written straight to the table as the mapping resources ask the peer services
+    """
+    mapping: MPGBPMapping = MPGBPMapping(uuid=shortuuid.uuid(), point_uuid=point.uuid,
+                                         mapped_point_uuid=shortuuid.uuid(), point_name='n1:d1:p1',
+                                         type=MapType.GENERIC, mapping_state=MappingState.MAPPED)
+    db.session.add(mapping)
+    db.session.commit()
+    yield mapping
+    MPGBPMapping.query.filter_by(uuid=mapping.uuid).delete()
+    db.session.commit()
+
+
+def test_mappings_are_looked_up_both_ways_from_one_query(mapping):
+    point_uuid, mapped_point_uuid = mapping.point_uuid, mapping.mapped_point_uuid
+    MappingIndex().invalidate()
+    with count_queries() as statements:
+        assert MappingIndex().find_by_point_uuid(point_uuid).mapped_point_uuid == mapped_point_uuid
+        assert MappingIndex().find_by_mapped_point_uuid_type(mapped_point_uuid, MapType.GENERIC).point_uuid == \
+            point_uuid
+        assert MappingIndex().find_by_mapped_point_uuid_type(mapped_point_uuid, MapType.BACNET) is None
+        assert MappingIndex().find_by_point_uuid(shortuuid.uuid()) is None
+    assert len(statements) == 1
+
+
+def test_committed_mapping_changes_are_seen(mapping):
+    point_uuid: str = mapping.point_uuid
+    assert MappingIndex().find_by_point_uuid(point_uuid).mapping_state == MappingState.MAPPED
+    mapping.mapping_state = MappingState.BROKEN
+    db.session.flush()
+    assert MappingIndex().find_by_point_uuid(point_uuid).mapping_state == MappingState.MAPPED
+    db.session.commit()
+    assert MappingIndex().find_by_point_uuid(point_uuid).mapping_state == MappingState.BROKEN
+
+
+def test_mappings_of_deleted_points_are_dropped(client, mapping):
+    point_uuid: str = mapping.point_uuid
+    assert MappingIndex().find_by_point_uuid(point_uuid)
+    client.delete(f'/api/modbus/points/uuid/{point_uuid}')
+    assert MappingIndex().find_by_point_uuid(point_uuid) is None
+
+
+def test_cov_path_syncs_mapped_points_without_querying_the_mappings(client, point, mapping, monkeypatch):
+    other_point_uuid: str = client.post('/api/modbus/points', json={
+        'device_uuid': point.device_uuid, 'name': 'p2', 'enable': True, 'register': 2, 'register_length': 1,
+        'function_code': 'READ_HOLDING_REGISTERS', 'data_type': 'INT16'}).json['uuid']
+    enqueued: List[tuple] = []
+    monkeypatch.setattr(MappingSyncOutbox, 'enqueue', lambda _, map_type, mapped_point_uuid, priority_array_write,
+                        *args: enqueued.append((map_type, mapped_point_uuid, priority_array_write)))
+    mapped_point_uuid: str = mapping.mapped_point_uuid
+    MappingIndex().find_by_point_uuid(point.uuid)
+    point_stores: List[PointStoreModel] = [PointStoreModel(point_uuid=point_uuid, value=7, value_original=7,
+                                                           value_raw='', fault=False)
+                                           for point_uuid in (point.uuid, other_point_uuid)]
+    with count_queries() as statements:
+        assert len(PointStoreModel.update_many(point_stores, [None, None])) == 2
+    assert not [statement for statement in statements if 'mappings_mp_gbp' in statement]
+    assert enqueued == [(MapType.GENERIC, mapped_point_uuid, {'_16': 7})]
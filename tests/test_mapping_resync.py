@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from typing import Dict
+
+import pytest
+import shortuuid
+from gevent import sleep
+
+from src import db
+from src.enums.mapping import MapType, MappingState, SyncJobState
+from src.models.model_mapping import MPGBPMapping
+from src.models.model_point_store import PointStoreModel
+from src.services.mapping_resync import MappingResync
+from src.services.mapping_sync import MappingSyncOutbox
+
+
+@pytest.fixture
+def mappings(network) -> Dict[str, str]:
+    """
+    Mapped point uuids of the points of the network, by name: a generic, a BACnet and a broken generic mapping
+    """
+    _, point_uuids = network
+    mapped_point_uuids: Dict[str, str] = {}
+    for point_uuid, (name, map_type, mapping_state) in zip(point_uuids, (
+            ('generic', MapType.GENERIC, MappingState.MAPPED),
+            ('bacnet', MapType.BACNET, MappingState.MAPPED),
+            ('broken', MapType.GENERIC, MappingState.BROKEN))):
+        mapped_point_uuids[name] = shortuuid.uuid()
+        db.session.add(MPGBPMapping(uuid=shortuuid.uuid(), point_uuid=point_uuid,
+                                    mapped_point_uuid=mapped_point_uuids[name], point_name=name, type=map_type,
+                                    mapping_state=mapping_state))
+    db.session.commit()
+    yield mapped_point_uuids
+    MPGBPMapping.query.filter(MPGBPMapping.point_uuid.in_(point_uuids)).delete(synchronize_session=False)
+    db.session.commit()
+
+
+class Deliveries(list):
+    """
+    Deliveries to the peers, those of the mapped point uuids of failing fail
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.failing: set = set()
+
+
+@pytest.fixture
+def delivered(monkeypatch) -> Deliveries:
+    delivered: Deliveries = Deliveries()
+
+    def deliver(item: tuple) -> bool:
+        (map_type, mapped_point_uuid), priority_array_write = item
+        sleep(0.001)
+        if mapped_point_uuid in delivered.failing:
+            return False
+        delivered.append((map_type, mapped_point_uuid, priority_array_write))
+        return True
+
+    outbox: MappingSyncOutbox = MappingSyncOutbox()
+    monkeypatch.setattr(outbox, '_MappingSyncOutbox__pending', OrderedDict())
+    monkeypatch.setattr(outbox, '_MappingSyncOutbox__failures', {})
+    monkeypatch.setattr(outbox, '_MappingSyncOutbox__retry_at', {})
+    monkeypatch.setattr(MappingSyncOutbox, 'deliver', staticmethod(deliver))
+    return delivered
+
+
+def run_job(gp: bool = True, bp: bool = True) -> dict:
+    assert PointStoreModel.sync_points_values_mp_to_gbp_process(gp, bp)
+    assert not MappingResync().start()
+    while MappingResync().state == SyncJobState.RUNNING:
+        sleep(0.01)
+    return MappingResync().to_dict()
+
+
+def test_mapped_points_are_synced_with_their_value(network, mappings, delivered):
+    _, point_uuids = network
+    store: PointStoreModel = PointStoreModel.find_by_point_uuid(point_uuids[0])
+    store.value = 21.5
+    db.session.commit()
+    job: dict = run_job()
+    assert {uuid: priority_array_write for _, uuid, priority_array_write in delivered} == {
+        mappings['generic']: {'_16': 21.5}, mappings['bacnet']: {'_16': None}}
+    assert (job['state'], job['total'], job['delivered'], job['failed'], job['skipped']) == ('FINISHED', 2, 2, 0, 0)
+    assert job['duration'] is not None
+
+
+def test_map_types_of_the_job_are_filtered_in_the_query(client, mappings, delivered):
+    assert client.get('/api/sync/mp_to_bp').status_code == 200
+    while MappingResync().state == SyncJobState.RUNNING:
+        sleep(0.01)
+    assert [uuid for _, uuid, _ in delivered] == [mappings['bacnet']]
+    assert client.get('/api/sync/mp/status').json['gp'] is False
+
+
+def test_failed_deliveries_are_left_to_the_outbox(mappings, delivered):
+    delivered.failing.add(mappings['generic'])
+    job: dict = run_job()
+    assert (job['delivered'], job['failed']) == (1, 1)
+    assert MappingSyncOutbox().is_pending(MapType.GENERIC, mappings['generic'])
+
+
+def test_points_with_a_newer_value_in_the_outbox_are_skipped(mappings, delivered):
+    MappingSyncOutbox().enqueue(MapType.BACNET, mappings['bacnet'], {'_16': 3})
+    job: dict = run_job()
+    assert (job['delivered'], job['skipped']) == (1, 1)
+    assert [uuid for _, uuid, _ in delivered] == [mappings['generic']]
@@ -0,0 +1,138 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Dict, List
+
+import pytest
+from gevent import sleep
+
+from src.enums.mapping import MapType
+from src.models.model_point_store import PointStoreModel
+from src.services import mapping_sync
+from src.services.mapping_sync import RETRY_INITIAL, MappingSyncOutbox
+from src.setting import MappingSyncSetting
+
+
+class Peer:
+    """
+    Mapped point service recording the deliveries, failing those of the uuids in failing
+    """
+
+    def __init__(self):
+        self.now: float = 1000
+        self.delivered: List[tuple] = []
+        self.failing: set = set()
+        self.in_flight: int = 0
+        self.max_in_flight: int = 0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def deliver(self, item: tuple) -> bool:
+        (map_type, mapped_point_uuid), priority_array_write = item
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        sleep(0.001)
+        self.in_flight -= 1
+        if mapped_point_uuid in self.failing:
+            return False
+        self.delivered.append((map_type, mapped_point_uuid, priority_array_write))
+        return True
+
+
+@pytest.fixture
+def peer(monkeypatch) -> Peer:
+    peer: Peer = Peer()
+    outbox: MappingSyncOutbox = MappingSyncOutbox()
+    setting: MappingSyncSetting = MappingSyncSetting()
+    setting.batch_size, setting.concurrency = 3, 2
+    monkeypatch.setattr(outbox, '_MappingSyncOutbox__setting', setting)
+    monkeypatch.setattr(outbox, '_MappingSyncOutbox__pending', OrderedDict())
+    monkeypatch.setattr(outbox, '_MappingSyncOutbox__failures', {})
+    monkeypatch.setattr(outbox, '_MappingSyncOutbox__retry_at', {})
+    monkeypatch.setattr(MappingSyncOutbox, 'deliver', peer.deliver)
+    monkeypatch.setattr(mapping_sync, 'time', peer)
+    return peer
+
+
+def test_latest_value_of_a_mapped_point_is_delivered_once(peer):
+    outbox: MappingSyncOutbox = MappingSyncOutbox()
+    for value in (1, 2, 3):
+        outbox.enqueue('GENERIC', 'g1', {'point_uuid': 'p1', '_16': value})
+    outbox.enqueue(MapType.BACNET, 'b1', {'_16': 4})
+    assert outbox.depth == 2 and outbox.is_pending(MapType.GENERIC, 'g1')
+    assert outbox.flush() == 2
+    assert peer.delivered == [(MapType.GENERIC, 'g1', {'_16': 3}), (MapType.BACNET, 'b1', {'_16': 4})]
+    assert outbox.depth == 0 and outbox.flush() == 0
+
+
+def test_values_of_disabled_map_types_are_dropped(peer):
+    MappingSyncOutbox().enqueue(MapType.GENERIC, 'g1', {'_16': 1}, gp=False)
+    MappingSyncOutbox().enqueue(MapType.BACNET, 'b1', {'_16': 1}, bp=False)
+    assert MappingSyncOutbox().depth == 0
+
+
+def test_rounds_are_of_batch_size_with_concurrency_deliveries_at_once(peer):
+    outbox: MappingSyncOutbox = MappingSyncOutbox()
+    for index in range(7):
+        outbox.enqueue(MapType.GENERIC, f'g{index}', {'_16': index})
+    assert [outbox.flush(), outbox.flush(), outbox.flush(), outbox.flush()] == [3, 3, 1, 0]
+    assert [uuid for _, uuid, _ in peer.delivered] == [f'g{index}' for index in range(7)]
+    assert peer.max_in_flight == 2
+
+
+def test_failed_delivery_is_retried_with_an_exponential_backoff(peer):
+    outbox: MappingSyncOutbox = MappingSyncOutbox()
+    peer.failing.add('g1')
+    outbox.enqueue(MapType.GENERIC, 'g1', {'_16': 1})
+    outbox.enqueue(MapType.GENERIC, 'g2', {'_16': 2})
+    assert outbox.flush() == 2
+    assert outbox.is_pending(MapType.GENERIC, 'g1')
+    peer.now += RETRY_INITIAL - 0.1
+    assert outbox.flush() == 0
+    peer.now += 0.1
+    assert outbox.flush() == 1
+    peer.now += 2 * RETRY_INITIAL - 0.1
+    assert outbox.flush() == 0
+    peer.failing.clear()
+    peer.now += 0.1
+    assert outbox.flush() == 1
+    assert [uuid for _, uuid, _ in peer.delivered] == ['g2', 'g1']
+    assert outbox.depth == 0
+
+
+def test_newer_value_queued_during_a_failed_delivery_is_not_held_back(peer, monkeypatch):
+    outbox: MappingSyncOutbox = MappingSyncOutbox()
+    peer.failing.add('g1')
+
+    def deliver(item: tuple) -> bool:
+        outbox.enqueue(MapType.GENERIC, 'g1', {'_16': 2})
+        return peer.deliver(item)
+
+    monkeypatch.setattr(MappingSyncOutbox, 'deliver', staticmethod(deliver))
+    outbox.enqueue(MapType.GENERIC, 'g1', {'_16': 1})
+    outbox.flush()
+    monkeypatch.setattr(MappingSyncOutbox, 'deliver', peer.deliver)
+    peer.failing.clear()
+    assert outbox.flush() == 1
+    assert peer.delivered == [(MapType.GENERIC, 'g1', {'_16': 2})]
+
+
+@pytest.mark.parametrize('response, delivered', [
+    (None, True),
+    (SimpleNamespace(status_code=200), True),
+    (SimpleNamespace(status_code=404), True),
+    (SimpleNamespace(status_code=503), False),
+    (ConnectionError('refused'), False),
+])
+def test_only_server_errors_and_exceptions_are_retried(response, delivered, monkeypatch):
+    requests: List[Dict] = []
+
+    def sync(map_type, mapped_point_uuid, priority_array_write):
+        requests.append(priority_array_write)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(PointStoreModel, 'sync_point_value_with_mapping_mp_to_gbp', sync)
+    assert MappingSyncOutbox.deliver(((MapType.GENERIC, 'g1'), {'_16': 1})) is delivered
+    assert requests == [{'_16': 1}]
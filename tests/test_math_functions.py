@@ -0,0 +1,40 @@
+import pytest
+
+from src.utils.math_functions import compile_arithmetic_expression, eval_arithmetic_expression, \
+    validate_arithmetic_expression
+
+EXPRESSIONS = ['x', 'x * 2 + 1', '(x - 32) * 5 / 9', 'x / 10', 'x // 3', 'x % 7', '-x', 'x ** 2', '100 / x', '2 ** x']
+
+
+@pytest.mark.parametrize('expression', EXPRESSIONS)
+@pytest.mark.parametrize('x', [0.5, 3, 17.25, 1000])
+def test_compiled_expressions_match_the_text_evaluation(expression, x):
+    assert compile_arithmetic_expression(expression)(x) == eval_arithmetic_expression(expression.replace('x', str(x)))
+
+
+def test_compiled_expressions_are_cached():
+    assert compile_arithmetic_expression('x + 1') is compile_arithmetic_expression('x + 1')
+
+
+def test_legacy_expressions_splice_x_as_text():
+    assert compile_arithmetic_expression('2x')(5) == 25
+    assert compile_arithmetic_expression('2x')(-5) == -3
+    with pytest.raises(TypeError):
+        compile_arithmetic_expression('2x')([1, 2])
+
+
+def test_runtime_errors_are_raised_on_evaluation():
+    operation = compile_arithmetic_expression('100 / x')
+    with pytest.raises(ZeroDivisionError):
+        operation(0)
+
+
+@pytest.mark.parametrize('expression', EXPRESSIONS + ['2x', 'x ** -1', '1 / (x - x)'])
+def test_valid_expressions(expression):
+    validate_arithmetic_expression(expression)
+
+
+@pytest.mark.parametrize('expression', ['x +', 'y * 2', 'abs(x)', 'x.real', '__import__("os")', ''])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        validate_arithmetic_expression(expression)
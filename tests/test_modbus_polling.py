@@ -0,0 +1,86 @@
+import time
+from typing import List
+
+import pytest
+from gevent import sleep, spawn
+from sqlalchemy import inspect
+
+from src import db
+from src.services.modbus_tcp_registry import ModbusTcpRegistryConnection
+from src.services.polling.modbus_polling import ModbusPolling, TcpPolling
+from src.services.polling.poll_scheduler import PollScheduler
+from tests.fake_modbus import FakeConnection
+
+
+@pytest.fixture
+def polled(monkeypatch) -> List[tuple]:
+    """
+    Devices polled by the sweep, with the session they got loaded in, each poll taking 0.2 seconds
+    """
+    polled: List[tuple] = []
+
+    def poll_device(_, __, network, device, points_by_uuid, blocks):
+        polled.append((device.address, inspect(device).session, sorted(points_by_uuid), len(blocks)))
+        sleep(0.2)
+        return True
+
+    monkeypatch.setattr(ModbusPolling, '_ModbusPolling__write_queued_points', lambda *_: True)
+    monkeypatch.setattr(ModbusPolling, '_ModbusPolling__poll_device', poll_device)
+    return polled
+
+
+def sweep(connection: FakeConnection, network) -> float:
+    started: float = time.monotonic()
+    getattr(TcpPolling(), '_ModbusPolling__poll_network_devices')(connection, network, PollScheduler())
+    return time.monotonic() - started
+
+
+def test_devices_are_polled_one_at_a_time_on_a_single_client(network, polled):
+    network, point_uuids = network
+    connection: FakeConnection = FakeConnection(1)
+    assert sweep(connection, network) >= 0.6
+    assert sorted(address for address, *_ in polled) == [1, 2, 3]
+    # the queued writes and each of the devices
+    assert (connection.acquired, connection.max_in_use) == (4, 1)
+
+
+def test_devices_are_polled_concurrently_by_workers(network, polled):
+    network, point_uuids = network
+    connection: FakeConnection = FakeConnection(3)
+    assert sweep(connection, network) < 0.4
+    assert sorted(address for address, *_ in polled) == [1, 2, 3]
+    assert connection.max_in_use == 3
+    # workers load the models in their own session
+    assert all(session is not None and session is not db.session() for _, session, _, _ in polled)
+    assert sorted(point_uuid for _, _, point_uuids_, _ in polled for point_uuid in point_uuids_) == \
+        sorted(point_uuids)
+
+
+def test_workers_skip_the_blocks_of_deleted_points(client, network, polled, monkeypatch):
+    network, point_uuids = network
+    original_poll_concurrently = getattr(TcpPolling(), '_ModbusPolling__poll_devices_concurrently')
+
+    def poll_concurrently(connection, network_, due_devices):
+        client.delete(f'/api/modbus/points/uuid/{point_uuids[0]}')
+        original_poll_concurrently(connection, network_, due_devices)
+
+    monkeypatch.setattr(TcpPolling(), '_ModbusPolling__poll_devices_concurrently', poll_concurrently)
+    sweep(FakeConnection(3), network)
+    assert sorted((address, blocks) for address, _, _, blocks in polled) == [(1, 0), (2, 1), (3, 1)]
+
+
+def test_tcp_connection_lends_each_client_to_one_user_at_a_time():
+    connection: ModbusTcpRegistryConnection = ModbusTcpRegistryConnection('key', ['c1', 'c2'])
+    held: List[str] = []
+
+    def hold():
+        with connection.acquire_client() as client:
+            held.append(client)
+            sleep(0.1)
+
+    workers = [spawn(hold) for _ in range(3)]
+    sleep(0.05)
+    assert sorted(held) == ['c1', 'c2']
+    for worker in workers:
+        worker.join()
+    assert len(held) == 3
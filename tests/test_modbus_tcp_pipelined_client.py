@@ -0,0 +1,88 @@
+import struct
+from typing import List
+
+import pytest
+from gevent import spawn, joinall, socket
+from gevent.server import StreamServer
+from pymodbus.exceptions import ConnectionException
+
+from src.services.modbus_tcp_pipelined_client import ModbusTcpPipelinedClient
+
+"""
+MBAP header and the PDU of a read holding registers request
+"""
+REQUEST = struct.Struct('>HHHBBHH')
+
+
+class FakeDevice:
+    """
+    Modbus TCP device answering FC3 requests with the register address as value, in the reverse order once it got a
+    batch of them; it hangs up instead when hang_up is set, or stays silent when mute is set
+    """
+
+    def __init__(self, batch: int = 1):
+        self.batch: int = batch
+        self.hang_up: bool = False
+        self.mute: bool = False
+        self.connections: int = 0
+        self.server: StreamServer = StreamServer(('127.0.0.1', 0), self.__handle)
+        self.server.start()
+
+    @property
+    def port(self) -> int:
+        return self.server.server_port
+
+    def __handle(self, sock: socket.socket, _):
+        self.connections += 1
+        requests: List[tuple] = []
+        stream = sock.makefile('rb')
+        while True:
+            data: bytes = stream.read(REQUEST.size)
+            if len(data) < REQUEST.size:
+                return
+            if self.hang_up:
+                sock.close()
+                return
+            requests.append(REQUEST.unpack(data))
+            if len(requests) < self.batch or self.mute:
+                continue
+            for transaction_id, _, _, unit, function_code, address, count in reversed(requests):
+                sock.sendall(struct.pack('>HHHBBB', transaction_id, 0, 3 + 2 * count, unit, function_code, 2 * count)
+                             + struct.pack(f'>{count}H', *[address] * count))
+            requests.clear()
+
+
+@pytest.fixture
+def device():
+    device = FakeDevice(batch=3)
+    yield device
+    device.server.stop()
+
+
+def test_replies_are_matched_to_their_requests(device):
+    client = ModbusTcpPipelinedClient(host='127.0.0.1', port=device.port, timeout=2)
+    reads = [spawn(client.read_holding_registers, address, 1, unit=1) for address in (10, 20, 30)]
+    joinall(reads, raise_error=True)
+    assert [read.value.registers for read in reads] == [[10], [20], [30]]
+    assert device.connections == 1
+    client.close()
+
+
+def test_unanswered_requests_time_out(device):
+    device.mute = True
+    client = ModbusTcpPipelinedClient(host='127.0.0.1', port=device.port, timeout=0.2)
+    assert client.read_holding_registers(10, 1, unit=1).isError()
+    client.close()
+
+
+def test_a_lost_connection_fails_the_pending_requests_then_reconnects(device):
+    device.hang_up = True
+    client = ModbusTcpPipelinedClient(host='127.0.0.1', port=device.port, timeout=2)
+    with pytest.raises(ConnectionException):
+        client.read_holding_registers(10, 1, unit=1)
+    assert client.socket is None
+    device.hang_up = False
+    device.batch = 1
+    assert client.read_holding_registers(20, 1, unit=1).registers == [20]
+    assert device.connections == 2
+    client.close()
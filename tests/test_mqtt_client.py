@@ -0,0 +1,117 @@
+import json
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from src.services.mqtt_client import MqttClient
+from src.services.mqtt_client.publish_queue import MqttPublishQueue
+from src.setting import MqttSetting
+
+PREFIX: str = 'c/cn/s/sn/d/dn'
+
+
+@pytest.fixture
+def setting(monkeypatch) -> MqttSetting:
+    setting: MqttSetting = MqttSetting()
+    monkeypatch.setattr(MqttClient, 'config', property(lambda _: setting))
+    return setting
+
+
+@pytest.fixture
+def published(setting, monkeypatch) -> List[tuple]:
+    published: List[tuple] = []
+    monkeypatch.setattr(MqttClient, '_publish_mqtt_value',
+                        lambda _, topic, payload, retain=True: published.append((topic, payload, retain)))
+    return published
+
+
+def make_models(point_name: str = 'p1'):
+    network = SimpleNamespace(uuid='n-uuid', name='n1')
+    device = SimpleNamespace(uuid='d-uuid', name='d1')
+    point = SimpleNamespace(uuid='p-uuid', name=point_name)
+    point_store = SimpleNamespace(fault=False, value=2.5, value_raw='0x19', ts_value='ts', fault_message=None,
+                                  ts_fault=None)
+    return network, device, point, point_store
+
+
+def publish(network, device, point, point_store, clear_value: bool = False):
+    MqttClient.publish_point_cov('MODBUS', network, device, point, point_store, clear_value, 16)
+
+
+def test_cov_is_published_on_the_all_and_value_topics(published):
+    publish(*make_models())
+    assert published == [
+        (f'{PREFIX}/rubix/points/value/cov/all/MODBUS/n-uuid/n1/d-uuid/d1/p-uuid/p1',
+         json.dumps({'fault': False, 'value': 2.5, 'value_raw': '0x19', 'ts': 'ts', 'priority': 16}), True),
+        (f'{PREFIX}/rubix/points/value/cov/value/MODBUS/n-uuid/n1/d-uuid/d1/p-uuid/p1', '2.5', True)]
+
+
+def test_faulty_point_is_only_published_on_the_all_topic(published):
+    network, device, point, point_store = make_models()
+    point_store.fault, point_store.fault_message, point_store.ts_fault = True, 'timeout', 'ts_fault'
+    publish(network, device, point, point_store)
+    assert len(published) == 1
+    assert json.loads(published[0][1])['fault_message'] == 'timeout'
+    assert json.loads(published[0][1])['ts'] == 'ts_fault'
+
+
+def test_cleared_point_publishes_empty_payloads(published):
+    publish(*make_models(), clear_value=True)
+    assert [payload for _, payload, _ in published] == ['', '']
+
+
+def test_topics_are_built_once_and_rebuilt_on_rename(published):
+    network, device, point, point_store = make_models()
+    publish(network, device, point, point_store)
+    publish(network, device, point, point_store)
+    assert published[0][0] is published[2][0]
+    point.name = 'p2'
+    device.name = 'd2'
+    publish(network, device, point, point_store)
+    assert published[4][0].endswith('/d-uuid/d2/p-uuid/p2')
+    MqttClient().evict_topics(point.uuid)
+    publish(network, device, point, point_store)
+    assert published[6][0] == published[4][0] and published[6][0] is not published[4][0]
+
+
+def test_batch_cov_publishes_the_covs_of_a_device_as_one_message(setting, published):
+    setting.publish_batch = True
+    network, device, point, point_store = make_models()
+    with MqttClient().batch_cov('MODBUS', network, device):
+        publish(network, device, point, point_store)
+        # nested blocks of a device join the outer batch
+        with MqttClient().batch_cov('MODBUS', network, device):
+            publish(network, device, SimpleNamespace(uuid='p2-uuid', name='p2'), point_store)
+        publish(network, device, point, point_store, clear_value=True)
+    topic, payload, retain = published[-1]
+    assert len(published) == 7
+    assert (topic, retain) == (f'{PREFIX}/rubix/points/value/cov/batch/MODBUS/n-uuid/n1/d-uuid/d1', False)
+    assert [(item['uuid'], item['name'], item['value']) for item in json.loads(payload)['points']] == \
+        [('p-uuid', 'p1', 2.5), ('p2-uuid', 'p2', 2.5)]
+
+
+def test_batch_only_when_values_are_not_published(setting, published):
+    setting.publish_batch, setting.publish_value = True, False
+    network, device, point, point_store = make_models()
+    with MqttClient().batch_cov('MODBUS', network, device):
+        publish(network, device, point, point_store)
+    assert [topic.split('/')[10] for topic, _, _ in published] == ['batch']
+
+
+def test_no_batch_without_covs_or_publish_batch(published):
+    network, device, point, point_store = make_models()
+    with MqttClient().batch_cov('MODBUS', network, device):
+        pass
+    with MqttClient().batch_cov('MODBUS', network, device):
+        publish(network, device, point, point_store)
+    assert len(published) == 2
+
+
+def test_started_client_publishes_through_its_queue(setting, monkeypatch):
+    queue: MqttPublishQueue = MqttPublishQueue(2)
+    monkeypatch.setattr(MqttClient(), '_MqttClient__queue', queue)
+    publish(*make_models())
+    publish(*make_models('p2'))
+    assert queue.depth == 2 and queue.dropped == 2
+    assert [queue.pop()[0].split('/')[-1] for _ in range(2)] == ['p2', 'p2']
@@ -0,0 +1,49 @@
+from typing import List
+
+import pytest
+from sqlalchemy import inspect
+
+import src.services.mqtt_republish as mqtt_republish
+from src.models.model_point import PointModel
+from src.services.mqtt_republish import MqttRepublish
+from src.setting import MqttSetting
+
+
+class FakeMqttClient:
+    publish_queue = None
+
+    def __init__(self):
+        self.config: MqttSetting = MqttSetting()
+        self.config.republish_rate = 1000000
+
+    @staticmethod
+    def status() -> bool:
+        return True
+
+
+@pytest.fixture
+def points(client, point) -> List[str]:
+    point_uuids: List[str] = [point.uuid]
+    for register in (2, 3, 4, 5):
+        point_uuids.append(client.post('/api/modbus/points', json={
+            'device_uuid': point.device_uuid, 'name': f'p{register}', 'enable': True, 'register': register,
+            'register_length': 1, 'function_code': 'READ_HOLDING_REGISTERS', 'data_type': 'INT16'}).json['uuid'])
+    return point_uuids
+
+
+def test_republish_pages_points_out_of_a_transaction(app, points, monkeypatch):
+    published: List[str] = []
+
+    def publish_cov(point, point_store, device, network):
+        # the page got loaded and its session closed before publishing
+        assert inspect(point).detached
+        assert point_store.point_uuid == point.uuid and device.uuid == point.device_uuid and network is device.network
+        published.append(point.uuid)
+
+    monkeypatch.setattr(mqtt_republish, 'MqttClient', FakeMqttClient)
+    monkeypatch.setattr(mqtt_republish, 'REPUBLISH_PAGE_SIZE', 2)
+    monkeypatch.setattr(PointModel, 'publish_cov', publish_cov)
+    MqttRepublish.republish()
+    assert published == sorted(published)
+    assert len(published) == len(set(published))
+    assert set(points) <= set(published)
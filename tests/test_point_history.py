@@ -0,0 +1,114 @@
+from datetime import datetime
+
+import pytest
+
+import src.services.point_history as point_history
+from src.models.model_point_history import PointHistoryModel
+from src.services.point_history import PointHistory, PointHistoryBuffer, to_datetime, to_timestamp
+from src.setting import PointHistorySetting
+
+"""
+Start of a minute
+"""
+T0: float = 1800000000 - 1800000000 % 60
+
+
+class Clock:
+    def __init__(self):
+        self.now: float = T0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(point_history, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def history(app, clock):
+    history = PointHistory()
+    if not history.enabled:
+        setting: PointHistorySetting = PointHistorySetting()
+        setting.flush_interval = 3600
+        history.start(setting)
+    # rolls up whatever other tests left behind, then starts from T0
+    clock.now = T0
+    history.roll_up()
+    setattr(history, '_PointHistory__rolled_up_until', T0)
+    return history
+
+
+def rows_of(point_uuid: str) -> list:
+    return [(to_timestamp(row.ts), row.value_min, row.value_max, row.value_avg, row.count) for row in
+            PointHistoryModel.find_by_point_uuid(point_uuid, datetime(1970, 1, 1), datetime(2100, 1, 1))]
+
+
+def test_buffer_pending_samples():
+    buffer: PointHistoryBuffer = PointHistoryBuffer(4)
+    for timestamp in (0, 1, 2):
+        buffer.append(timestamp, timestamp * 10)
+    assert buffer.pending_samples(2) == [(0, 0), (1, 10)]
+    buffer.consume(2)
+    assert buffer.pending == 1
+    assert buffer.pending_samples(10) == [(2, 20)]
+    for timestamp in (3, 4, 5, 6):
+        buffer.append(timestamp, timestamp * 10)
+    # overwritten samples are not pending anymore
+    assert buffer.pending == 4
+    assert buffer.pending_samples(10) == [(3, 30), (4, 40), (5, 50), (6, 60)]
+    assert buffer.samples(0, 5) == [(3, 30), (4, 40)]
+
+
+def test_roll_up_writes_new_samples_only(history, clock, point):
+    for value in (1, 2, 3):
+        history.record(point.uuid, value)
+        clock.now += 10
+    clock.now = T0 + 60
+    history.roll_up()
+    assert rows_of(point.uuid) == [(T0, 1, 3, 2, 3)]
+    history.record(point.uuid, 5)
+    clock.now = T0 + 120
+    history.roll_up()
+    assert rows_of(point.uuid) == [(T0, 1, 3, 2, 3), (T0 + 60, 5, 5, 5, 1)]
+    clock.now = T0 + 180
+    history.roll_up()
+    assert rows_of(point.uuid) == [(T0, 1, 3, 2, 3), (T0 + 60, 5, 5, 5, 1)]
+
+
+def test_roll_up_drops_rows_of_deleted_points_only(history, clock, point):
+    history.record(point.uuid, 1)
+    history.record('deleted_point', 2)
+    clock.now = T0 + 60
+    history.roll_up()
+    assert rows_of(point.uuid) == [(T0, 1, 1, 1, 1)]
+    assert rows_of('deleted_point') == []
+    history.evict('deleted_point')
+
+
+def test_roll_up_merges_into_existing_minute(history, clock, point):
+    PointHistoryModel.write_rows([{'point_uuid': point.uuid, 'ts': to_datetime(T0), 'value_min': -5.0,
+                                   'value_max': 1.0, 'value_avg': 0.0, 'count': 2}])
+    history.record(point.uuid, 4)
+    history.record(point.uuid, 6)
+    clock.now = T0 + 60
+    history.roll_up()
+    assert rows_of(point.uuid) == [(T0, -5, 6, 2.5, 4)]
+
+
+def test_query_joins_roll_ups_and_raw_samples(history, clock, point):
+    for value in (1, 3):
+        history.record(point.uuid, value)
+        clock.now += 20
+    clock.now = T0 + 60
+    history.roll_up()
+    history.record(point.uuid, 8)
+    clock.now = T0 + 90
+    buckets: list = history.query(point.uuid, to_datetime(T0 + 30), to_datetime(clock.now), 600)
+    # the minute the query starts in goes whole into the first bucket
+    assert buckets == [{'ts': str(to_datetime(T0 + 30)), 'min': 1, 'max': 8, 'avg': 4, 'count': 3}]
+    with pytest.raises(ValueError):
+        history.query(point.uuid, to_datetime(T0), to_datetime(T0 + 60), 0)
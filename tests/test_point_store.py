@@ -0,0 +1,89 @@
+from datetime import datetime
+
+import pytest
+
+from src.models.model_point_store import PointStoreModel, STATE_COLUMNS
+from src.services.point_store_cache import PointStoreCache
+from src.setting import PointStoreSetting
+
+TS: datetime = datetime(2026, 1, 1)
+
+"""
+(stored value, stored fault, stored fault_message, value, fault, fault_message, cov_threshold, is a change)
+"""
+COV_CASES = [
+    (None, False, None, 1.0, False, None, 0, True),
+    (1.0, False, None, 1.0, False, None, 0, False),
+    (1.0, False, None, 1.2, False, None, 0, True),
+    (1.0, False, None, 1.2, False, None, 0.5, False),
+    (1.0, False, None, 1.5, False, None, 0.5, True),
+    (1.0, False, None, 2.0, False, None, None, False),
+    (1.0, True, 'offline', 1.0, False, None, 0, True),
+    (1.0, False, None, None, True, 'offline', 0, True),
+    (1.0, True, 'offline', None, True, 'offline', 0, False),
+    (1.0, True, 'offline', None, True, 'timeout', 0, True),
+    (1.0, True, None, None, True, 'timeout', 0, False),
+]
+
+
+def make_state(value, fault, fault_message) -> dict:
+    return {'value': value, 'value_original': value, 'value_raw': None, 'fault': fault,
+            'fault_message': fault_message, 'ts_value': None, 'ts_fault': None}
+
+
+@pytest.mark.parametrize('stored_value, stored_fault, stored_message, value, fault, message, cov_threshold, changed',
+                         COV_CASES)
+def test_apply_cov(app, stored_value, stored_fault, stored_message, value, fault, message, cov_threshold, changed):
+    state: dict = make_state(stored_value, stored_fault, stored_message)
+    point_store: PointStoreModel = PointStoreModel(point_uuid='p', value=value, value_original=value, fault=fault,
+                                                   fault_message=message)
+    assert point_store.apply_cov(state, cov_threshold, TS) is changed
+    if changed and fault:
+        assert (state['fault'], state['fault_message'], state['ts_fault']) == (True, message, TS)
+    elif changed:
+        assert (state['value'], state['fault'], state['fault_message'], state['ts_value']) == (value, False, None, TS)
+    else:
+        assert state == make_state(stored_value, stored_fault, stored_message)
+
+
+# a None cov_threshold is not valid SQL, points default it to 0
+@pytest.mark.parametrize('stored_value, stored_fault, stored_message, value, fault, message, cov_threshold, changed',
+                         [case for case in COV_CASES if case[6] is not None])
+def test_apply_cov_matches_the_conditional_update(point, stored_value, stored_fault, stored_message, value, fault,
+                                                  message, cov_threshold, changed):
+    PointStoreModel.write_states({point.uuid: make_state(stored_value, stored_fault, stored_message)})
+    point_store: PointStoreModel = PointStoreModel(point_uuid=point.uuid, value=value, value_original=value,
+                                                   fault=fault, fault_message=message)
+    assert point_store.update(cov_threshold) is changed
+
+
+@pytest.fixture
+def cache(app):
+    cache: PointStoreCache = PointStoreCache()
+    setting: PointStoreSetting = PointStoreSetting()
+    setting.flush_interval = 3600
+    cache.start(setting)
+    yield cache
+    cache.flush()
+    setattr(cache, '_PointStoreCache__enabled', False)
+
+
+def test_write_behind_flushes_changes_only(cache, point):
+    assert PointStoreModel(point_uuid=point.uuid, value=1.0, value_original=1.0).update(0)
+    assert not PointStoreModel(point_uuid=point.uuid, value=1.0, value_original=1.0).update(0)
+    assert PointStoreModel.find_states([point.uuid])[point.uuid]['value'] is None
+    # reads get the cached state overlaid
+    point_store: PointStoreModel = PointStoreModel.find_by_point_uuid(point.uuid)
+    cache.apply(point_store)
+    assert point_store.value == 1.0
+    cache.flush()
+    state: dict = PointStoreModel.find_states([point.uuid])[point.uuid]
+    assert (state['value'], state['fault']) == (1.0, False)
+    assert set(state) == set(STATE_COLUMNS)
+
+
+def test_write_behind_drops_evicted_points(cache, point):
+    assert PointStoreModel(point_uuid=point.uuid, value=2.0, value_original=2.0).update(0)
+    cache.evict(point.uuid)
+    cache.flush()
+    assert PointStoreModel.find_states([point.uuid])[point.uuid]['value'] is None
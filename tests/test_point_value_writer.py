@@ -0,0 +1,81 @@
+import pytest
+from rubix_http.exceptions.exception import BadDataException, NotFoundException
+
+from src import db
+from src.models.model_point import PointModel
+from src.models.model_priority_array import PriorityArrayModel
+from src.resources.point.point_value_writer import PointValueBulkWriterResource
+from src.services.polling.write_queue import PointWriteQueue
+
+
+@pytest.mark.parametrize('priority_array_write, validated', [
+    ({}, {}),
+    ({'_1': 1, '_16': 2.5, '_8': None}, {'_1': 1.0, '_16': 2.5, '_8': None}),
+])
+def test_valid_priority_array_write(priority_array_write, validated):
+    assert PointModel.validate_priority_array_write(priority_array_write) == validated
+
+
+@pytest.mark.parametrize('priority_array_write, message', [
+    ([1], 'should be an object'),
+    ({'_17': 1}, 'key _17 should be one of _1.._16'),
+    ({'point_uuid': 'p1'}, 'key point_uuid'),
+    ({'_16': '1'}, '_16 should be a number or null'),
+    ({'_16': True}, '_16 should be a number or null'),
+])
+def test_invalid_priority_array_write(priority_array_write, message):
+    with pytest.raises(ValueError, match=message):
+        PointModel.validate_priority_array_write(priority_array_write)
+
+
+def get_priority_array(point_uuid: str) -> dict:
+    db.session.expire_all()
+    priority_array: dict = PriorityArrayModel.find_by_point_uuid(point_uuid).to_dict()
+    return {key: value for key, value in priority_array.items() if value is not None and key != 'point_uuid'}
+
+
+@pytest.fixture
+def points(client, point, write_point) -> tuple:
+    """
+    Two written points, by uuid and by network_name:device_name:point_name
+    """
+    point_uuid: str = client.post('/api/modbus/points', json={
+        'device_uuid': point.device_uuid, 'name': 'w2', 'enable': True, 'writable': True, 'register': 3,
+        'register_length': 1, 'function_code': 'WRITE_REGISTER', 'data_type': 'INT16'}).json['uuid']
+    yield write_point.uuid, point_uuid, f'{point.device.network.name}:d1:w2'
+    PointWriteQueue().remove_network(point.device.network_uuid)
+
+
+def test_bulk_write_applies_and_queues_all_the_writes(client, point, points):
+    write_point_uuid, point_uuid, point_name = points
+    response = client.patch('/api/modbus/points_value/bulk', json=[
+        {'uuid': write_point_uuid, 'value': 1},
+        {'name': point_name, 'value': 2, 'priority': 8},
+        {'uuid': write_point_uuid, 'priority_array_write': {'_10': 3, '_16': None}}])
+    assert response.status_code == 200
+    assert get_priority_array(write_point_uuid) == {'_10': 3.0}
+    assert get_priority_array(point_uuid) == {'_8': 2.0}
+    assert PointWriteQueue().pop_all(point.device.network_uuid) == [write_point_uuid, point_uuid]
+
+
+@pytest.mark.parametrize('items, exception, message', [
+    ({'value': 1}, BadDataException, 'should be a list'),
+    ([{'name': 'w1', 'value': 1}], BadDataException, 'network_name:device_name:point_name'),
+    ([{'uuid': 'unknown', 'value': 1}], NotFoundException, 'unknown not found'),
+    ([{'uuid': 'READ', 'value': 1}], BadDataException, 'is not writable'),
+    ([{'uuid': 'WRITE', 'value': 1, 'priority': 17}], BadDataException, 'priority should be in range'),
+    ([{'uuid': 'WRITE', 'value': 'one'}], BadDataException, 'Invalid write of point'),
+    ([{'uuid': 'WRITE', 'priority_array_write': {'_0': 1}}], BadDataException, 'key _0'),
+])
+def test_invalid_bulk_write_applies_none_of_the_writes(app, point, points, items, exception, message):
+    write_point_uuid, point_uuid, _ = points
+    if isinstance(items, list):
+        items = [{'uuid': point_uuid, 'value': 5}] + [
+            {**item, 'uuid': {'READ': point.uuid, 'WRITE': write_point_uuid}.get(item.get('uuid'), item.get('uuid'))}
+            if 'uuid' in item else item for item in items]
+    with app.test_request_context(json=items):
+        with pytest.raises(exception, match=message):
+            PointValueBulkWriterResource.patch()
+    db.session.rollback()
+    assert get_priority_array(point_uuid) == {}
+    assert not PointWriteQueue().has_pending(point.device.network_uuid)
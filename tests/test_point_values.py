@@ -0,0 +1,62 @@
+from typing import List
+
+import pytest
+
+from src.models.model_point import PointModel
+from src.models.model_point_store import PointStoreModel
+
+
+@pytest.fixture
+def points(client, point) -> List[PointModel]:
+    for register, value_operation in ((2, '100 / x'), (3, 'x * 2')):
+        client.post('/api/modbus/points', json={
+            'device_uuid': point.device_uuid, 'name': f'p{register}', 'enable': True, 'register': register,
+            'register_length': 1, 'function_code': 'READ_HOLDING_REGISTERS', 'data_type': 'INT16',
+            'value_operation': value_operation})
+    return sorted(PointModel.find_all_by_device_uuids([point.device_uuid]), key=lambda p: p.register)
+
+
+@pytest.fixture
+def published(monkeypatch) -> List[str]:
+    published: List[str] = []
+
+    def publish_cov(point, point_store, device=None, network=None, force_clear=False):
+        if point.name == 'fails':
+            raise Exception('broker gone')
+        published.append(point.uuid)
+
+    monkeypatch.setattr(PointModel, 'publish_cov', publish_cov)
+    return published
+
+
+def poll(points: List[PointModel], values: List[float]) -> List[str]:
+    point_stores: List[PointStoreModel] = [PointStoreModel(point_uuid=point.uuid, value_original=value)
+                                           for point, value in zip(points, values)]
+    device = points[0].device
+    return [point.uuid for point in PointModel.update_point_values(points, point_stores, device, device.network)]
+
+
+def stored_values(points: List[PointModel]) -> List[tuple]:
+    states: dict = PointStoreModel.find_states([point.uuid for point in points])
+    return [(states[point.uuid]['value'], states[point.uuid]['fault']) for point in points]
+
+
+def test_a_block_publishes_the_changed_points_only(points, published):
+    assert poll(points, [1, 4, 5]) == [point.uuid for point in points]
+    assert stored_values(points) == [(1, False), (25, False), (10, False)]
+    assert published == [point.uuid for point in points]
+    published.clear()
+    assert poll(points, [1, 4, 6]) == [points[2].uuid]
+    assert published == [points[2].uuid]
+
+
+def test_a_failing_value_operation_faults_its_point_only(points, published):
+    assert poll(points, [1, 0, 5]) == [point.uuid for point in points]
+    assert stored_values(points) == [(1, False), (None, True), (10, False)]
+    assert PointStoreModel.find_by_point_uuid(points[1].uuid).fault_message.startswith('Value computation failed')
+
+
+def test_a_failing_publish_does_not_stop_the_block(points, published):
+    points[0].name = 'fails'
+    assert poll(points, [1, 4, 5]) == [point.uuid for point in points]
+    assert published == [point.uuid for point in points[1:]]
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from src.services.polling.poll_scheduler import PollScheduler, get_polling_interval
+
+
+def test_unscheduled_keys_are_due():
+    scheduler: PollScheduler = PollScheduler()
+    assert scheduler.pop_due(0) == set()
+    assert scheduler.is_due('a', set())
+    assert scheduler.next_deadline() is None
+
+
+def test_keys_get_due_in_deadline_order():
+    scheduler: PollScheduler = PollScheduler()
+    scheduler.schedule('slow', 10, 0)
+    scheduler.schedule('fast', 1, 0)
+    assert not scheduler.is_due('slow', set())
+    assert scheduler.next_deadline() == 1
+    assert scheduler.pop_due(0.5) == set()
+    due = scheduler.pop_due(1)
+    assert due == {'fast'}
+    assert scheduler.is_due('fast', due) and not scheduler.is_due('slow', due)
+    assert scheduler.next_deadline() == 10
+    assert scheduler.pop_due(20) == {'slow'}
+
+
+def test_rescheduling_replaces_the_deadline():
+    scheduler: PollScheduler = PollScheduler()
+    scheduler.schedule('a', 1, 0)
+    scheduler.schedule('a', 5, 0)
+    assert scheduler.next_deadline() == 5
+    assert scheduler.pop_due(1) == set()
+    assert scheduler.pop_due(5) == {'a'}
+
+
+def test_due_keys_which_are_not_rescheduled_are_forgotten():
+    scheduler: PollScheduler = PollScheduler()
+    scheduler.schedule('a', 1, 0)
+    assert scheduler.pop_due(1) == {'a'}
+    assert scheduler.next_deadline() is None
+    assert scheduler.is_due('a', set())
+
+
+def test_polling_interval_precedence():
+    network = SimpleNamespace(polling_interval_runtime=30)
+    device = SimpleNamespace(polling_interval=None)
+    point = SimpleNamespace(polling_interval=None)
+    assert get_polling_interval(network, device, point) == 30
+    device.polling_interval = 10
+    assert get_polling_interval(network, device, point) == 10
+    point.polling_interval = 2
+    assert get_polling_interval(network, device, point) == 2
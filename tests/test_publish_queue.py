@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from gevent import sleep, spawn
+from paho.mqtt.client import MQTT_ERR_NO_CONN, MQTT_ERR_SUCCESS
+
+from src.services.mqtt_client import MqttClient, mqtt_client
+from src.services.mqtt_client.publish_queue import MqttPublishQueue
+from src.setting import MqttSetting
+
+
+def test_latest_message_of_a_topic_keeps_its_place():
+    queue: MqttPublishQueue = MqttPublishQueue(10)
+    queue.put('a', '1', True)
+    queue.put('b', '1', True)
+    queue.put('a', '2', False)
+    assert (queue.depth, queue.merged, queue.dropped) == (2, 1, 0)
+    assert [queue.pop(), queue.pop(), queue.pop()] == [('a', '2', False), ('b', '1', True), None]
+
+
+def test_full_queue_drops_its_oldest_topic():
+    queue: MqttPublishQueue = MqttPublishQueue(2)
+    for topic in ('a', 'b', 'c'):
+        queue.put(topic, topic, True)
+    assert queue.to_dict() == {'depth': 2, 'merged': 0, 'dropped': 1}
+    assert [queue.pop()[0], queue.pop()[0]] == ['b', 'c']
+
+
+def test_failed_message_is_put_back_at_the_head_unless_a_newer_one_is_queued():
+    queue: MqttPublishQueue = MqttPublishQueue(2)
+    queue.put('a', '1', True)
+    queue.put('b', '1', True)
+    message: tuple = queue.pop()
+    queue.put_back(*message)
+    assert queue.pop() == ('a', '1', True)
+    queue.put('a', '2', True)
+    queue.put_back('a', '1', True)
+    # full, the failed message is the one dropped
+    queue.put_back('d', '1', True)
+    assert [queue.pop(), queue.pop(), queue.pop()] == [('b', '1', True), ('a', '2', True), None]
+    assert queue.dropped == 1
+
+
+def test_wait_sleeps_till_a_message_is_queued():
+    queue: MqttPublishQueue = MqttPublishQueue(2)
+    assert not queue.wait(0.01)
+    waiter = spawn(queue.wait, 5)
+    sleep(0.01)
+    queue.put('a', '1', True)
+    assert waiter.get(timeout=1)
+    queue.pop()
+    assert not queue.wait(0.01)
+
+
+class FakePahoClient:
+    def __init__(self):
+        self.connected: bool = False
+        self.failures: int = 0
+        self.published: List[tuple] = []
+
+    def publish(self, topic, payload, qos, retain):
+        if self.failures:
+            self.failures -= 1
+            return SimpleNamespace(rc=MQTT_ERR_NO_CONN)
+        self.published.append((topic, payload, retain))
+        return SimpleNamespace(rc=MQTT_ERR_SUCCESS)
+
+
+@pytest.fixture
+def paho(monkeypatch) -> FakePahoClient:
+    """
+    The publisher thread of MqttClient, publishing on a fake paho client
+    """
+    paho: FakePahoClient = FakePahoClient()
+    queue: MqttPublishQueue = MqttPublishQueue(10)
+    monkeypatch.setattr(MqttClient, 'config', property(lambda _: MqttSetting()))
+    monkeypatch.setattr(MqttClient, 'client', property(lambda _: paho))
+    monkeypatch.setattr(MqttClient, 'status', lambda _: paho.connected)
+    monkeypatch.setattr(mqtt_client, 'sleep', lambda _: sleep(0.01))
+    monkeypatch.setattr(MqttClient(), '_MqttClient__queue', queue)
+    publisher = spawn(getattr(MqttClient(), '_MqttClient__publish_loop'))
+    yield paho
+    publisher.kill()
+
+
+def test_disconnected_client_flushes_the_latest_messages_on_reconnect(paho):
+    for value in range(5):
+        MqttClient()._publish_mqtt_value('t1', str(value))
+        MqttClient()._publish_mqtt_value('t2', str(value), False)
+        sleep(0.01)
+    assert paho.published == []
+    paho.connected = True
+    sleep(0.05)
+    assert paho.published == [('t1', '4', True), ('t2', '4', False)]
+    assert MqttClient().publish_queue.merged == 8
+
+
+def test_rejected_publish_is_retried(paho):
+    paho.connected = True
+    paho.failures = 2
+    MqttClient()._publish_mqtt_value('t1', '1')
+    sleep(0.1)
+    assert paho.published == [('t1', '1', True)]
+    assert MqttClient().publish_queue.depth == 0
@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+from typing import List
+
+from src.enums.point import ModbusFunctionCode
+from src.services.polling.read_plan import DeviceReadPlan, ReadPlanCache, get_max_block_size, group_contiguous_points, \
+    group_write_points
+
+HOLDING = ModbusFunctionCode.READ_HOLDING_REGISTERS
+COILS = ModbusFunctionCode.READ_COILS
+WRITE = ModbusFunctionCode.WRITE_REGISTERS
+
+
+def make_point(uuid: str, register: int, register_length: int = 1, function_code=HOLDING,
+               polling_interval: float = None):
+    return SimpleNamespace(uuid=uuid, register=register, register_length=register_length,
+                           function_code=function_code, polling_interval=polling_interval)
+
+
+def make_device(supports_multiple_rw: bool = True, max_register_gap: int = None, max_block_size: int = None):
+    return SimpleNamespace(uuid='d1', supports_multiple_rw=supports_multiple_rw, max_register_gap=max_register_gap,
+                           max_block_size=max_block_size)
+
+
+def blocks_of(plan: DeviceReadPlan) -> List[tuple]:
+    return [(block.point_uuids, block.offsets) for block in plan.blocks]
+
+
+def test_plan_without_aggregates_polls_point_by_point():
+    points = [make_point('a', 1), make_point('b', 2)]
+    assert blocks_of(DeviceReadPlan(make_device(False), points)) == [(['a'], [0]), (['b'], [0])]
+
+
+def test_plan_groups_contiguous_points_per_function_code():
+    points = [make_point('c', 2, 2), make_point('a', 0), make_point('b', 1), make_point('d', 5),
+              make_point('x', 0, function_code=COILS)]
+    plan: DeviceReadPlan = DeviceReadPlan(make_device(), points)
+    assert blocks_of(plan) == [(['x'], [0]), (['a', 'b', 'c'], [0, 1, 2]), (['d'], [0])]
+    assert [block.function_code for block in plan.blocks] == [COILS, HOLDING, HOLDING]
+    assert [block.is_write for block in plan.blocks] == [False, False, False]
+
+
+def test_plan_keeps_points_of_other_polling_intervals_apart():
+    points = [make_point('a', 0), make_point('b', 1, polling_interval=10)]
+    assert blocks_of(DeviceReadPlan(make_device(), points)) == [(['a'], [0]), (['b'], [0])]
+
+
+def test_plan_splits_on_the_block_size_limit():
+    points = [make_point(str(register), register) for register in range(130)]
+    assert [len(block.point_uuids) for block in DeviceReadPlan(make_device(), points).blocks] == [125, 5]
+    assert [len(block.point_uuids) for block in DeviceReadPlan(make_device(max_block_size=50), points).blocks] == \
+        [50, 50, 30]
+
+
+def test_read_plan_cache_rebuilds_on_changes():
+    cache: ReadPlanCache = ReadPlanCache()
+    device = make_device()
+    points = [make_point('a', 0)]
+    plan: DeviceReadPlan = cache.get_plan(device, points)
+    assert cache.get_plan(device, points) is plan
+    device.max_block_size = 10
+    changed: DeviceReadPlan = cache.get_plan(device, points)
+    assert changed is not plan
+    assert cache.get_plan(device, points + [make_point('b', 1)]) is not changed
+    plan = cache.get_plan(device, points)
+    cache.invalidate_device(device.uuid)
+    assert cache.get_plan(device, points) is not plan
+
+
+def test_group_contiguous_points_splits_on_holes_and_size():
+    points = [make_point('a', 0), make_point('b', 1, 2), make_point('c', 4), make_point('d', 5)]
+    assert [[point.uuid for point in group] for group in group_contiguous_points(points, 125)] == \
+        [['a', 'b'], ['c', 'd']]
+    assert [[point.uuid for point in group] for group in group_contiguous_points(points, 2)] == \
+        [['a'], ['b'], ['c', 'd']]
+
+
+def test_group_contiguous_points_bridges_small_gaps():
+    points = [make_point('a', 0), make_point('b', 3), make_point('c', 10)]
+    assert [[point.uuid for point in group] for group in group_contiguous_points(points, 125, 2)] == \
+        [['a', 'b'], ['c']]
+    # the filler registers count in the block size
+    assert [[point.uuid for point in group] for group in group_contiguous_points(points, 3, 2)] == \
+        [['a'], ['b'], ['c']]
+
+
+def test_group_contiguous_points_merges_overlaps_of_reads_only():
+    points = [make_point('a', 0, 4), make_point('b', 2)]
+    assert len(group_contiguous_points(points, 125)) == 2
+    assert [[point.uuid for point in group] for group in group_contiguous_points(points, 125, 0, True)] == \
+        [['a', 'b']]
+
+
+def test_plan_coalesces_reads_across_the_max_register_gap():
+    points = [make_point('a', 0), make_point('b', 3), make_point('c', 3, 2), make_point('d', 20)]
+    assert blocks_of(DeviceReadPlan(make_device(max_register_gap=2), points)) == \
+        [(['a', 'b', 'c'], [0, 3, 3]), (['d'], [0])]
+    writes = [make_point('a', 0, function_code=WRITE), make_point('b', 2, function_code=WRITE)]
+    assert blocks_of(DeviceReadPlan(make_device(max_register_gap=2), writes)) == [(['a'], [0]), (['b'], [0])]
+
+
+def test_max_block_size_per_function_code():
+    assert get_max_block_size(make_device(), COILS) == 2000
+    assert get_max_block_size(make_device(), WRITE) == 123
+    assert get_max_block_size(make_device(max_block_size=500), HOLDING) == 125
+    assert get_max_block_size(make_device(max_block_size=20), HOLDING) == 20
+
+
+def test_group_write_points_of_aggregate_devices_only():
+    points = [make_point('b', 1, function_code=WRITE), make_point('a', 0, function_code=WRITE),
+              make_point('c', 0, function_code=ModbusFunctionCode.WRITE_COIL)]
+    assert [[point.uuid for point in group] for group in group_write_points(make_device(), points)] == \
+        [['c'], ['a', 'b']]
+    assert [[point.uuid for point in group] for group in group_write_points(make_device(False), points)] == \
+        [['b'], ['a'], ['c']]
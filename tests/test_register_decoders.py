@@ -0,0 +1,96 @@
+import random
+from typing import List
+
+import pytest
+from pymodbus.constants import Endian
+from pymodbus.payload import BinaryPayloadDecoder
+from pymodbus.register_read_message import ReadHoldingRegistersResponse
+
+from src.enums.point import ModbusDataType
+from src.models.model_point import PointModel
+from src.models.model_point_store import PointStoreModel
+from src.services.polling.poll import poll_point_aggregate
+from src.services.polling.register_decoders import DATA_TYPE_FORMATS, decode_registers, get_register_decoder
+
+DECODE_METHODS = {
+    ModbusDataType.INT16: 'decode_16bit_int',
+    ModbusDataType.UINT16: 'decode_16bit_uint',
+    ModbusDataType.INT32: 'decode_32bit_int',
+    ModbusDataType.UINT32: 'decode_32bit_uint',
+    ModbusDataType.FLOAT: 'decode_32bit_float',
+    ModbusDataType.DOUBLE: 'decode_64bit_float',
+}
+
+ORDERS = [(byteorder, word_order) for byteorder in (Endian.Big, Endian.Little)
+          for word_order in (Endian.Big, Endian.Little)]
+
+REGISTERS: List[int] = [random.Random(9).randrange(0x10000) for _ in range(32)]
+
+
+def decode_with_pymodbus(registers: List[int], data_type: ModbusDataType, byteorder: Endian, word_order: Endian):
+    decoder = BinaryPayloadDecoder.fromRegisters(registers, byteorder=byteorder, wordorder=word_order)
+    return getattr(decoder, DECODE_METHODS[data_type])()
+
+
+def same(a, b) -> bool:
+    # NaN payloads compare unequal to themselves
+    return a == b or (a != a and b != b)
+
+
+@pytest.mark.parametrize('data_type', list(DATA_TYPE_FORMATS))
+@pytest.mark.parametrize('byteorder, word_order', ORDERS)
+def test_register_decoder_matches_pymodbus(data_type, byteorder, word_order):
+    decoder = get_register_decoder(data_type, byteorder, word_order)
+    for offset in range(0, 8):
+        registers: List[int] = REGISTERS[offset:offset + decoder.register_length]
+        assert same(decoder.decode(REGISTERS, offset), decode_with_pymodbus(registers, data_type, byteorder, word_order))
+
+
+def test_register_decoders_are_shared():
+    assert get_register_decoder(ModbusDataType.FLOAT, Endian.Big, Endian.Little) is \
+        get_register_decoder(ModbusDataType.FLOAT, Endian.Big, Endian.Little)
+    assert get_register_decoder(ModbusDataType.RAW, Endian.Big, Endian.Big) is None
+
+
+@pytest.mark.parametrize('byteorder, word_order', ORDERS)
+def test_decode_registers_matches_the_single_decodes(byteorder, word_order):
+    decoders = []
+    # a run of back to back values, values out of order and a value sharing the registers of another one
+    for data_type, offset in [(ModbusDataType.FLOAT, 0), (ModbusDataType.FLOAT, 2), (ModbusDataType.FLOAT, 4),
+                              (ModbusDataType.INT16, 10), (ModbusDataType.UINT32, 8), (ModbusDataType.DOUBLE, 12),
+                              (ModbusDataType.INT32, 12), (ModbusDataType.UINT16, 6), (ModbusDataType.INT16, 7)]:
+        decoders.append((get_register_decoder(data_type, byteorder, word_order), offset))
+    values = decode_registers(REGISTERS[:16], decoders)
+    for (decoder, offset), value in zip(decoders, values):
+        assert same(value, decoder.decode(REGISTERS[:16], offset))
+
+
+def test_decode_registers_leaves_values_out_of_the_block():
+    double = get_register_decoder(ModbusDataType.DOUBLE, Endian.Big, Endian.Big)
+    int16 = get_register_decoder(ModbusDataType.INT16, Endian.Big, Endian.Big)
+    assert decode_registers([1, 2, 3], [(int16, 2), (double, 0), (None, 0)]) == [3, None, None]
+
+
+class FakeClient:
+    def __init__(self, registers: List[int]):
+        self.registers: List[int] = registers
+
+    def read_holding_registers(self, address: int, count: int, unit: int):
+        return ReadHoldingRegistersResponse(self.registers[address:address + count])
+
+
+def test_aggregate_faults_a_point_which_does_not_fit_in_the_block(client, point, monkeypatch):
+    monkeypatch.setattr(PointModel, 'publish_cov', lambda *_, **__: None)
+    double_uuid: str = client.post('/api/modbus/points', json={
+        'device_uuid': point.device_uuid, 'name': 'double', 'enable': True, 'register': 2, 'register_length': 4,
+        'function_code': 'READ_HOLDING_REGISTERS', 'data_type': 'DOUBLE'}).json['uuid']
+    points: List[PointModel] = sorted(PointModel.find_all_by_device_uuids([point.device_uuid]), key=lambda p: p.register)
+    # as stored before DOUBLE points got 4 registers
+    points[1].register_length = 2
+    device = points[0].device
+    poll_point_aggregate(FakeClient(list(range(100, 110))), device.network, device, points)
+    # registers of devices which are not zero based start at 1
+    assert PointStoreModel.find_by_point_uuid(point.uuid).value == 100
+    double_store: PointStoreModel = PointStoreModel.find_by_point_uuid(double_uuid)
+    assert double_store.fault
+    assert double_store.fault_message == 'DOUBLE registers 1-4 out of the block of 3 registers'
@@ -0,0 +1,136 @@
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+import shortuuid
+from pymodbus.utilities import ModbusTransactionState
+
+from src.enums.network import ModbusRtuParity
+from src.enums.point import ModbusFunctionCode
+from src.services.polling import rtu_pacing
+from src.services.polling.rtu_pacing import RtuPacing, get_character_time, get_frame_characters, \
+    get_inter_frame_silence
+
+
+class Clock:
+    def __init__(self):
+        self.now: float = 1000
+        self.slept: List[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock: Clock = Clock()
+    monkeypatch.setattr(rtu_pacing, 'time', clock)
+    return clock
+
+
+def make_network(**kwargs) -> SimpleNamespace:
+    attributes: dict = dict(uuid=shortuuid.uuid(), rtu_speed=9600, rtu_byte_size=8, rtu_parity=ModbusRtuParity.N,
+                            rtu_stop_bits=1, rtu_learn_turnaround=False, point_interval_ms_between_points=0)
+    attributes.update(kwargs)
+    return SimpleNamespace(**attributes)
+
+
+def make_client(last_frame_end: float = 0) -> SimpleNamespace:
+    return SimpleNamespace(state=ModbusTransactionState.TRANSACTION_COMPLETE, last_frame_end=last_frame_end)
+
+
+DEVICE: SimpleNamespace = SimpleNamespace(uuid='device')
+HOLDING_POINTS: List[SimpleNamespace] = [
+    SimpleNamespace(register=1, register_length=2, function_code=ModbusFunctionCode.READ_HOLDING_REGISTERS),
+    SimpleNamespace(register=5, register_length=1, function_code=ModbusFunctionCode.READ_HOLDING_REGISTERS)]
+
+
+@pytest.mark.parametrize('kwargs, bits', [
+    ({}, 10),
+    ({'rtu_parity': ModbusRtuParity.E}, 11),
+    ({'rtu_parity': ModbusRtuParity.O, 'rtu_stop_bits': 2}, 12),
+    ({'rtu_byte_size': 7, 'rtu_speed': 19200}, 9 / 2),
+    ({'rtu_speed': None, 'rtu_byte_size': None, 'rtu_parity': None, 'rtu_stop_bits': None}, 10),
+])
+def test_character_time(kwargs, bits):
+    assert get_character_time(make_network(**kwargs)) == pytest.approx(bits / 9600)
+
+
+def test_inter_frame_silence_is_fixed_above_19200_baud():
+    assert get_inter_frame_silence(make_network()) == pytest.approx(3.5 * 10 / 9600)
+    assert get_inter_frame_silence(make_network(rtu_speed=19200)) == pytest.approx(3.5 * 10 / 19200)
+    assert get_inter_frame_silence(make_network(rtu_speed=38400)) == 0.00175
+
+
+@pytest.mark.parametrize('function_code, quantity, characters', [
+    (ModbusFunctionCode.READ_COILS, 10, 15),
+    (ModbusFunctionCode.READ_DISCRETE_INPUTS, 8, 14),
+    (ModbusFunctionCode.READ_HOLDING_REGISTERS, 10, 33),
+    (ModbusFunctionCode.READ_INPUT_REGISTERS, 1, 15),
+    (ModbusFunctionCode.WRITE_COIL, 1, 16),
+    (ModbusFunctionCode.WRITE_COILS, 9, 19),
+    (ModbusFunctionCode.WRITE_REGISTER, 1, 16),
+    (ModbusFunctionCode.WRITE_REGISTERS, 3, 23),
+    (ModbusFunctionCode.WRITE_REGISTER, 2, 21),
+])
+def test_frame_characters(function_code, quantity, characters):
+    assert get_frame_characters(function_code, quantity) == characters
+
+
+def test_bus_is_idle_for_the_silence_after_a_transaction(clock):
+    network: SimpleNamespace = make_network()
+    client: SimpleNamespace = make_client()
+    RtuPacing().wait(client, network)
+    assert clock.slept == []
+    assert client.state == ModbusTransactionState.IDLE
+    RtuPacing().complete(client, network, DEVICE, HOLDING_POINTS, clock.now, True)
+    clock.now += 0.001
+    RtuPacing().wait(make_client(), network)
+    assert clock.slept == [pytest.approx(3.5 * 10 / 9600 - 0.001)]
+
+
+def test_processing_longer_than_the_gap_is_not_waited_for(clock):
+    network: SimpleNamespace = make_network()
+    RtuPacing().complete(make_client(), network, DEVICE, HOLDING_POINTS, clock.now, True)
+    clock.now += 1
+    RtuPacing().wait(make_client(), network)
+    assert clock.slept == []
+
+
+def test_point_interval_is_the_floor_of_the_gap(clock):
+    network: SimpleNamespace = make_network(point_interval_ms_between_points=50)
+    RtuPacing().complete(make_client(), network, DEVICE, HOLDING_POINTS, clock.now, True)
+    RtuPacing().wait(make_client(), network)
+    assert clock.slept == [pytest.approx(0.05)]
+
+
+def test_turnaround_is_learned_as_a_moving_average(clock):
+    network: SimpleNamespace = make_network(rtu_learn_turnaround=True)
+    device: SimpleNamespace = SimpleNamespace(uuid=shortuuid.uuid())
+    silence: float = get_inter_frame_silence(network)
+    # registers 1 to 5 read in 8 + 5 + 10 characters
+    wire_time: float = 23 * get_character_time(network)
+
+    def transaction(turnaround: float, replied: bool = True) -> float:
+        started: float = 100
+        RtuPacing().complete(make_client(started + wire_time + silence + turnaround), network, device,
+                             HOLDING_POINTS, started, replied)
+        clock.slept.clear()
+        RtuPacing().wait(make_client(), network)
+        return clock.slept[0] - silence
+
+    assert transaction(0.010) == pytest.approx(0.010)
+    assert transaction(0.020) == pytest.approx(0.012)
+    # a device which didn't answer teaches nothing
+    assert transaction(1, replied=False) == pytest.approx(0.012)
+
+
+def test_turnaround_is_not_waited_for_unless_learned(clock):
+    network: SimpleNamespace = make_network()
+    RtuPacing().complete(make_client(100.5), network, DEVICE, HOLDING_POINTS, 100, True)
+    RtuPacing().wait(make_client(), network)
+    assert clock.slept == [pytest.approx(get_inter_frame_silence(network))]
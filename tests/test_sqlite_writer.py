@@ -0,0 +1,65 @@
+import time
+from typing import List
+
+from gevent import sleep, spawn, joinall
+
+from src import db
+from src.models.model_point_store import PointStoreModel
+from src.services.polling.modbus_polling import ModbusPolling, TcpPolling
+from src.services.polling.poll_scheduler import PollScheduler
+from tests.fake_modbus import FakeConnection
+
+point_stores = PointStoreModel.__table__
+
+
+def write_value(point_uuid: str, value: float):
+    db.session.execute(point_stores.update().where(point_stores.c.point_uuid == point_uuid)
+                       .values(value_original=value))
+
+
+def read_values(point_uuids: List[str]) -> List[float]:
+    db.session.commit()
+    rows = {row.point_uuid: row.value_original for row in
+            db.session.execute(point_stores.select().where(point_stores.c.point_uuid.in_(point_uuids)))}
+    return [rows[point_uuid] for point_uuid in point_uuids]
+
+
+def test_writers_take_turns(app, network):
+    """
+    A second writer waits on the gevent lock for the transaction of the first one, not in the busy handler of SQLite
+    which would give up after the busy_timeout
+    """
+    _, point_uuids = network
+
+    def writer(value: float):
+        with app.app_context():
+            write_value(point_uuids[0], value)
+            sleep(0.6)
+            db.session.commit()
+
+    started: float = time.monotonic()
+    joinall([spawn(writer, 1), spawn(writer, 2)], raise_error=True)
+    assert time.monotonic() - started >= 1.2
+    assert read_values(point_uuids[:1]) in ([1], [2])
+
+
+def test_workers_write_while_sweep_polls_concurrently(app, network, monkeypatch):
+    network, point_uuids = network
+
+    def write_queued_points(_, __, network_):
+        # a queued write leaves the transaction of the sweep open
+        write_value(point_uuids[0], -1)
+        return True
+
+    def poll_device(_, __, network_, device, points_by_uuid, blocks):
+        for point in points_by_uuid.values():
+            write_value(point.uuid, device.address)
+        sleep(0.1)
+        return True
+
+    monkeypatch.setattr(ModbusPolling, '_ModbusPolling__write_queued_points', write_queued_points)
+    monkeypatch.setattr(ModbusPolling, '_ModbusPolling__poll_device', poll_device)
+    started: float = time.monotonic()
+    getattr(TcpPolling(), '_ModbusPolling__poll_network_devices')(FakeConnection(2), network, PollScheduler())
+    assert time.monotonic() - started < 1
+    assert read_values(point_uuids) == [1, 2, 3]
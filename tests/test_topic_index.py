@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from src import db
+from src.models.model_point import PointModel
+from src.services.mqtt_client import MqttClient
+from src.services.mqtt_client.topic_index import MqttTopicIndex
+from tests.sql_queries import count_queries
+
+
+def get_key(point: PointModel, point_name: str = None) -> tuple:
+    device = point.device
+    return device.network.uuid, device.network.name, device.uuid, device.name, point.uuid, point_name or point.name
+
+
+@pytest.fixture
+def index(point) -> MqttTopicIndex:
+    MqttTopicIndex().invalidate()
+    return MqttTopicIndex()
+
+
+def test_index_is_loaded_with_one_query(index, point):
+    key: tuple = get_key(point)
+    with count_queries() as statements:
+        assert index.contains(key)
+        assert not index.contains(key[:-1] + ('p2',))
+    assert len(statements) == 1
+
+
+def test_renamed_and_deleted_points_are_dropped_once_committed(client, index, point):
+    key: tuple = get_key(point)
+    assert index.contains(key)
+    client.patch(f'/api/modbus/points/uuid/{point.uuid}', json={'name': 'renamed'})
+    assert not index.contains(key)
+    assert index.contains(get_key(point, 'renamed'))
+    client.delete(f'/api/modbus/points/uuid/{point.uuid}')
+    assert not index.contains(get_key(point, 'renamed'))
+
+
+def test_value_updates_keep_the_index(index, point):
+    key: tuple = get_key(point)
+    index.contains(key)
+    point.point_store.value = 5
+    db.session.commit()
+    with count_queries() as statements:
+        assert index.contains(key)
+    assert statements == []
+
+
+def test_rolled_back_renames_keep_the_index(index, point):
+    key: tuple = get_key(point)
+    index.contains(key)
+    point.name = 'renamed'
+    db.session.flush()
+    db.session.rollback()
+    db.session.commit()
+    with count_queries() as statements:
+        assert index.contains(key)
+    assert statements == []
+
+
+def test_retained_topics_of_unknown_points_are_cleared(index, point, monkeypatch):
+    published: List[tuple] = []
+    monkeypatch.setattr(MqttClient, '_publish_mqtt_value',
+                        lambda _, topic, payload, retain=True: published.append((topic, payload, retain)))
+    check = getattr(MqttClient(), '_MqttListener__check_and_clear_cov_point')
+    for point_name in (point.name, 'old_name'):
+        parts: List[str] = ['prefix', 'cov', 'value', 'MODBUS', *get_key(point, point_name)]
+        check(parts, SimpleNamespace(topic='/'.join(parts), payload=b'1', retain=True))
+    assert published == [('prefix/cov/value/MODBUS/' + '/'.join(get_key(point, 'old_name')), '', True)]
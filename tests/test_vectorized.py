@@ -0,0 +1,47 @@
+import random
+from types import SimpleNamespace
+from typing import List
+
+from src.models.model_point import PointModel
+from src.services.polling.vectorized import VECTORIZE_MIN_POINTS, compute_values_vectorized, is_vectorizable
+
+SCALES = [(None, None, None, None), (0, 100, 0, 10), (4, 20, 0, 100), (0, 10, 10, 0), (5, 5, 0, 1), (0, 1, None, 2)]
+
+OPERATIONS = [None, '', 'x * 2 + 1', '(x - 32) * 5 / 9', 'x / 3', 'x ** 2', 'X + 0.1', '-x % 7']
+
+
+def make_points(count: int, seed: int = 3) -> List[SimpleNamespace]:
+    rnd: random.Random = random.Random(seed)
+    return [SimpleNamespace(**dict(zip(('input_min', 'input_max', 'scale_min', 'scale_max'), rnd.choice(SCALES))),
+                            value_operation=rnd.choice(OPERATIONS)) for _ in range(count)]
+
+
+def compute_scalar(point, value: float) -> float:
+    value = PointModel.apply_scale(value, point.input_min, point.input_max, point.scale_min, point.scale_max)
+    return PointModel.apply_value_operation(value, point.value_operation)
+
+
+def test_vectorized_values_are_bit_exact_with_the_scalar_ones():
+    points: List[SimpleNamespace] = make_points(200)
+    values: List[float] = [random.Random(5).uniform(-50, 150) for _ in points]
+    assert compute_values_vectorized(points, values) == [compute_scalar(point, value)
+                                                         for point, value in zip(points, values)]
+
+
+def test_a_single_operation_for_all_of_the_points():
+    points: List[SimpleNamespace] = [SimpleNamespace(input_min=None, input_max=None, scale_min=None, scale_max=None,
+                                                     value_operation='x / 10') for _ in range(40)]
+    assert compute_values_vectorized(points, list(range(40))) == [value / 10 for value in range(40)]
+
+
+def test_arithmetic_errors_fall_back_to_the_scalar_path():
+    points: List[SimpleNamespace] = make_points(40)
+    points[7].value_operation = '100 / x'
+    values: List[float] = [1.0] * 40
+    values[7] = 0.0
+    assert compute_values_vectorized(points, values) is None
+
+
+def test_small_blocks_are_not_vectorized():
+    assert not is_vectorizable(VECTORIZE_MIN_POINTS - 1)
+    assert is_vectorizable(VECTORIZE_MIN_POINTS)
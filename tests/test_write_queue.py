@@ -0,0 +1,75 @@
+from typing import List
+
+import pytest
+import shortuuid
+from gevent import sleep, spawn
+
+from src.models.model_priority_array import PriorityArrayModel
+from src.services.polling.modbus_polling import ModbusPolling, TcpPolling
+from src.services.polling.write_queue import PointWriteQueue
+
+
+@pytest.fixture
+def network_uuid() -> str:
+    network_uuid: str = shortuuid.uuid()
+    yield network_uuid
+    PointWriteQueue().remove_network(network_uuid)
+
+
+def test_points_are_queued_once_in_the_order_they_got_written(network_uuid):
+    queue: PointWriteQueue = PointWriteQueue()
+    for point_uuid in ('p1', 'p2', 'p1', 'p3', 'p2'):
+        queue.enqueue(network_uuid, point_uuid)
+    assert queue.has_pending(network_uuid)
+    assert not queue.has_pending(shortuuid.uuid())
+    assert queue.pop_all(network_uuid) == ['p1', 'p2', 'p3']
+    assert not queue.has_pending(network_uuid)
+    assert queue.pop_all(network_uuid) == []
+
+
+def test_wait_sleeps_the_whole_timeout_without_writes(network_uuid):
+    assert not PointWriteQueue().wait(network_uuid, 0.05)
+
+
+def test_wait_is_woken_up_by_a_queued_write(network_uuid):
+    waiter = spawn(PointWriteQueue().wait, network_uuid, 5)
+    sleep(0.01)
+    PointWriteQueue().enqueue(network_uuid, 'p1')
+    assert waiter.get(timeout=1) is True
+
+
+def test_wait_returns_at_once_on_a_write_queued_before(network_uuid):
+    PointWriteQueue().enqueue(network_uuid, 'p1')
+    PointWriteQueue().wait(network_uuid, 0)
+    # the write is still to be drained although the event got cleared
+    assert PointWriteQueue().wait(network_uuid, 0.01)
+
+
+def test_removed_network_has_nothing_pending(network_uuid):
+    PointWriteQueue().enqueue(network_uuid, 'p1')
+    PointWriteQueue().remove_network(network_uuid)
+    assert not PointWriteQueue().has_pending(network_uuid)
+
+
+def test_only_writable_points_are_queued(client, point, write_point):
+    network_uuid: str = point.device.network_uuid
+    for value in (1, 2, 3):
+        client.patch(f'/api/modbus/points_value/uuid/{write_point.uuid}', json={'value': value, 'priority': 16})
+    point.update_priority_value(4, 16, None)
+    assert PointWriteQueue().pop_all(network_uuid) == [write_point.uuid]
+
+
+def test_queued_points_are_written_once_with_their_latest_value(client, point, write_point, monkeypatch):
+    network_uuid: str = point.device.network_uuid
+    written: List[tuple] = []
+
+    def poll_point(_, __, network, device, points, *args, **kwargs):
+        written.extend((point_.uuid, PriorityArrayModel.get_highest_priority_value_from_priority_array(
+            point_.priority_array_write)) for point_ in points)
+
+    monkeypatch.setattr(ModbusPolling, '_ModbusPolling__poll_point', poll_point)
+    for value in (1, 2, 3):
+        client.patch(f'/api/modbus/points_value/uuid/{write_point.uuid}', json={'value': value, 'priority': 16})
+    assert getattr(TcpPolling(), '_ModbusPolling__write_queued_points')(None, point.device.network)
+    assert written == [(write_point.uuid, 3.0)]
+    assert not PointWriteQueue().has_pending(network_uuid)